@@ -0,0 +1,39 @@
+"""
+FT2H codec — the signal chain shared by ft2h_sim_v2.py and ft2h_simulator.py.
+
+Stages (one module each):
+
+    encoder      payload → scramble → CRC → LDPC → Gray map → tones
+    modulator    tones → 8-GFSK waveform (cached pulse tables)
+    channel      AWGN at an SNR in 2500 Hz, optional random slot timing
+    demodulator  waveform → tone powers → max-log LLRs
+    bitmetrics   baseband symbols → DFT matmul → 1/2/3-symbol LLRs
+    sync         Costas spectrogram search (ft2h_getcandidates.f90)
+    decoder      BP min-sum + OSD for LDPC(174,91), OSD for LDPC(64,32)
+    receiver     whole-slot receive: candidates → downsample → fine sync
+                 → demod → decode (unknown time and frequency), and
+                 multi-pass interference cancellation (receive_sic)
+
+with params (mode constants), ldpc (code matrices), crc, gf2, osd, link
+(Monte Carlo units), sweep (parallel SNR sweeps) and cache (SQLite store
+of finished sweep chunks) underneath.  Nothing here imports matplotlib;
+scipy is only loaded when a Clopper-Pearson interval is requested.  The
+LDPC tables and OSD decoders are built on first use, so importing the
+package costs little more than numpy.
+
+    >>> from ft2h import make_standard_frames, gen_wave_batch, demod_standard
+"""
+
+from .params import *
+from .encoder import (make_standard_frame, make_standard_frames, make_short_frame,
+                      make_short_frames, encode_174_91, encode_64_32, get_crc16, scramble)
+from .modulator import gen_wave, gen_wave_batch
+from .channel import channel_scales, add_awgn, awgn_slot, mix_slot
+from .demodulator import demod_llr, demod_standard, demod_short
+from .bitmetrics import symbol_spectra, bitmetrics
+from .sync import sync_candidates_standard, detect_sync_standard, sync_demod_standard
+from .decoder import (bp_decode_174_91, decode_batch, osd_decode_174_91, decode_combined,
+                      decode_combined_batch, decode_64_32, decode_64_32_batch)
+from .receiver import (downsample, fine_sync, demod_baseband, receive, receive_standard, receive_short,
+                       receive_slot, subtract, receive_sic)
+from .link import standard_counts, receiver_counts, short_counts
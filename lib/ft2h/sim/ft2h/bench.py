@@ -0,0 +1,305 @@
+"""
+FT2H stage benchmarks — frames/s of each step of the signal chain.
+
+Every stage is timed on its own, on inputs built once from a fixed seed
+at a fixed SNR, so two runs see exactly the same data:
+
+    standard  encode → gen_wave → awgn → demod → bp → osd, sync, receive
+              (bp_layered: layered schedule with stagnation stop;
+               bp_oms, bp_spa: offset min-sum and sum-product kernels;
+               bitmetrics1..3: baseband LLRs over 1, 2, 3 symbols;
+               downsample, ds_full: baseband of 64 candidates
+               per slot, windowed band and all bins)
+    short     encode → gen_wave → awgn → demod → osd
+
+A stage is a zero-argument callable over a batch of `nframes` frames;
+it is run `repeat` times after a warm-up call and reported as the median
+µs/frame with the spread over repeats.  Results are a JSON-ready dict
+that can be saved as a baseline and compared against by later runs.
+
+run_realtime() is the T/R budget check: busy slots of N standard and
+short frames at random frequencies, SNRs and delays go through the whole
+receiver (receiver.receive_slot(), or receiver.receive_sic() with
+several decode/subtract passes), and the decodes and the slot latency
+(mean, 95th percentile) are reported against N.
+"""
+
+import os
+import platform
+import statistics
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .params import NMAX, NSPS, NN2, NN2_S, DATA_POS, PULSE_DELAY
+from .encoder import make_standard_frames, make_short_frames
+from .modulator import gen_wave_batch
+from .channel import add_awgn, awgn_slot, mix_slot
+from .demodulator import demod_standard, demod_short
+from .sync import sync_demod_standard
+from .receiver import (receive_standard, receive_slot, receive_sic, downsample, fine_sync,
+                       demod_baseband, NDOWN, NFFT_DOWN)
+from .decoder import decode_batch, osd_174_91, osd_64_32
+
+
+def time_stage(fn, repeat=7):
+    """List of `repeat` call durations (s) after one warm-up call."""
+    fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def _noisy(waves, snr_db, rng):
+    return add_awgn(waves.copy(), snr_db, rng)
+
+
+def standard_stages(batch=128, snr_db=-8.0, seed=0, nsync=16, osd_order=2,
+                    osd_budget=1024):
+    """[(name, nframes, fn)] for the standard frame.
+
+    The OSD stage runs on the frames BP fails at snr_db (as in the
+    decoder), the sync and receive (full receiver.receive_standard())
+    stages on nsync 4 s slots, the bitmetrics stages on the baseband
+    signals of those slots and the downsample stages on 64 candidate
+    frequencies of one slot (frames = candidates)."""
+    rng = np.random.default_rng(seed)
+    msgs = rng.integers(0, 2, (batch, 77), dtype=np.int8)
+    tones, _ = make_standard_frames(msgs)
+    waves = gen_wave_batch(tones)
+    wave_buf = np.empty_like(waves)
+    rx = _noisy(waves, snr_db, rng)
+    llr = demod_standard(rx)
+    _, nhard, _ = decode_batch(llr, max_iter=40)
+    llr_fail = llr[nhard < 0]
+    if len(llr_fail) == 0:
+        llr_fail = llr[:1]
+    slots, delay = awgn_slot(waves[:nsync].copy(), snr_db, rng, NMAX)
+    cd = np.concatenate([downsample(x, [1500.0])[0] for x in slots])
+    lag, dfreq, _ = fine_sync(cd, np.rint((delay + PULSE_DELAY * NSPS) / NDOWN).astype(np.intp))
+    spectrum = np.fft.rfft(slots[0], NFFT_DOWN)
+    freqs = rng.uniform(200.0, 2600.0, 64)
+    osd = osd_174_91()
+
+    return [
+        ('encode', batch, lambda: make_standard_frames(msgs)),
+        ('gen_wave', batch, lambda: gen_wave_batch(tones, out=wave_buf)),
+        ('awgn', batch, lambda: add_awgn(wave_buf, snr_db, rng)),
+        ('demod', batch, lambda: demod_standard(rx)),
+        ('bp', batch, lambda: decode_batch(llr, max_iter=40)),
+        ('bp_layered', batch, lambda: decode_batch(llr, 40, schedule='layered', stall=5)),
+        ('bp_oms', batch, lambda: decode_batch(llr, 40, kernel='offset-min-sum')),
+        ('bp_spa', batch, lambda: decode_batch(llr, 40, kernel='sum-product')),
+        ('osd', len(llr_fail), lambda: osd.decode_batch(llr_fail, osd_order, osd_budget)),
+        ('sync', nsync, lambda: sync_demod_standard(slots, 1500.0)),
+        ('receive', nsync, lambda: [receive_standard(x) for x in slots]),
+        ('bitmetrics1', nsync, lambda: demod_baseband(cd, lag, dfreq, DATA_POS, 1)),
+        ('bitmetrics2', nsync, lambda: demod_baseband(cd, lag, dfreq, DATA_POS, 2)),
+        ('bitmetrics3', nsync, lambda: demod_baseband(cd, lag, dfreq, DATA_POS, 3)),
+        ('downsample', len(freqs), lambda: downsample(None, freqs, spectrum)),
+        ('ds_full', len(freqs), lambda: downsample(None, freqs, spectrum, None)),
+    ]
+
+
+def short_stages(batch=128, snr_db=-10.0, seed=0):
+    """[(name, nframes, fn)] for the short frame (random 16-bit messages)."""
+    rng = np.random.default_rng(seed)
+    msgs = rng.integers(0, 2, (batch, 16), dtype=np.int8)
+    tones, _ = make_short_frames(msgs)
+    waves = gen_wave_batch(tones)
+    wave_buf = np.empty_like(waves)
+    rx = _noisy(waves, snr_db, rng)
+    llr = demod_short(rx)
+    osd = osd_64_32()
+
+    return [
+        ('encode', batch, lambda: make_short_frames(msgs)),
+        ('gen_wave', batch, lambda: gen_wave_batch(tones, out=wave_buf)),
+        ('awgn', batch, lambda: add_awgn(wave_buf, snr_db, rng)),
+        ('demod', batch, lambda: demod_short(rx)),
+        ('osd', batch, lambda: osd.decode_batch(llr, 2, 256)),
+    ]
+
+
+def run_bench(suites, repeat=7, stages=None, log=None):
+    """Time every stage of {suite: [(name, nframes, fn)]}.
+
+    Args:
+        suites: stage lists by suite name ('standard', 'short')
+        repeat: timed calls per stage
+        stages: optional set of 'suite.stage' names to run (default all)
+        log: optional log(key, entry) called as each stage finishes
+
+    Returns:
+        {'meta': {...}, 'stages': {'suite.stage': entry}} with entry
+        {'frames', 'us_per_frame' (median), 'us_stdev', 'us_min',
+        'frames_per_s', 'repeat'}
+    """
+    result = {'meta': {'python': platform.python_version(),
+                       'numpy': np.__version__,
+                       'machine': platform.machine(),
+                       'repeat': repeat},
+              'stages': {}}
+    for suite, items in suites.items():
+        for name, nframes, fn in items:
+            key = f"{suite}.{name}"
+            if stages is not None and key not in stages:
+                continue
+            us = [1e6 * t / nframes for t in time_stage(fn, repeat)]
+            med = statistics.median(us)
+            entry = {'frames': nframes,
+                     'us_per_frame': round(med, 2),
+                     'us_stdev': round(statistics.stdev(us), 2) if len(us) > 1 else 0.0,
+                     'us_min': round(min(us), 2),
+                     'frames_per_s': round(1e6 / med, 1),
+                     'repeat': repeat}
+            result['stages'][key] = entry
+            if log is not None:
+                log(key, entry)
+    return result
+
+
+def compare(result, baseline, threshold=0.15, nsigma=2.0):
+    """Stage-by-stage ratio of µs/frame against a baseline run_bench() dict.
+
+    Returns [(key, ratio, flag)] with flag 'REGRESSION' when the stage is
+    more than `threshold` slower and the difference of the medians exceeds
+    nsigma times the larger of the two spreads (so timing noise alone is
+    not flagged), 'faster' for the mirror case, '' otherwise; stages
+    missing from the baseline get ratio None and flag 'new'.
+    """
+    rows = []
+    for key, entry in result['stages'].items():
+        base = baseline['stages'].get(key)
+        if base is None:
+            rows.append((key, None, 'new'))
+            continue
+        ratio = entry['us_per_frame'] / base['us_per_frame']
+        diff = entry['us_per_frame'] - base['us_per_frame']
+        significant = abs(diff) > nsigma * max(entry['us_stdev'], base['us_stdev'])
+        flag = ''
+        if significant and ratio > 1.0 + threshold:
+            flag = 'REGRESSION'
+        elif significant and ratio < 1.0 - threshold:
+            flag = 'faster'
+        rows.append((key, ratio, flag))
+    return rows
+
+
+# ============================================================
+# Real-time budget: busy slots through the whole receiver
+# ============================================================
+def busy_slot(nsig, rng, short_frac=0.25, snr=(-10.0, 0.0), fmin=200.0, fmax=2600.0):
+    """One NMAX-sample slot with nsig frames, a short_frac share of them short.
+
+    Every frame gets a random message, tone-0 frequency in [fmin, fmax],
+    SNR in the snr range and a delay at which it fits in the slot.
+
+    Returns:
+        (slot, sent): the received buffer and {'standard': (n, 77),
+        'short': (n, 16)} transmitted payloads
+    """
+    nshort = int(round(nsig * short_frac))
+    sent = {'standard': rng.integers(0, 2, (nsig - nshort, 77), dtype=np.int8),
+            'short': rng.integers(0, 2, (nshort, 16), dtype=np.int8)}
+    waves = []
+    for msgs, make, nsym in ((sent['standard'], make_standard_frames, NN2),
+                             (sent['short'], make_short_frames, NN2_S)):
+        if len(msgs):
+            tones, _ = make(msgs)
+            waves.extend(gen_wave_batch(tones, f0=rng.uniform(fmin, fmax, len(msgs))))
+    delay = [rng.integers(0, NMAX - len(w) + 1) for w in waves]
+    slot = mix_slot(waves, rng.uniform(*snr, nsig), delay, rng, NMAX)
+    return slot, sent
+
+
+def _found(decoded, sent):
+    """(payloads sent and decoded, decodes not sent)."""
+    sent = {m.tobytes() for m in sent}
+    got = {m.tobytes() for m in decoded}
+    return len(sent & got), len(got - sent)
+
+
+def run_realtime(nsigs=(1, 2, 5, 10, 20, 30, 50), nslots=10, budget=1.5, jobs=1,
+                 seed=0, maxcand=None, short_frac=0.25, snr=(-10.0, 0.0), npass=1,
+                 stop=True, log=None, **rx):
+    """Decodes and slot latency of the full receiver against band occupancy.
+
+    Args:
+        nsigs: signals per slot to try, increasing
+        nslots: slots timed per N (plus one warm-up slot)
+        budget: latency budget (s); max_n is the largest N whose 95th
+                percentile slot latency is within it
+        jobs: worker processes decoding each slot's candidates (0 = all cores)
+        seed: seed of the slots (the same for every jobs setting)
+        maxcand: candidates per frame type and slot (default 20 + 2N)
+        short_frac, snr: frame mix and SNR range of busy_slot()
+        npass: decode passes of receiver.receive_sic() (1 = receive_slot())
+        stop: stop after the first N over budget
+        log: optional log(row) called as each N finishes
+        **rx: receiver settings of receiver.receive_slot()
+
+    Returns:
+        {'meta': {...}, 'rows': [row per N], 'max_n': int} with row
+        {'n', 'slots', 'sent', 'decoded', 'false', 'ms_mean', 'ms_p95',
+        'ms_max', 'over_budget', 'passes'}; passes (npass > 1 only) has
+        per pass the decodes it added and its mean ms per slot by stage,
+        [{'new', 'ms': {stage: ms}}]
+    """
+    jobs = jobs or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    rows, max_n = [], 0
+    try:
+        for nsig in nsigs:
+            rng = np.random.default_rng([seed, nsig])
+            k = maxcand or 20 + 2 * nsig
+            times, nsent, ndec, nfalse = [], 0, 0, 0
+            passes = [{'new': 0, 'ms': {}} for _ in range(npass)]
+            for i in range(nslots + 1):
+                slot, sent = busy_slot(nsig, rng, short_frac, snr)
+                t0 = time.perf_counter()
+                if npass > 1:
+                    result, tel = receive_sic(slot, npass, maxcand=k, pool=pool, jobs=jobs,
+                                              **rx)
+                else:
+                    result = receive_slot(slot, maxcand=k, pool=pool, jobs=jobs, **rx)
+                dt = time.perf_counter() - t0
+                if i == 0:
+                    continue            # warm-up (tables, worker start-up)
+                times.append(dt)
+                if npass > 1:
+                    for acc, p in zip(passes, tel):
+                        acc['new'] += sum(p['new'].values())
+                        for name, sec in p['stage_time'].items():
+                            acc['ms'][name] = acc['ms'].get(name, 0.0) + 1e3 * sec / nslots
+                for frame, msgs in sent.items():
+                    ok, bad = _found(result[frame][0], msgs)
+                    nsent += len(msgs)
+                    ndec += ok
+                    nfalse += bad
+            p95 = float(np.percentile(times, 95))
+            row = {'n': nsig, 'slots': nslots, 'sent': nsent, 'decoded': ndec,
+                   'false': nfalse, 'ms_mean': round(1e3 * statistics.mean(times), 1),
+                   'ms_p95': round(1e3 * p95, 1), 'ms_max': round(1e3 * max(times), 1),
+                   'over_budget': p95 > budget}
+            if npass > 1:
+                row['passes'] = [{'new': p['new'],
+                                  'ms': {name: round(ms, 1) for name, ms in p['ms'].items()}}
+                                 for p in passes]
+            rows.append(row)
+            if log is not None:
+                log(row)
+            if p95 <= budget:
+                max_n = nsig
+            elif stop:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return {'meta': {'python': platform.python_version(), 'numpy': np.__version__,
+                     'machine': platform.machine(), 'cpus': os.cpu_count(),
+                     'jobs': jobs, 'budget_s': budget, 'seed': seed,
+                     'short_frac': short_frac, 'snr': list(snr), 'npass': npass},
+            'rows': rows, 'max_n': max_n}
@@ -0,0 +1,102 @@
+"""
+FT2H bit metrics — symbol spectra by one matmul, 1-, 2- and 3-symbol LLRs.
+
+ft2h_get_bitmetrics.f90 correlates every data symbol of the baseband
+signal with every tone, evaluating cos/sin of the phase per sample
+(58 x 8 x 32 per candidate).  At baseband the tone spacing is FS_DOWN/NSS
+(h = 1), so the 8 tone references form a fixed (NSS, 8) DFT matrix,
+built once per NSS; the spectra of all symbols of all candidates are one
+(K, nsym, NSS) @ (NSS, 8) complex matmul.
+
+Multi-symbol metrics are those of WSJT-X's FT8/FT4 decoders (nsym = 2, 3
+in ft8b.f90 and get_ft4_bitmetrics.f90): the phase is continuous and each
+tone turns a whole number of cycles per symbol, so n consecutive symbols
+add coherently.  For every group of n symbols the power |sum cs| is taken
+over all 8^n tone sequences, and the LLR of each of the 3n bits is the
+best sequence with the bit at 0 minus the best with it at 1.  A group
+sees n symbols' energy, which helps below the single-symbol threshold;
+8^3 = 512 sequences make the 3-symbol metric the most expensive.
+"""
+
+import numpy as np
+from functools import lru_cache
+from .params import M
+from .demodulator import IGRAY0, IGRAY1
+
+
+@lru_cache(maxsize=8)
+def dft_matrix(nss, m=M):
+    """(nss, m) read-only references exp(-2j*pi*t*n/nss) of tones t = 0..m-1
+    (tone spacing = sample rate / nss)."""
+    ref = np.exp(-2j * np.pi * np.outer(np.arange(nss), np.arange(m)) / nss)
+    ref.setflags(write=False)
+    return ref
+
+
+def symbol_spectra(seg, m=M):
+    """(..., nsym, m) complex tone bins of (..., nsym, nss) symbol segments."""
+    return seg @ dft_matrix(seg.shape[-1], m)
+
+
+def _groups(positions, nseq):
+    """(G, nseq) indices into positions of coherent symbol groups.
+
+    Groups stay inside runs of consecutive positions (the sync symbols
+    between them would break the tone pattern); a run's last group is
+    aligned to its end and overlaps the one before it when the run length
+    is not a multiple of nseq (the shared symbols keep the metric of the
+    earlier group), and runs shorter than nseq are skipped."""
+    positions = np.asarray(positions)
+    breaks = np.flatnonzero(np.diff(positions) != 1) + 1
+    starts = []
+    for run in np.split(np.arange(len(positions)), breaks):
+        if len(run) < nseq:
+            continue
+        first = list(range(run[0], run[-1] - nseq + 2, nseq))
+        if first[-1] + nseq - 1 < run[-1]:
+            first.append(run[-1] - nseq + 1)
+        starts.extend(first)
+    return np.asarray(starts, dtype=np.intp)[:, None] + np.arange(nseq)
+
+
+def bitmetrics(cs, nseq=1, positions=None):
+    """Max-log bit LLRs from complex symbol spectra, nseq symbols coherently.
+
+    Args:
+        cs: (K, nsym, 8) complex tone bins (symbol_spectra())
+        nseq: symbols combined per metric, 1, 2 or 3
+        positions: frame symbol index of each of the nsym symbols; groups
+                   never span a gap (default: consecutive)
+
+    Returns:
+        (K, 3*nsym) LLRs, MSB first within each symbol (nseq = 1 equals
+        demodulator.max_log_llr() of the tone powers).  Symbols left out
+        of every group (a run shorter than nseq) get the 1-symbol metric.
+    """
+    power = cs.real ** 2 + cs.imag ** 2
+    llr = power[..., IGRAY0].max(axis=-1) - power[..., IGRAY1].max(axis=-1)
+    if nseq == 1:
+        return llr.reshape(len(cs), -1)
+    if positions is None:
+        positions = np.arange(cs.shape[1])
+    groups = _groups(positions, nseq)
+    m = cs.shape[-1]
+
+    # total[k, g, t0, t1, ...] = cs[k, g0, t0] + cs[k, g1, t1] + ...
+    g = cs[:, groups]                                   # (K, G, nseq, m)
+    total = g[:, :, nseq - 1]
+    for j in range(nseq - 2, -1, -1):
+        total = g[:, :, j, :, None] + total.reshape(g.shape[:2] + (1, -1))
+    p = total.real ** 2 + total.imag ** 2
+
+    # Best sequence per tone of symbol j: the maximum over the later tones
+    # (trailing axis), after the earlier ones were maximized out one at a
+    # time; each step shrinks p by m
+    p = p.reshape(g.shape[:2] + (-1,))
+    for j in range(nseq):
+        p = p.reshape(g.shape[:2] + (m, -1))
+        pj = p.max(axis=-1)
+        llr[:, groups[:, j]] = pj[..., IGRAY0].max(axis=-1) - pj[..., IGRAY1].max(axis=-1)
+        if j + 1 < nseq:
+            p = p.max(axis=2)
+    return llr.reshape(len(cs), -1)
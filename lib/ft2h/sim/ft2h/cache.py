@@ -0,0 +1,132 @@
+"""
+FT2H sweep result store — completed trial chunks in an SQLite file.
+
+run_sweep() splits every SNR point into chunks whose noise comes from
+SeedSequence(seed, spawn_key=(point key, chunk)), so a chunk is fully
+determined by the unit configuration, the point, the seed, its index
+and its size.  ResultCache stores the counts of each finished chunk under
+exactly that key; a later sweep with the same configuration takes the
+chunks it finds and only simulates the missing ones.  Adding an SNR
+point, raising the trial count of an adaptive run or restarting an
+interrupted one therefore costs only the new work.
+
+Counts are integers or telemetry.Telemetry objects (stored as dicts).
+The configuration key is a hash of the unit function, its keyword
+arguments, the chunk size, the mode parameters (params.py) and
+CACHE_VERSION; bump the latter whenever a codec change alters results.
+"""
+
+import hashlib
+import json
+import sqlite3
+import numpy as np
+from . import params
+from .telemetry import Telemetry
+
+CACHE_VERSION = 8
+DEFAULT_PATH = 'ft2h_sim_cache.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    config TEXT PRIMARY KEY,
+    description TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    config TEXT NOT NULL,
+    point REAL NOT NULL,
+    seed INTEGER NOT NULL,
+    chunk INTEGER NOT NULL,
+    ntrials INTEGER NOT NULL,
+    counts TEXT NOT NULL,
+    secs REAL NOT NULL,
+    PRIMARY KEY (config, point, seed, chunk, ntrials)
+);
+"""
+
+
+def _jsonable(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if callable(value):
+        return f"{value.__module__}.{value.__qualname__}"
+    return value
+
+
+def describe_unit(unit_fn, chunk):
+    """JSON-ready description of a sweep unit (functools.partial or function)."""
+    func = getattr(unit_fn, 'func', unit_fn)
+    return {
+        'version': CACHE_VERSION,
+        'unit': _jsonable(func),
+        'args': [_jsonable(a) for a in getattr(unit_fn, 'args', ())],
+        'kwargs': {k: _jsonable(v) for k, v in
+                   sorted(getattr(unit_fn, 'keywords', {}).items())},
+        'chunk': chunk,
+        'params': {k: _jsonable(getattr(params, k)) for k in sorted(params.__all__)},
+    }
+
+
+def config_key(description):
+    """Stable hash of a describe_unit() dictionary."""
+    text = json.dumps(description, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+class ResultCache:
+    """Chunk store for run_sweep(cache=...).
+
+    Args:
+        path: SQLite file, created if missing
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+        self.hits = 0
+        self.stored = 0
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def register(self, unit_fn, chunk):
+        """Config key of a unit; records its description for inspection."""
+        description = describe_unit(unit_fn, chunk)
+        key = config_key(description)
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO configs VALUES (?, ?)",
+                            (key, json.dumps(description, sort_keys=True)))
+        return key
+
+    def load(self, config, point, seed):
+        """{(chunk, ntrials): (counts, secs)} stored for one point."""
+        rows = self.db.execute(
+            "SELECT chunk, ntrials, counts, secs FROM chunks "
+            "WHERE config = ? AND point = ? AND seed = ?",
+            (config, float(point), int(seed)))
+        return {(j, n): (tuple(Telemetry.from_dict(x) if isinstance(x, dict) else x
+                               for x in json.loads(c)), s)
+                for j, n, c, s in rows}
+
+    def store(self, config, point, seed, chunk, ntrials, counts, secs):
+        """Record one finished chunk (committed at once, so an interrupted
+        sweep keeps everything it finished)."""
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (config, float(point), int(seed), int(chunk), int(ntrials),
+                 json.dumps([c.as_dict() if isinstance(c, Telemetry) else int(c)
+                             for c in counts]), float(secs)))
+        self.stored += 1
+
+    def report(self):
+        """One-line summary of this session's cache traffic."""
+        return f"cache {self.path}: {self.hits} chunks reused, {self.stored} stored"
@@ -0,0 +1,90 @@
+"""
+FT2H AWGN channel — SNR in 2500 Hz bandwidth, two scaling conventions.
+
+'wsjtx' (ft2h_sim_v2.py): unit-variance noise, signal scaled by
+    sig = sqrt(BW/fs) * 10^(snr/20)
+'esn0' (ft2h_simulator.py): unit-amplitude signal, noise sigma from
+    Es/N0 = snr + 10*log10(2500/baud) with signal power 0.5 per sample
+
+At the same nominal SNR the 'esn0' signal-to-noise ratio is 3 dB higher
+than the 'wsjtx' one, so thresholds from the two are not comparable.
+
+awgn_slot() places one wave per slot at a random delay; mix_slot() builds
+a busy band, several waves at their own SNRs and delays in one slot.
+"""
+
+import numpy as np
+from .params import NSPS, FSAMPLE, BAUD
+
+SNR_CONVENTIONS = ('wsjtx', 'esn0')
+
+
+def channel_scales(snr_db, convention='wsjtx'):
+    """(signal amplitude, noise sigma) for an SNR in 2500 Hz (dB)."""
+    if convention == 'wsjtx':
+        return np.sqrt(2500.0 / FSAMPLE) * 10.0 ** (snr_db / 20.0), 1.0
+    if convention == 'esn0':
+        es_n0_db = snr_db + 10.0 * np.log10(2500.0 / BAUD)
+        return 1.0, np.sqrt(0.5 / 10.0 ** (es_n0_db / 10.0) * NSPS)
+    raise ValueError(f"unknown SNR convention {convention!r}")
+
+
+def add_awgn(waves, snr_db, rng, convention='wsjtx', noise=None):
+    """Scale (N, nsamples) waves in place and add white Gaussian noise.
+
+    noise is an optional reusable buffer of the same shape.  Returns waves."""
+    sig, sigma = channel_scales(snr_db, convention)
+    noise = rng.standard_normal(out=noise) if noise is not None else \
+        rng.standard_normal(waves.shape)
+    if sigma != 1.0:
+        noise *= sigma
+    if sig != 1.0:
+        waves *= sig
+    waves += noise
+    return waves
+
+
+def awgn_slot(waves, snr_db, rng, nslot, convention='wsjtx', noise=None):
+    """Place each wave at a random delay in an nslot-sample noise buffer.
+
+    Args:
+        waves: (N, nwave) waves, scaled in place
+        snr_db, rng, convention: as in add_awgn()
+        nslot: slot length in samples (>= nwave)
+        noise: optional reusable (N, nslot) buffer
+
+    Returns:
+        (slots, delay): the (N, nslot) received buffers and (N,) start samples
+    """
+    ntx, nwave = waves.shape
+    sig, sigma = channel_scales(snr_db, convention)
+    slots = rng.standard_normal(out=noise) if noise is not None else \
+        rng.standard_normal((ntx, nslot))
+    if sigma != 1.0:
+        slots *= sigma
+    if sig != 1.0:
+        waves *= sig
+    delay = rng.integers(0, nslot - nwave + 1, ntx)
+    for n in range(ntx):
+        slots[n, delay[n]:delay[n] + nwave] += waves[n]
+    return slots, delay
+
+
+def mix_slot(waves, snr_db, delay, rng, nslot, convention='wsjtx'):
+    """One nslot-sample buffer holding several waves in white Gaussian noise.
+
+    Args:
+        waves: sequence of 1-D waves (any lengths)
+        snr_db: per-wave SNRs (dB), see channel_scales()
+        delay: per-wave start samples (a wave must fit in the slot)
+        rng, convention: as in add_awgn()
+
+    Returns:
+        (nslot,) received buffer; the noise has unit variance and each
+        wave is scaled to its SNR relative to it
+    """
+    slot = rng.standard_normal(nslot)
+    for wave, snr, d in zip(waves, snr_db, delay):
+        sig, sigma = channel_scales(snr, convention)
+        slot[d:d + len(wave)] += (sig / sigma) * wave
+    return slot
@@ -0,0 +1,107 @@
+"""
+FT2H CRC engine — byte-wise lookup tables, many messages per call.
+
+All simulator CRCs are MSB-first and bit-serial:
+
+    fb = ((crc >> (width-1)) & 1) ^ bit
+    crc = (crc << 1) & mask
+    if fb: crc ^= poly
+
+crc_bits() reproduces exactly that recurrence (including a poly wider than
+`width`, as in 0x6757 for CRC-14, whose extra bit only survives in the
+final value) eight bits at a time from a 256-entry table, vectorized over
+the rows of an (N, nbits) bit matrix or (N, nbytes) packed uint8 matrix.
+
+crc14() (0x6757, as WSJT-X crc14) protects the 77-bit standard payload,
+crc16() (0x8005, as get_crc16 in ldpc_64_32.f90) the 16-bit short one.
+"""
+
+import numpy as np
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def crc_table(poly, width):
+    """256-entry table: the bit-serial recurrence run over 8 feedback bits."""
+    mask = (1 << width) - 1
+    table = np.zeros(256, dtype=np.int64)
+    for i in range(256):
+        crc = i << (width - 8)
+        for _ in range(8):
+            fb = (crc >> (width - 1)) & 1
+            crc = (crc << 1) & mask
+            if fb:
+                crc ^= poly
+        table[i] = crc
+    table.setflags(write=False)
+    return table
+
+
+def crc_bytes(data, poly, width):
+    """CRC of packed MSB-first bytes; data is (N, nbytes) or (nbytes,).
+
+    Returns an (N,) int64 array, or an int for a single row.
+    """
+    table = crc_table(poly, width)
+    mask = (1 << width) - 1
+    data = np.asarray(data, dtype=np.uint8)
+    if data.ndim == 1:
+        tab = table.tolist()
+        crc = 0
+        for byte in data.tolist():
+            crc = ((crc << 8) & mask) ^ tab[((crc >> (width - 8)) & 0xFF) ^ byte]
+        return crc
+
+    crc = np.zeros(len(data), dtype=np.int64)
+    for col in data.T:
+        idx = ((crc >> (width - 8)) & 0xFF) ^ col
+        crc = ((crc << 8) & mask) ^ table[idx]
+    return crc
+
+
+def crc_bits(bits, poly, width):
+    """CRC of (N, nbits) or (nbits,) 0/1 bit rows, first bit first.
+
+    Rows are left-padded with zeros to whole bytes (leading zeros leave a
+    zero CRC register unchanged) and packed, then run through crc_bytes().
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    pad = -bits.shape[-1] % 8
+    if pad:
+        bits = np.concatenate([np.zeros(bits.shape[:-1] + (pad,), dtype=np.uint8),
+                               bits], axis=-1)
+    return crc_bytes(np.packbits(bits, axis=-1), poly, width)
+
+
+def crc_to_bits(crc, width):
+    """Low `width` bits of each CRC as (..., width) int8 bits, MSB first."""
+    shifts = np.arange(width - 1, -1, -1)
+    return ((np.asarray(crc)[..., None] >> shifts) & 1).astype(np.int8)
+
+
+def crc14(message77):
+    """14-bit CRC matching WSJT-X crc14().
+
+    77 bits + 3 zeros packed into 10 bytes, then 2 zero bytes.  message77
+    may be (77,) (returns an int) or an (N, 77) batch (returns (N,))."""
+    # CRC-14 polynomial: x^14 + x^10 + x^9 + x^5 + x + 1 = 0x6757
+    m = np.asarray(message77, dtype=np.uint8)
+    pad = np.zeros(m.shape[:-1] + (19,), dtype=np.uint8)
+    return crc_bits(np.concatenate([m, pad], axis=-1), 0x6757, 14)
+
+
+def crc14_ok(cw):
+    """True where the CRC bits cw[..., 77:91] match crc14(cw[..., :77])."""
+    cw = np.asarray(cw)
+    return np.all(cw[..., 77:91] == crc_to_bits(crc14(cw[..., :77]), 14), axis=-1)
+
+
+def crc16(msgbits):
+    """16-bit CRC (x^16 + x^15 + x^2 + 1) of (16,) or (N, 16) short payloads."""
+    return crc_bits(msgbits, 0x8005, 16)
+
+
+def crc16_ok(cw):
+    """True where the CRC bits cw[..., 16:32] match crc16(cw[..., :16])."""
+    cw = np.asarray(cw)
+    return np.all(cw[..., 16:32] == crc_to_bits(crc16(cw[..., :16]), 16), axis=-1)
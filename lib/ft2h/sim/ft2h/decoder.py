@@ -0,0 +1,385 @@
+"""
+FT2H decoders — BP min-sum and OSD for LDPC(174,91), OSD for LDPC(64,32).
+
+The standard-frame decoder is BP (batched, on the LDPC edge tables) with
+an ordered-statistics fallback on the rows BP leaves undecoded; both
+accept a codeword only if its CRC-14 matches.  Short frames are decoded
+by OSD alone with the CRC-16 check.  Results are (decoded, nhard) with
+nhard = -1 on failure.
+"""
+
+import numpy as np
+from functools import lru_cache
+from . import ldpc
+from .crc import crc14_ok, crc16_ok
+from .osd import OSD
+from .telemetry import stage
+
+# ============================================================
+# BP Decoder (Min-Sum with normalization)
+# ============================================================
+def bp_decode_174_91(llr, max_iter=50, scale=0.8):
+    """Belief Propagation (min-sum) decoder for LDPC(174,91).
+    
+    Messages live on the fixed edge arrays ldpc.CHK_BITS/BIT_SLOTS, so each
+    iteration is a handful of vectorized NumPy operations.
+    
+    Args:
+        llr: channel LLR (174,), positive = bit 0
+        max_iter: max BP iterations
+        scale: min-sum normalization factor
+    
+    Returns:
+        (decoded_91, nhard) on success, (None, -1) on failure
+    """
+    llr = np.asarray(llr, dtype=np.float64)
+    chk_bits, bit_slots = ldpc.CHK_BITS, ldpc.BIT_SLOTS
+    cols = np.arange(chk_bits.shape[1])
+    
+    # Bit totals with a +inf dummy entry for the padded edges, so padding
+    # never wins the minimum and never flips the sign product.
+    total = np.append(llr, np.inf)
+    
+    # Q = bit-to-check messages, R = check-to-bit messages, both (7, 83)
+    Q = total[chk_bits]
+    
+    for iteration in range(max_iter):
+        # Check-to-bit update (min-sum): sign product and min magnitude
+        # excluding the target edge, from the two smallest magnitudes.
+        mag = np.abs(Q)
+        neg = Q < 0
+        flip = neg ^ np.logical_xor.reduce(neg, axis=0)
+        imin = np.argmin(mag, axis=0)
+        min1 = mag[imin, cols]
+        mag[imin, cols] = np.inf
+        min2 = np.min(mag, axis=0)
+        R = np.tile(scale * min1, (Q.shape[0], 1))
+        R[imin, cols] = scale * min2
+        np.negative(R, out=R, where=flip)
+        
+        # Bit-to-check update + tentative decode
+        Rf = R.ravel()
+        total[:174] = llr + Rf[bit_slots[0]] + Rf[bit_slots[1]] + Rf[bit_slots[2]]
+        hard = total < 0
+        Q = total[chk_bits] - R
+        
+        # Check syndrome (the +inf dummy bit is always 0)
+        if not np.any(np.logical_xor.reduce(hard[chk_bits], axis=0)):
+            decoded = hard[:174].astype(np.int8)
+            # Valid codeword — verify CRC
+            if crc14_ok(decoded):
+                nhard = int(np.sum((llr < 0).astype(int) != decoded))
+                return decoded[:91], nhard
+            else:
+                # Valid codeword but CRC failed (undetectable error pattern)
+                pass
+    
+    return None, -1
+
+# Stagnation stop (as the early exit of WSJT-X bpdecode174_91): a row is
+# given up once its number of unsatisfied checks has not improved on its
+# best for `stall` iterations, after at least STALL_MIN_ITER iterations
+# and while more than STALL_MIN_WEIGHT checks are still unsatisfied.
+STALL_MIN_ITER = 10
+STALL_MIN_WEIGHT = 15
+
+# Sum-product check update in the log domain: with phi(x) = -ln tanh(x/2)
+# (its own inverse), |R| = phi(sum of phi|Q| over the other edges).  phi
+# is read from a table at PHI_STEP resolution; magnitudes above PHI_MAX
+# contribute nothing (phi < 2e-7).
+PHI_STEP = 1.0 / 64
+PHI_MAX = 16.0
+_PHI = -np.log(np.tanh((np.arange(int(PHI_MAX / PHI_STEP) + 1) + 0.5) * PHI_STEP / 2))
+_PHI[-1] = 0.0
+
+def _phi(x, out):
+    """Table lookup of phi(x) for x >= 0 (inf allowed) into out."""
+    idx = (np.minimum(x, PHI_MAX) * (1.0 / PHI_STEP)).astype(np.intp)
+    return np.take(_PHI, idx, out=out)
+
+def _min_excluding(mag, pre, suf, R):
+    """R[k] = min of mag over all edges but k, from prefix/suffix minima."""
+    deg = len(mag)
+    pre[0] = mag[0]
+    suf[-1] = mag[-1]
+    for k in range(1, deg):
+        np.minimum(pre[k-1], mag[k], out=pre[k])
+        np.minimum(suf[deg-k], mag[deg-1-k], out=suf[deg-1-k])
+    R[0] = suf[1]
+    R[-1] = pre[-2]
+    np.minimum(pre[:-2], suf[2:], out=R[1:-1])
+
+def _kernel_min_sum(mag, pre, suf, R, scale, offset):
+    _min_excluding(mag, pre, suf, R)
+    R *= scale
+
+def _kernel_offset_min_sum(mag, pre, suf, R, scale, offset):
+    _min_excluding(mag, pre, suf, R)
+    R -= offset
+    np.maximum(R, 0.0, out=R)
+
+def _kernel_sum_product(mag, pre, suf, R, scale, offset):
+    _phi(mag, out=pre)
+    np.subtract(np.sum(pre, axis=0), pre, out=suf)
+    np.maximum(suf, 0.0, out=suf)
+    _phi(suf, out=R)
+
+# Check-node kernels: magnitude of the check-to-bit messages from the
+# bit-to-check magnitudes; the sign is applied by _check_update().
+CHECK_KERNELS = {
+    'min-sum': _kernel_min_sum,                 # normalized by `scale`
+    'offset-min-sum': _kernel_offset_min_sum,   # minus `offset`, floored at 0
+    'sum-product': _kernel_sum_product,         # exact BP (phi table)
+}
+
+# Default LLR gain per kernel.  The min-sum kernels are scale-invariant
+# up to the offset; sum-product needs LLRs on their true scale, and the
+# demodulator's normalized LLRs (mean |LLR| 2.83) are about 1.5x too
+# small for it around the -8 dB threshold.
+KERNEL_LLR_GAIN = {'sum-product': 1.5}
+
+def _check_update(Q, kernel, scale, offset, mag, pre, suf, R, sgn, neg, par):
+    """Check-to-bit messages R from bit-to-check messages Q.
+    
+    Q and all buffers are (deg, nchk, n) (par (nchk, n)).  The magnitude
+    comes from a CHECK_KERNELS function, the sign is the product of the
+    other edges' signs.  par is left holding the per-check parity."""
+    np.abs(Q, out=mag)
+    np.less(Q, 0, out=neg)
+    np.logical_xor.reduce(neg, axis=0, out=par)
+    np.logical_xor(neg, par, out=neg)
+    if kernel is _kernel_min_sum:
+        # Fold the scale into the sign factor (one pass fewer)
+        _min_excluding(mag, pre, suf, R)
+        np.multiply(neg, -2.0 * scale, out=sgn)
+        sgn += scale
+        R *= sgn
+        return
+    kernel(mag, pre, suf, R, scale, offset)
+    np.negative(R, out=R, where=neg)
+
+def decode_batch(llr, max_iter=50, scale=0.8, schedule='flooding', stall=0,
+                 telemetry=None, kernel='min-sum', offset=0.2, llr_gain=None):
+    """Batched BP (min-sum) decoder for LDPC(174,91).
+    
+    Runs all codewords in lockstep on the edge arrays ldpc.CHK_BITS/BIT_SLOTS,
+    with the batch on the last axis and every work array allocated once.
+    Rows that pass the syndrome and CRC checks are dropped from the
+    working set as soon as they converge.
+    
+    The 'flooding' schedule updates every check from the previous
+    iteration's messages; 'layered' sweeps the check layers of ldpc.LAYERS
+    (checks that share no bit) in turn, each layer seeing the bit totals
+    already updated by the previous ones, and converges in about half the
+    iterations.  The check-node kernel is one of CHECK_KERNELS.
+    
+    Args:
+        llr: channel LLRs (N, 174), positive = bit 0
+        max_iter: max BP iterations
+        scale: min-sum normalization factor
+        schedule: 'flooding' or 'layered'
+        stall: if > 0, give up on a row once its unsatisfied-check count
+               has not improved for this many iterations (see
+               STALL_MIN_ITER / STALL_MIN_WEIGHT); 0 runs all max_iter
+        telemetry: optional telemetry.Telemetry; counts rows that reached a
+                   valid codeword with a bad CRC (once per row) and stalled
+                   rows
+        kernel: 'min-sum' (normalized by scale), 'offset-min-sum' (minus
+                offset) or 'sum-product'
+        offset: offset of the offset-min-sum kernel
+        llr_gain: factor applied to the channel LLRs before decoding
+                  (default KERNEL_LLR_GAIN of the kernel, else 1)
+    
+    Returns:
+        (decoded, nhard, niter): decoded (N, 91) int8 message bits, nhard (N,)
+        hard-decision errors corrected (-1 on failure), niter (N,) iterations
+        run (max_iter, or fewer for stalled rows, on failure)
+    """
+    if schedule not in ('flooding', 'layered'):
+        raise ValueError(f"unknown BP schedule {schedule!r}")
+    if kernel not in CHECK_KERNELS:
+        raise ValueError(f"unknown check-node kernel {kernel!r}")
+    if llr_gain is None:
+        llr_gain = KERNEL_LLR_GAIN.get(kernel, 1.0)
+    kernel = CHECK_KERNELS[kernel]
+    layered = schedule == 'layered'
+    llr = np.atleast_2d(np.asarray(llr, dtype=np.float64))
+    nrows = llr.shape[0]
+    chk_bits, bit_slots = ldpc.CHK_BITS, ldpc.BIT_SLOTS
+    deg, n_chk = chk_bits.shape
+    layer_bits = [chk_bits[:, c] for c in ldpc.LAYERS] if layered else []
+    
+    decoded = np.zeros((nrows, 91), dtype=np.int8)
+    nhard = np.full(nrows, -1, dtype=int)
+    niter = np.full(nrows, max_iter, dtype=int)
+    
+    # Working set, bits × rows.  The +inf dummy bit row keeps the padded
+    # edges from winning the minimum or flipping the sign product.  All
+    # per-iteration work goes through the preallocated buffers: fresh
+    # (7, 83, n) temporaries cost more in page faults than in arithmetic.
+    rows = np.arange(nrows)
+    chan = np.ascontiguousarray(llr.T)
+    if llr_gain != 1.0:
+        chan = chan * llr_gain
+    total = np.vstack([chan, np.full((1, nrows), np.inf)])
+    Q = total[chk_bits]                 # (7, 83, n) bit-to-check messages
+    best = np.full(nrows, n_chk + 1)    # fewest unsatisfied checks so far
+    ncnt = np.zeros(nrows, dtype=int)   # iterations without improving on it
+    rejected = np.zeros(nrows, dtype=bool)  # rows already counted in crc_reject
+    
+    def alloc(n, m=n_chk):
+        shape = (deg, m, n)
+        return (np.empty(shape), np.empty(shape), np.empty(shape),
+                np.empty(shape), np.empty(shape), np.empty(shape, dtype=bool),
+                np.empty((m, n), dtype=bool))
+    
+    def alloc_all(n):
+        # Flooding: one buffer set over all checks.  Layered: one per layer,
+        # plus the layer's check-to-bit messages (kept across iterations).
+        return (alloc(n) + (np.empty((174, n)),),
+                [alloc(n, bits.shape[1]) for bits in layer_bits])
+    
+    (mag, pre, suf, R, sgn, neg, par, tmp), lbufs = alloc_all(nrows)
+    R_layers = [np.zeros((deg, bits.shape[1], nrows)) for bits in layer_bits]
+    
+    for iteration in range(max_iter):
+        if layered:
+            # Layer by layer: extrinsic messages from the current totals,
+            # new check messages, then totals = extrinsic + new message
+            # (the bits of a layer are distinct, so the scatter is exact).
+            for bits, Rl, buf in zip(layer_bits, R_layers, lbufs):
+                Ql = total[bits]
+                Ql -= Rl
+                _check_update(Ql, kernel, scale, offset, buf[0], buf[1], buf[2], Rl,
+                              *buf[4:])
+                Ql += Rl
+                total[bits] = Ql
+            np.take(total, chk_bits, axis=0, out=Q)
+            np.less(Q, 0, out=neg)
+            np.logical_xor.reduce(neg, axis=0, out=par)
+        else:
+            _check_update(Q, kernel, scale, offset, mag, pre, suf, R, sgn, neg, par)
+            
+            # Bit-to-check update + tentative decode
+            Rf = R.reshape(deg * n_chk, -1)
+            np.add(chan, np.take(Rf, bit_slots[0], axis=0, out=tmp), out=total[:174])
+            total[:174] += np.take(Rf, bit_slots[1], axis=0, out=tmp)
+            total[:174] += np.take(Rf, bit_slots[2], axis=0, out=tmp)
+            np.take(total, chk_bits, axis=0, out=Q)
+            
+            # Syndrome per row (the +inf dummy bit is always 0)
+            np.less(Q, 0, out=neg)
+            np.logical_xor.reduce(neg, axis=0, out=par)
+            np.subtract(Q, R, out=Q)
+        valid = ~np.any(par, axis=0)
+        done = np.zeros(len(rows), dtype=bool)
+        
+        # Valid codewords with a good CRC are done; a CRC failure keeps
+        # iterating
+        if np.any(valid):
+            vj = np.flatnonzero(valid)
+            cw = (total[:174, vj] < 0).T.astype(np.int8)
+            good = crc14_ok(cw)
+            if telemetry is not None:
+                bad = vj[~good]
+                telemetry.crc_reject += int(np.sum(~rejected[bad]))
+                rejected[bad] = True
+            jj, cw = vj[good], cw[good]
+            r = rows[jj]
+            decoded[r] = cw[:, :91]
+            nhard[r] = np.sum((chan[:, jj] < 0).T != cw, axis=1)
+            niter[r] = iteration + 1
+            done[jj] = True
+        
+        # Stagnation: rows whose syndrome weight stopped improving fail
+        if stall > 0:
+            w = np.sum(par, axis=0)
+            ncnt = np.where(w < best, 0, ncnt + 1)
+            np.minimum(best, w, out=best)
+            if iteration + 1 >= STALL_MIN_ITER:
+                stuck = (ncnt >= stall) & (w > STALL_MIN_WEIGHT) & ~done
+                if np.any(stuck):
+                    niter[rows[stuck]] = iteration + 1
+                    done |= stuck
+                    if telemetry is not None:
+                        telemetry.bp_stalled += int(np.sum(stuck))
+        
+        if np.any(done):
+            keep = ~done
+            rows = rows[keep]
+            if len(rows) == 0:
+                break
+            chan = chan[:, keep]
+            total = total[:, keep]
+            Q = Q[..., keep]
+            best, ncnt, rejected = best[keep], ncnt[keep], rejected[keep]
+            R_layers = [Rl[..., keep] for Rl in R_layers]
+            (mag, pre, suf, R, sgn, neg, par, tmp), lbufs = alloc_all(len(rows))
+    
+    return decoded, nhard, niter
+
+# ============================================================
+# OSD Decoder (order 1-3 test patterns, CRC-checked)
+# ============================================================
+@lru_cache(maxsize=None)
+def osd_174_91():
+    """Shared OSD for LDPC(174,91), CRC-14 checked (built on first use)."""
+    return OSD(ldpc.GEN_174_91.T, check=crc14_ok)
+
+@lru_cache(maxsize=None)
+def osd_64_32():
+    """Shared OSD for LDPC(64,32), CRC-16 checked (built on first use)."""
+    return OSD(ldpc.P_64_32, check=crc16_ok)
+
+def osd_decode_174_91(llr, order=2, max_candidates=1024, stats=None):
+    """Ordered Statistics Decoding for LDPC(174,91).
+    
+    Test patterns of up to `order` flips over the least reliable MRB
+    positions, at most max_candidates per codeword; see osd.OSD.
+    Returns (cw[:91], nhard) or (None, -1)."""
+    return osd_174_91().decode(llr, order, max_candidates, stats=stats)
+
+def decode_combined(llr, osd_order=2, osd_budget=1024, stats=None):
+    """Try BP first, then OSD as fallback."""
+    result, nhard = bp_decode_174_91(llr, max_iter=40)
+    if result is not None:
+        return result, nhard
+    return osd_decode_174_91(llr, osd_order, osd_budget, stats)
+
+def decode_combined_batch(llr, osd_order=2, osd_budget=1024, stats=None,
+                          return_niter=False, max_iter=40, scale=0.8, schedule='flooding',
+                          stall=0, telemetry=None, kernel='min-sum', offset=0.2,
+                          llr_gain=None):
+    """Batched decode_combined(): BP on all rows, OSD on the BP failures.
+    
+    Returns (decoded, nhard) with decoded (N, 91) and nhard (N,), -1 where
+    both decoders failed; osd_order -1 skips the OSD.  With return_niter
+    the (N,) BP iteration counts are returned as a third element.
+    max_iter, scale, schedule, stall, kernel, offset and llr_gain are the BP
+    settings of decode_batch(); telemetry (telemetry.Telemetry) records BP
+    iterations, CRC rejections, stalls, OSD calls and stage times."""
+    with stage(telemetry, 'bp'):
+        decoded, nhard, niter = decode_batch(llr, max_iter, scale, schedule, stall,
+                                             telemetry, kernel, offset, llr_gain)
+    if telemetry is not None:
+        telemetry.bp(nhard, niter)
+        if stats is None:
+            stats = telemetry.osd
+    fail = np.flatnonzero(nhard < 0)
+    if len(fail) and osd_order >= 0:
+        with stage(telemetry, 'osd'):
+            info, nh = osd_174_91().decode_batch(llr[fail], osd_order, osd_budget,
+                                                 stats=stats)
+        decoded[fail] = info
+        nhard[fail] = nh
+    if return_niter:
+        return decoded, nhard, niter
+    return decoded, nhard
+
+def decode_64_32(llr, order=2, max_candidates=256, stats=None):
+    """OSD decode of one short frame: (info_32, nhard) or (None, -1)."""
+    return osd_64_32().decode(llr, order, max_candidates, stats=stats)
+
+def decode_64_32_batch(llr, order=2, max_candidates=256, stats=None):
+    """(N, 64) short-frame LLRs -> ((N, 32) info bits, (N,) nhard)."""
+    return osd_64_32().decode_batch(llr, order, max_candidates, stats=stats)
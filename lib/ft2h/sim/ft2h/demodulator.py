@@ -0,0 +1,127 @@
+"""
+FT2H 8-GFSK demodulator — tone powers by one matrix multiply, max-log LLRs.
+
+A received block of shape (N, nsamples) is viewed (no copy) as
+(N, nsym, NSPS) symbol rows.  Each contiguous run of data symbols is
+multiplied by a cached real (NSPS, 16) basis holding the cos and -sin
+references of the 8 tones, giving the real and imaginary tone bins of all
+symbols and trials in a single GEMM.  Bit LLRs for the three Gray bit
+positions come from precomputed IGRAY index sets.
+
+demod_standard() / demod_short() give the LLRs of a frame's codeword
+bits.  Their `offset` is the sample where frame symbol 0 is seen by the
+tone filter: PULSE_DELAY symbols for a frame written at sample 0, or the
+offset reported by the sync search (which already includes the delay).
+"""
+
+import numpy as np
+from functools import lru_cache
+from .params import NSPS, FSAMPLE, BAUD, M, PULSE_DELAY, DATA_POS, DATA_POS_S
+
+# Gray demapping: igray[bit_position, tone] = bit_value (matches the
+# corrected igray in ft2h_get_bitmetrics.f90)
+IGRAY = np.array([
+    [0,0,0,0,1,1,1,1],  # Bit 0 (MSB)
+    [0,0,1,1,1,1,0,0],  # Bit 1
+    [0,1,1,0,0,1,1,0],  # Bit 2 (LSB)
+])
+
+# Tones carrying a 0 / a 1 in each bit position, shape (3, 4)
+IGRAY0 = np.array([np.flatnonzero(row == 0) for row in IGRAY])
+IGRAY1 = np.array([np.flatnonzero(row == 1) for row in IGRAY])
+
+
+@lru_cache(maxsize=64)
+def tone_basis(nsps, fsample, f0, baud, m=8):
+    """(nsps, 2m) real basis: cos then -sin of the m tone references."""
+    t = np.arange(nsps) / fsample
+    ph = 2.0 * np.pi * (f0 + np.arange(m)[:, None] * baud) * t
+    basis = np.concatenate([np.cos(ph), -np.sin(ph)]).T.copy()
+    basis.setflags(write=False)
+    return basis
+
+
+def symbol_view(signals, nsps, offset=0):
+    """View (N, nsamples) signals as (N, nsym, nsps) symbol rows, no copy.
+
+    Row k covers samples offset + k*nsps ... offset + (k+1)*nsps - 1; a
+    trailing partial symbol is dropped.
+    """
+    signals = np.atleast_2d(signals)
+    nsym = (signals.shape[1] - offset) // nsps
+    return signals[:, offset:offset + nsym * nsps].reshape(len(signals), nsym, nsps)
+
+
+def tone_powers(signals, positions, nsps, fsample, f0, baud, m=8, offset=0):
+    """Tone powers |sum(seg * exp(-2j*pi*f*t))|**2 at the given symbols.
+
+    Args:
+        signals: (N, nsamples) received blocks
+        positions: symbol indices, counted from `offset` samples in;
+                   symbols past the end of the block get zero power
+        nsps, fsample: samples per symbol and sample rate
+        f0, baud: tone 0 frequency and tone spacing (Hz)
+        m: number of tones
+        offset: sample offset of symbol 0
+
+    Returns:
+        (N, len(positions), m) tone powers
+    """
+    view = symbol_view(signals, nsps, offset)
+    basis = tone_basis(nsps, fsample, f0, baud, m)
+    positions = np.asarray(positions)
+    powers = np.zeros((view.shape[0], len(positions), m))
+
+    # Split into runs of consecutive symbols; each run is a strided view
+    valid = np.flatnonzero(positions < view.shape[1])
+    breaks = np.flatnonzero((np.diff(positions[valid]) != 1) | (np.diff(valid) != 1)) + 1
+    for run in np.split(valid, breaks):
+        if len(run) == 0:
+            continue
+        a = positions[run[0]]
+        y = view[:, a:a + len(run)] @ basis              # (N, run, 2m)
+        np.square(y, out=y)
+        np.add(y[..., :m], y[..., m:], out=powers[:, run[0]:run[-1] + 1])
+    return powers
+
+
+def max_log_llr(powers):
+    """Max-log bit LLRs from tone powers.
+
+    LLR(bit_k) = max(s2 where bit_k=0) - max(s2 where bit_k=1), for the
+    three Gray bit positions of every symbol.
+
+    Args:
+        powers: (..., nsym, 8) tone powers
+
+    Returns:
+        (..., 3*nsym) LLRs, MSB first within each symbol
+    """
+    llr = powers[..., IGRAY0].max(axis=-1)
+    llr -= powers[..., IGRAY1].max(axis=-1)
+    return llr.reshape(powers.shape[:-2] + (-1,))
+
+
+def normalize_llr(llr, scale=2.83):
+    """Scale each frame (last axis) to mean |LLR| = scale, in place."""
+    mean_abs = np.mean(np.abs(llr), axis=-1, keepdims=True)
+    np.divide(llr, mean_abs, out=llr, where=mean_abs > 0)
+    llr *= scale
+    return llr
+
+
+def demod_llr(signals, positions, f0=1500.0, offset=PULSE_DELAY * NSPS):
+    """Normalized max-log LLRs (N, 3*len(positions)) of the given frame
+    symbols, symbol 0 at sample `offset`."""
+    powers = tone_powers(signals, positions, NSPS, FSAMPLE, f0, BAUD, M, offset)
+    return normalize_llr(max_log_llr(powers))
+
+
+def demod_standard(signals, f0=1500.0, offset=PULSE_DELAY * NSPS):
+    """(N, 174) codeword LLRs of standard frames."""
+    return demod_llr(signals, DATA_POS, f0, offset)[:, :174]
+
+
+def demod_short(signals, f0=1500.0, offset=PULSE_DELAY * NSPS):
+    """(N, 64) codeword LLRs of short frames (22 symbols, last one partial)."""
+    return demod_llr(signals, DATA_POS_S, f0, offset)[:, :64]
@@ -0,0 +1,106 @@
+"""
+FT2H transmitter bit chain — payload → CRC → LDPC → Gray map → tones.
+
+Standard frames follow genft2h.f90: the 77 message bits are scrambled
+with RVEC first, then CRC-14 and LDPC(174,91) encoded (encode174_91), so
+the CRC covers the scrambled bits.  Short frames follow ldpc_64_32.f90:
+16 payload bits + CRC-16 → LDPC(64,32).  All functions take a batch of
+messages as an (N, nbits) matrix; the singular forms wrap one message.
+"""
+
+import numpy as np
+from .params import (NN2, NN2_S, ND, ND_S, ICOS8A, ICOS8B, ICOS8S, GRAYMAP8, RVEC)
+from .crc import crc14, crc16, crc_to_bits
+from . import ldpc
+
+
+def scramble(msgs):
+    """XOR (N, 77) message bits with RVEC; its own inverse."""
+    return np.bitwise_xor(msgs, RVEC).astype(np.int8)
+
+
+def gray_tones(codewords, nsym):
+    """Gray-map (N, nbits) codeword bits to (N, nsym) tones, 3 bits per
+    symbol MSB first; a partial last symbol is zero padded."""
+    codewords = np.asarray(codewords, dtype=np.intp)
+    bits = np.zeros((len(codewords), 3 * nsym), dtype=np.intp)
+    bits[:, :codewords.shape[1]] = codewords
+    trip = bits.reshape(len(codewords), nsym, 3)
+    return GRAYMAP8[trip[:, :, 0] * 4 + trip[:, :, 1] * 2 + trip[:, :, 2]]
+
+
+# ============================================================
+# Standard frame: LDPC(174,91)
+# ============================================================
+def encode_174_91(msg77):
+    """Encode 77-bit message → 174-bit LDPC codeword (systematic).
+    Matches encode174_91.f90 (msg77 is used as given, i.e. scrambled)."""
+    msg91 = np.zeros(91, dtype=np.int8)
+    msg91[:77] = msg77
+    msg91[77:] = crc_to_bits(crc14(msg77), 14)
+    return ldpc.CODE_174_91.encode(msg91)
+
+
+def make_standard_frame(msg77):
+    """Encode 77-bit message into standard FT2H frame (76 tones)."""
+    tones, codewords = make_standard_frames(np.asarray(msg77)[None, :])
+    return tones[0], codewords[0]
+
+
+def make_standard_frames(msgs):
+    """Batched make_standard_frame() for a (N, 77) message matrix.
+
+    Returns (tones, codewords) of shapes (N, 76) and (N, 174)."""
+    msgs = np.atleast_2d(msgs)
+    ntx = len(msgs)
+
+    # Scramble, then CRC-14 over the scrambled bits
+    msg91 = np.zeros((ntx, 91), dtype=np.int8)
+    msg91[:, :77] = scramble(msgs)
+    msg91[:, 77:] = crc_to_bits(crc14(msg91[:, :77]), 14)
+    codewords = ldpc.CODE_174_91.encode(msg91)
+    data_syms = gray_tones(codewords, ND)
+
+    # Assemble: r1 + s8 + d29 + s8 + d29 + r1
+    tones = np.zeros((ntx, NN2), dtype=int)
+    tones[:, 1:9] = ICOS8A
+    tones[:, 9:38] = data_syms[:, :29]
+    tones[:, 38:46] = ICOS8B
+    tones[:, 46:75] = data_syms[:, 29:58]
+    return tones, codewords
+
+
+# ============================================================
+# Short frame: LDPC(64,32)
+# ============================================================
+def get_crc16(msgbits_16):
+    """16 payload bits + CRC-16 → 32 info bits ((16,) or (N, 16) input)."""
+    msgbits_16 = np.asarray(msgbits_16)
+    return np.concatenate([msgbits_16.astype(np.int8),
+                           crc_to_bits(crc16(msgbits_16), 16)], axis=-1)
+
+
+def encode_64_32(msgbits_16):
+    """Encode a 16-bit short message → 64-bit codeword (encode_64_32.f90)."""
+    return ldpc.CODE_64_32.encode(get_crc16(msgbits_16))
+
+
+def make_short_frame(msgbits_16):
+    """Encode a 16-bit short message into a short FT2H frame (32 tones)."""
+    tones, codewords = make_short_frames(np.asarray(msgbits_16)[None, :])
+    return tones[0], codewords[0]
+
+
+def make_short_frames(msgs):
+    """Batched make_short_frame() for a (N, 16) message matrix.
+
+    Returns (tones, codewords) of shapes (N, 32) and (N, 64).  The last
+    data symbol carries only bit 64 (as its MSB)."""
+    msgs = np.atleast_2d(msgs)
+    codewords = encode_64_32(msgs)
+
+    # Assemble: r1 + s8 + d22 + r1
+    tones = np.zeros((len(msgs), NN2_S), dtype=int)
+    tones[:, 1:9] = ICOS8S
+    tones[:, 9:31] = gray_tones(codewords, ND_S)
+    return tones, codewords
@@ -0,0 +1,211 @@
+"""
+FT2H LDPC codes — LDPC(174,91) from WSJT-X and the short-frame LDPC(64,32).
+
+LDPC(174,91) is the FT8/FT4 code: generator from
+ldpc_174_91_c_generator.f90, parity-check connectivity (Mn) from
+ldpc_174_91_c_parity.f90, plus the padded edge tables the vectorized BP
+decoders run on.  LDPC(64,32) is the systematic code of ldpc_64_32.f90.
+Both come with a bit-packed PackedCode for encoding and syndromes.
+Everything is built on first access, not at import (see tables()).
+"""
+
+import numpy as np
+from functools import lru_cache
+from .gf2 import PackedCode
+
+# ============================================================
+# LDPC(174,91) — Actual WSJT-X Generator Matrix
+# ============================================================
+# From ldpc_174_91_c_generator.f90 — 83 rows × 91 columns (systematic)
+_G_HEX = [
+    "8329ce11bf31eaf509f27fc", "761c264e25c259335493132",
+    "dc265902fb277c6410a1bdc", "1b3f417858cd2dd33ec7f62",
+    "09fda4fee04195fd034783a", "077cccc11b8873ed5c3d48a",
+    "29b62afe3ca036f4fe1a9da", "6054faf5f35d96d3b0c8c3e",
+    "e20798e4310eed27884ae90", "775c9c08e80e26ddae56318",
+    "b0b811028c2bf997213487c", "18a0c9231fc60adf5c5ea32",
+    "76471e8302a0721e01b12b8", "ffbccb80ca8341fafb47b2e",
+    "66a72a158f9325a2bf67170", "c4243689fe85b1c51363a18",
+    "0dff739414d1a1b34b1c270", "15b48830636c8b99894972e",
+    "29a89c0d3de81d665489b0e", "4f126f37fa51cbe61bd6b94",
+    "99c47239d0d97d3c84e0940", "1919b75119765621bb4f1e8",
+    "09db12d731faee0b86df6b8", "488fc33df43fbdeea4eafb4",
+    "827423ee40b675f756eb5fe", "abe197c484cb74757144a9a",
+    "2b500e4bc0ec5a6d2bdbdd0", "c474aa53d70218761669360",
+    "8eba1a13db3390bd6718cec", "753844673a27782cc42012e",
+    "06ff83a145c37035a5c1268", "3b37417858cc2dd33ec3f62",
+    "9a4a5a28ee17ca9c324842c", "bc29f465309c977e89610a4",
+    "2663ae6ddf8b5ce2bb29488", "46f231efe457034c1814418",
+    "3fb2ce85abe9b0c72e06fbe", "de87481f282c153971a0a2e",
+    "fcd7ccf23c69fa99bba1412", "f0261447e9490ca8e474cec",
+    "4410115818196f95cdd7012", "088fc31df4bfbde2a4eafb4",
+    "b8fef1b6307729fb0a078c0", "5afea7acccb77bbc9d99a90",
+    "49a7016ac653f65ecdc9076", "1944d085be4e7da8d6cc7d0",
+    "251f62adc4032f0ee714002", "56471f8702a0721e00b12b8",
+    "2b8e4923f2dd51e2d537fa0", "6b550a40a66f4755de95c26",
+    "a18ad28d4e27fe92a4f6c84", "10c2e586388cb82a3d80758",
+    "ef34a41817ee02133db2eb0", "7e9c0c54325a9c15836e000",
+    "3693e572d1fde4cdf079e86", "bfb2cec5abe1b0c72e07fbe",
+    "7ee18230c583cccc57d4b08", "a066cb2fedafc9f52664126",
+    "bb23725abc47cc5f4cc4cd2", "ded9dba3bee40c59b5609b4",
+    "d9a7016ac653e6decdc9036", "9ad46aed5f707f280ab5fc4",
+    "e5921c77822587316d7d3c2", "4f14da8242a8b86dca73352",
+    "8b8b507ad467d4441df770e", "22831c9cf1169467ad04b68",
+    "213b838fe2ae54c38ee7180", "5d926b6dd71f085181a4e12",
+    "66ab79d4b29ee6e69509e56", "958148682d748a38dd68baa",
+    "b8ce020cf069c32a723ab14", "f4331d6d461607e95752746",
+    "6da23ba424b9596133cf9c8", "a636bcbc7b30c5fbeae67fe",
+    "5cb0d86a07df654a9089a20", "f11f106848780fc9ecdd80a",
+    "1fbb5364fb8d2c9d730d5ba", "fcb86bc70a50c9d02a5d034",
+    "a534433029eac15f322e34c", "c989d9c7c3d3b8c55d75130",
+    "7bb38b2f0186d46643ae962", "2644ebadeb44b9467d1f42c",
+    "608cc857594bfbb55d69600",
+]
+
+def _parse_gen_matrix():
+    """Parse the WSJT-X generator matrix hex representation."""
+    G = np.zeros((83, 91), dtype=np.int8)
+    for i, hexstr in enumerate(_G_HEX):
+        # Each hex char = 4 bits, 23 chars = 92 bits, use first 91
+        bits = []
+        for ch in hexstr:
+            val = int(ch, 16)
+            bits.extend([(val >> 3) & 1, (val >> 2) & 1, (val >> 1) & 1, val & 1])
+        G[i, :] = np.array(bits[:91], dtype=np.int8)
+    return G
+
+
+# Parity check matrix connectivity from ldpc_174_91_c_parity.f90
+# Mn: for each of 174 bit nodes, 3 connected check nodes
+_MN_DATA = [
+    16,45,73,25,51,62,33,58,78,1,44,45,2,7,61,3,6,54,4,35,48,5,13,21,
+    8,56,79,9,64,69,10,19,66,11,36,60,12,37,58,14,32,43,15,63,80,17,28,77,
+    18,74,83,22,53,81,23,30,34,24,31,40,26,41,76,27,57,70,29,49,65,3,38,78,
+    5,39,82,46,50,73,51,52,74,55,71,72,44,67,72,43,68,78,1,32,59,2,6,71,
+    4,16,54,7,65,67,8,30,42,9,22,31,10,18,76,11,23,82,12,28,61,13,52,79,
+    14,50,51,15,81,83,17,29,60,19,33,64,20,26,73,21,34,40,24,27,77,25,55,58,
+    35,53,66,36,48,68,37,46,75,38,45,47,39,57,69,41,56,62,20,49,53,46,52,63,
+    45,70,75,27,35,80,1,15,30,2,68,80,3,36,51,4,28,51,5,31,56,6,20,37,
+    7,40,82,8,60,69,9,10,49,11,44,57,12,39,59,13,24,55,14,21,65,16,71,78,
+    17,30,76,18,25,80,19,61,83,22,38,77,23,41,50,7,26,58,29,32,81,33,40,73,
+    18,34,48,13,42,64,5,26,43,47,69,72,54,55,70,45,62,68,10,63,67,14,66,72,
+    22,60,74,35,39,79,1,46,64,1,24,66,2,5,70,3,31,65,4,49,58,1,4,5,
+    6,60,67,7,32,75,8,48,82,9,35,41,10,39,62,11,14,61,12,71,74,13,23,78,
+    11,35,55,15,16,79,7,9,16,17,54,63,18,50,57,19,30,47,20,64,80,21,28,69,
+    22,25,43,13,22,37,2,47,51,23,54,74,26,34,72,27,36,37,21,36,63,29,40,44,
+    19,26,57,3,46,82,14,15,58,33,52,53,30,43,52,6,9,52,27,33,65,25,69,73,
+    38,55,83,20,39,77,18,29,56,32,48,71,42,51,59,28,44,79,34,60,62,31,45,61,
+    46,68,77,6,24,76,8,10,78,40,41,70,17,50,53,42,66,68,4,22,72,36,64,81,
+    13,29,47,2,8,81,56,67,73,5,38,50,12,38,64,59,72,80,3,26,79,45,76,81,
+    1,65,74,7,18,77,11,56,59,14,39,54,16,37,66,10,28,55,15,60,70,17,25,82,
+    20,30,31,12,67,68,23,75,80,27,32,62,24,69,75,19,21,71,34,53,61,35,46,47,
+    33,59,76,40,43,83,41,42,63,49,75,83,20,44,48,42,49,57
+]
+
+def _build_parity_check():
+    """Build H matrix (83×174) from Mn connectivity data."""
+    H = np.zeros((83, 174), dtype=np.int8)
+    Mn = np.array(_MN_DATA).reshape(174, 3)
+    for bit in range(174):
+        for chk_idx in Mn[bit]:
+            H[chk_idx - 1, bit] = 1  # 1-indexed → 0-indexed
+    return H, Mn
+
+
+def _build_edge_tables(H_174_91, MN):
+    """Build the fixed edge arrays used by the vectorized BP decoders.
+
+    Edges are stored check-major in a padded (7, 83) array, row k holding
+    edge k of every check; degree-6 checks use the dummy bit index 174.
+    Returns (chk_bits, bit_slots) where chk_bits[k, chk] is the bit on
+    edge k of the check and bit_slots[j, bit] is the flat index of edge j
+    of the bit."""
+    n_chk, n_bit = H_174_91.shape
+    deg = int(np.max(np.sum(H_174_91, axis=1)))
+    chk_bits = np.full((deg, n_chk), n_bit, dtype=np.intp)
+    bit_slots = np.zeros(MN.T.shape, dtype=np.intp)
+    fill = np.zeros(n_chk, dtype=np.intp)
+    for bit in range(n_bit):
+        for j, chk in enumerate(MN[bit] - 1):
+            chk_bits[fill[chk], chk] = bit
+            bit_slots[j, bit] = fill[chk] * n_chk + chk
+            fill[chk] += 1
+    return chk_bits, bit_slots
+
+
+def _build_layers(chk_bits, n_bit):
+    """Split the checks into layers that share no bit (greedy colouring).
+
+    Checks of one layer touch disjoint bits, so a layered BP schedule can
+    update a whole layer at once.  Returns a tuple of check index arrays."""
+    layers, used = [], []
+    for chk in range(chk_bits.shape[1]):
+        bits = set(chk_bits[:, chk].tolist()) - {n_bit}
+        for layer, seen in zip(layers, used):
+            if not bits & seen:
+                layer.append(chk)
+                seen |= bits
+                break
+        else:
+            layers.append([chk])
+            used.append(bits)
+    return tuple(np.array(layer, dtype=np.intp) for layer in layers)
+
+
+# ============================================================
+# LDPC(64,32) — short frames (ldpc_64_32.f90)
+# ============================================================
+# Parity bit i = sum_j infobits(j) * bit j of gen_hex(i), MSB = j=1
+_G64_HEX = [
+    0xD52B4A93, 0x6A954B29, 0x534D259A, 0x29A692CD,
+    0x8C5336A5, 0x46299B52, 0xA394CD69, 0x51CA66B4,
+    0x93254CD3, 0x49928A69, 0xA4C94534, 0xD264A29A,
+    0xE9B2514D, 0x74D928A6, 0xBA6C9453, 0x5D3642A9,
+    0x1B596CE4, 0x0DAC3672, 0x86D61B39, 0xC36B0D9C,
+    0xE1B586CE, 0x70DAC367, 0xB86D61B3, 0xDC36B0D9,
+    0x6E1B586C, 0x370DAC36, 0x9B86D61B, 0xCDC36B0D,
+    0xE6E1B586, 0x73709AC3, 0x39B84D61, 0x9CDC26B0,
+]
+
+def _parse_gen_64_32():
+    """(32, 32) parity part P, codeword = [info, info @ P mod 2]."""
+    shifts = np.arange(31, -1, -1)
+    rows = (np.array(_G64_HEX, dtype=np.int64)[:, None] >> shifts) & 1   # (parity, info)
+    return rows.T.astype(np.int8)
+
+# ============================================================
+# Lazy tables
+# ============================================================
+@lru_cache(maxsize=None)
+def tables():
+    """All code tables, built on first use (a few ms) and kept.
+
+    GEN_174_91 (83 × 91), H_174_91 (83 × 174), MN (174 × 3), the BP edge
+    tables CHK_BITS / BIT_SLOTS, the check LAYERS of the layered BP
+    schedule, P_64_32 (32 × 32), and the bit-packed
+    encoders CODE_174_91 (codeword = [msg91, msg91 @ G^T]) and CODE_64_32.
+    They are also module attributes (ldpc.GEN_174_91, ...), resolved
+    through this function, so importing the module costs nothing.
+    """
+    gen = _parse_gen_matrix()
+    H, Mn = _build_parity_check()
+    chk_bits, bit_slots = _build_edge_tables(H, Mn)
+    layers = _build_layers(chk_bits, H.shape[1])
+    p64 = _parse_gen_64_32()
+    t = dict(GEN_174_91=gen, H_174_91=H, MN=Mn, CHK_BITS=chk_bits, BIT_SLOTS=bit_slots,
+             LAYERS=layers, P_64_32=p64, CODE_174_91=PackedCode(gen.T, H=H),
+             CODE_64_32=PackedCode(p64))
+    for a in (*t.values(), *layers):
+        if isinstance(a, np.ndarray):
+            a.setflags(write=False)
+    return t
+
+
+def __getattr__(name):
+    if name in _TABLE_NAMES:
+        return tables()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_TABLE_NAMES = ('GEN_174_91', 'H_174_91', 'MN', 'CHK_BITS', 'BIT_SLOTS', 'LAYERS',
+                'P_64_32', 'CODE_174_91', 'CODE_64_32')
@@ -0,0 +1,200 @@
+"""
+FT2H end-to-end link simulation — encode, modulate, AWGN, demod, decode.
+
+standard_counts(), receiver_counts() and short_counts() are the Monte
+Carlo work units of both simulator CLIs: they match the ft2h.sweep.run_sweep() signature
+unit_fn(snr_db, ntrials, rng) (extra options via functools.partial) and
+return raw counts, so a sweep can merge chunks exactly.  Trials run in
+blocks of `chunk` frames through the batched stages, which bounds memory.
+"""
+
+import time
+import numpy as np
+from .params import NSPS, BAUD, NN2, NN2_S, NMAX, PULSE_DELAY
+from .encoder import make_standard_frames, make_short_frames, scramble, get_crc16
+from .modulator import gen_wave_batch
+from .channel import add_awgn, awgn_slot
+from .demodulator import demod_standard, demod_short
+from .sync import sync_demod_standard
+from .receiver import receive_standard, NSEQ
+from .decoder import decode_combined_batch, decode_64_32_batch
+from .telemetry import Telemetry, stage
+
+# Short frames carry a fixed RR73 confirmation (code = 1)
+RR73 = np.zeros(16, dtype=np.int8)
+RR73[15] = 1
+
+
+def standard_counts(snr_db, ntrials, rng=None, f0=1500.0, chunk=128, sync=False,
+                    convention='wsjtx', osd_order=2, osd_budget=1024, stats=None,
+                    bp_max_iter=40, bp_scale=0.8, bp_schedule='flooding', bp_stall=0,
+                    bp_kernel='min-sum', bp_offset=0.2, telemetry=False):
+    """Run standard-frame trials, return (n_ok, n_bit_err, n_bp_iter).
+
+    Args:
+        snr_db: SNR in 2500 Hz bandwidth (dB), see channel.py
+        ntrials: number of frames
+        rng: numpy Generator for messages and noise (fresh if None)
+        f0: carrier frequency of tone 0 (Hz)
+        chunk: frames per block
+        sync: place each frame at a random delay in an NMAX-sample slot and
+              demodulate where the sync search finds it, instead of at the
+              known timing and frequency
+        convention: SNR convention of channel.channel_scales()
+        osd_order, osd_budget: OSD fallback (order -1 = BP only)
+        stats: optional osd.OSDStats to accumulate
+        bp_max_iter, bp_scale: BP iteration cap and min-sum normalization
+        bp_schedule, bp_stall: 'flooding' or 'layered' BP, and the
+                   stagnation limit of decoder.decode_batch() (0 = off)
+        bp_kernel, bp_offset: check-node kernel (decoder.CHECK_KERNELS) and
+                   the offset of 'offset-min-sum'
+        telemetry: also collect a telemetry.Telemetry (decoder counters and
+                   per-stage time) and return it as a fourth count
+
+    Failed decodes count all 77 bits as errors; n_bp_iter is the number of
+    BP iterations spent on all frames.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    tel = Telemetry() if telemetry else None
+    n_ok = 0
+    n_bit_err = 0
+    n_bp_iter = 0
+    nwave = (NN2 + 2) * NSPS
+    wave = np.empty((min(chunk, ntrials), nwave))
+    work = np.empty((len(wave), NN2 + 2, NSPS))
+    noise = np.empty((len(wave), NMAX if sync else nwave))
+
+    for start in range(0, ntrials, chunk):
+        ntx = min(chunk, ntrials - start)
+        msgs = rng.integers(0, 2, (ntx, 77), dtype=np.int8)
+
+        with stage(tel, 'encode'):
+            tones, _ = make_standard_frames(msgs)
+        with stage(tel, 'modulate'):
+            rx = gen_wave_batch(tones, f0=f0, out=wave[:ntx], work=work[:ntx])
+        if sync:
+            with stage(tel, 'channel'):
+                slots, _ = awgn_slot(rx, snr_db, rng, NMAX, convention, noise[:ntx])
+            with stage(tel, 'sync_demod'):
+                llr = sync_demod_standard(slots, f0)
+        else:
+            with stage(tel, 'channel'):
+                add_awgn(rx, snr_db, rng, convention, noise[:ntx])
+            with stage(tel, 'demod'):
+                llr = demod_standard(rx, f0)
+
+        decoded, nhard, niter = decode_combined_batch(
+            llr, osd_order, osd_budget, stats, return_niter=True,
+            max_iter=bp_max_iter, scale=bp_scale, schedule=bp_schedule, stall=bp_stall,
+            kernel=bp_kernel, offset=bp_offset, telemetry=tel)
+        n_bp_iter += int(np.sum(niter))
+
+        # Descramble; failed rows count all 77 bits as errors
+        bit_err = np.sum(scramble(decoded[:, :77]) != msgs, axis=1)
+        bit_err[nhard < 0] = 77
+        n_ok += int(np.sum(bit_err == 0))
+        n_bit_err += int(np.sum(bit_err))
+
+    if tel is not None:
+        return n_ok, n_bit_err, n_bp_iter, tel
+    return n_ok, n_bit_err, n_bp_iter
+
+
+def receiver_counts(snr_db, ntrials, rng=None, fmin=200.0, fmax=2600.0, maxcand=20,
+                    chunk=32, convention='wsjtx', osd_order=2, osd_budget=1024,
+                    bp_max_iter=40, bp_scale=0.8, bp_schedule='flooding', bp_stall=0,
+                    bp_kernel='min-sum', bp_offset=0.2, nseq=NSEQ, telemetry=False):
+    """Run full-receiver trials, return
+    (n_ok, n_bit_err, n_bp_iter, n_sync, n_false, us_decode).
+
+    Each trial is one NMAX-sample slot holding a standard frame at a
+    random delay and a random tone-0 frequency in [fmin, fmax], decoded by
+    receiver.receive_standard() with no knowledge of either.
+
+    Args:
+        snr_db, ntrials, rng, convention: as in standard_counts()
+        fmin, fmax: range of transmitted tone-0 frequencies (Hz); the
+                    receiver searches it widened by one tone on each side
+        maxcand: candidates decoded per slot
+        chunk: slots per block
+        osd_order, osd_budget, bp_*: decoder settings, as in standard_counts()
+        nseq: bit metric(s) of receiver.decode_candidates()
+        telemetry: also collect a telemetry.Telemetry (receiver stage times
+                   and decoder counters) and return it as a seventh count
+
+    n_sync counts slots with a candidate within half a tone and half a
+    symbol of the frame (sync hits, decoded or not), n_false the decoded
+    messages other than the one sent, us_decode the receiver's wall time
+    in microseconds (so a cached chunk reports the time it took when it
+    was run).  n_bp_iter is the BP iterations spent on all candidates.
+    The receiver only returns messages that pass the CRC, so a missed
+    frame has no payload to compare: bit errors are not measured and
+    n_bit_err is always 0 (kept so the counts line up with
+    standard_counts()); report WER only.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    tel = Telemetry() if telemetry else None
+    bp = dict(max_iter=bp_max_iter, scale=bp_scale, schedule=bp_schedule, stall=bp_stall,
+              kernel=bp_kernel, offset=bp_offset, nseq=nseq)
+    n_ok = n_sync = n_false = n_bp_iter = 0
+    us_decode = 0
+    wave = np.empty((min(chunk, ntrials), (NN2 + 2) * NSPS))
+    work = np.empty((len(wave), NN2 + 2, NSPS))
+    noise = np.empty((len(wave), NMAX))
+
+    for start in range(0, ntrials, chunk):
+        ntx = min(chunk, ntrials - start)
+        msgs = rng.integers(0, 2, (ntx, 77), dtype=np.int8)
+        f0 = rng.uniform(fmin, fmax, ntx)
+
+        with stage(tel, 'encode'):
+            tones, _ = make_standard_frames(msgs)
+        with stage(tel, 'modulate'):
+            rx = gen_wave_batch(tones, f0=f0, out=wave[:ntx], work=work[:ntx])
+        with stage(tel, 'channel'):
+            slots, delay = awgn_slot(rx, snr_db, rng, NMAX, convention,
+                                     noise[:ntx])
+        offset = delay + PULSE_DELAY * NSPS
+
+        for n in range(ntx):
+            t0 = time.perf_counter()
+            found, _, cand = receive_standard(slots[n], fmin - BAUD, fmax + BAUD, maxcand,
+                                              osd_order=osd_order, osd_budget=osd_budget,
+                                              telemetry=tel, **bp)
+            us_decode += int(1e6 * (time.perf_counter() - t0))
+            hit = np.all(found == msgs[n], axis=1)
+            n_ok += int(np.any(hit))
+            n_false += int(np.sum(~hit))
+            n_sync += int(np.any((np.abs(cand[:, 0] - f0[n]) < BAUD / 2) &
+                                 (np.abs(cand[:, 1] - offset[n]) < NSPS / 2)))
+            n_bp_iter += int(np.sum(cand[:, 3]))
+
+    counts = (n_ok, 0, n_bp_iter, n_sync, n_false, us_decode)
+    return counts + (tel,) if tel is not None else counts
+
+
+def short_counts(snr_db, ntrials, rng=None, f0=1500.0, chunk=128, convention='wsjtx',
+                 msg=RR73):
+    """Run short-frame trials of the 16-bit message `msg`, return (n_ok,).
+
+    Arguments as in standard_counts(); timing and frequency are known."""
+    if rng is None:
+        rng = np.random.default_rng()
+    n_ok = 0
+    info = get_crc16(msg)
+    wave = np.empty((min(chunk, ntrials), (NN2_S + 2) * NSPS))
+    work = np.empty((len(wave), NN2_S + 2, NSPS))
+    noise = np.empty_like(wave)
+
+    for start in range(0, ntrials, chunk):
+        ntx = min(chunk, ntrials - start)
+        tones, _ = make_short_frames(np.tile(msg, (ntx, 1)))
+        rx = gen_wave_batch(tones, f0=f0, out=wave[:ntx], work=work[:ntx])
+        add_awgn(rx, snr_db, rng, convention, noise[:ntx])
+
+        decoded, nhard = decode_64_32_batch(demod_short(rx, f0))
+        n_ok += int(np.sum((nhard >= 0) & np.all(decoded == info, axis=1)))
+
+    return (n_ok,)
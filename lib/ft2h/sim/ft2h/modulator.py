@@ -0,0 +1,185 @@
+"""
+FT2H 8-GFSK modulator — cached pulse tables, batched synthesis.
+
+The Gaussian frequency pulse spans 3 symbols, so the phase advance inside
+output symbol block k depends only on the tone triple (t[k-2], t[k-1], t[k])
+and the carrier.  GFSKModulator tabulates the cumulative in-block phase
+for all 8**3 triples once per (NSPS, BT, HMOD, fs), and its sin/cos once
+per carrier (the last CARRIER_TABLES carriers are kept).  A batch of frames is then a cumsum over the nsym+2 block
+start phases plus two table gathers combined with the angle-sum identity,
+so no transcendental is evaluated per sample.  A batch with a different
+carrier per frame instead uses the carrier-free tables and evaluates the
+carrier phase per sample (two trig calls per sample, still far cheaper
+than rebuilding the tables for every frame).
+
+gen_wave() / gen_wave_batch() are the FT2H modulator (gen_ft2h_wave.f90)
+on the shared instance for the mode parameters.
+"""
+
+import math
+import numpy as np
+from functools import lru_cache
+from .params import NSPS, FSAMPLE, BT, HMOD
+
+CARRIER_TABLES = 8      # sin/cos table pairs kept per modulator (~2.4 MB each)
+
+
+# Elementwise math.erfc: the pulse table has only 3*NSPS points, and this
+# keeps scipy (~0.4 s to import) out of every simulator process
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def gfsk_pulse(bt, t):
+    """Gaussian frequency pulse shape. Matches WSJT-X gfsk_pulse()."""
+    c = np.pi * np.sqrt(2.0 / np.log(2.0))
+    t = np.asarray(t, dtype=np.float64)
+    diff = _erfc(c * bt * (t - 0.5)) - _erfc(c * bt * (t + 0.5))
+    return 0.5 * np.asarray(diff, dtype=np.float64)
+
+
+class GFSKModulator:
+    """8-GFSK waveform generator for fixed (nsps, bt, hmod, fsample).
+
+    Matches gen_ft2h_wave.f90: 3-symbol Gaussian pulse, phase integrated
+    sample by sample, cosine-squared ramp on the first and last symbol.
+    Use gfsk_modulator() to get a shared, cached instance: modulate()
+    keeps no per-call state on it (scratch is allocated per call or
+    passed in), so threads may share it.
+    """
+
+    def __init__(self, nsps, bt=1.0, hmod=1.0, fsample=12000.0, m=8,
+                 dtype=np.float64):
+        self.nsps = nsps
+        self.fsample = fsample
+        self.m = m
+        self.dtype = np.dtype(dtype)
+        twopi = 2.0 * np.pi
+
+        t = (np.arange(3 * nsps) - 1.5 * nsps) / nsps
+        p = (twopi * hmod / nsps * gfsk_pulse(bt, t)).reshape(3, nsps)
+
+        # Block k phase increment is t[k-2]*p[2] + t[k-1]*p[1] + t[k]*p[0];
+        # tabulate its running sum for every triple, index 64*a + 8*b + c.
+        cp = np.cumsum(p, axis=1)
+        tone = np.arange(m, dtype=np.float64)
+        local = (tone[:, None, None, None] * cp[2] +
+                 tone[None, :, None, None] * cp[1] +
+                 tone[None, None, :, None] * cp[0])
+        self.local = local.reshape(m ** 3, nsps)
+        self.total = self.local[:, -1].copy()
+
+        ramp = np.cos(twopi * np.arange(nsps) / (2.0 * nsps)) / 2.0
+        self.ramp_up = (0.5 - ramp).astype(self.dtype)
+        self.ramp_down = (0.5 + ramp).astype(self.dtype)
+        self.carrier = np.arange(1, nsps + 1, dtype=np.float64)
+
+        self._carriers = {}     # {f0: (sin, cos)}, oldest first
+
+    def _tables(self, f0):
+        """sin/cos of the in-block phase for carrier f0."""
+        tables = self._carriers.get(f0)
+        if tables is None:
+            w = 2.0 * np.pi * f0 / self.fsample
+            phase = self.local + w * self.carrier
+            tables = (np.sin(phase).astype(self.dtype), np.cos(phase).astype(self.dtype))
+            while len(self._carriers) >= CARRIER_TABLES:
+                self._carriers.pop(next(iter(self._carriers)), None)
+            self._carriers[f0] = tables
+        return tables
+
+    def modulate(self, tones, f0, out=None, analytic=False, work=None):
+        """Synthesize waveforms for a (N, nsym) batch of tone sequences.
+
+        Args:
+            tones: (N, nsym) integer tones 0..m-1 (a 1-D array is one frame)
+            f0: carrier frequency of tone 0 (Hz), or (N,) one per frame
+            out: optional (N, (nsym+2)*nsps) buffer of the modulator dtype
+                 (its complex counterpart if analytic)
+            analytic: return the complex exp(1j*phase) instead of the real
+                      sin(phase) (whose imaginary part it is), as the
+                      complex reference of gen_ft2h_wave.f90
+            work: optional (N, nsym+2, nsps) scratch buffer of the modulator
+                  dtype, reused by callers that modulate many batches
+
+        Returns:
+            (N, (nsym+2)*nsps) waveforms (out, if given)
+        """
+        tones = np.atleast_2d(tones)
+        ntx, nsym = tones.shape
+        nb = nsym + 2
+        nsps = self.nsps
+        m = self.m
+
+        tp = np.zeros((ntx, nsym + 4), dtype=np.intp)
+        tp[:, 2:nsym+2] = tones
+        idx = m * m * tp[:, :-2] + m * tp[:, 1:-1] + tp[:, 2:]
+
+        # Phase at the start of each block
+        per_row = np.ndim(f0) > 0
+        w = 2.0 * np.pi * np.asarray(f0, dtype=np.float64) / self.fsample
+        if per_row:
+            w = w.reshape(ntx, 1)
+        start = np.empty((ntx, nb))
+        start[:, 0] = 0.0
+        np.cumsum(self.total[idx[:, :-1]] + w * nsps, axis=1, out=start[:, 1:])
+        np.mod(start, 2.0 * np.pi, out=start)
+
+        if out is None:
+            dtype = np.result_type(self.dtype, np.complex64) if analytic else self.dtype
+            out = np.empty((ntx, nb * nsps), dtype=dtype)
+        if work is None:
+            work = np.empty((ntx, nb, nsps), dtype=self.dtype)
+        wave = out.reshape(ntx, nb, nsps)
+
+        # sin(start + local) = sin(local)*cos(start) + cos(local)*sin(start),
+        # with the carrier in `local` or, per row, added to `start`
+        if per_row:
+            tsin, tcos = self._tables(0.0)
+            start = start[:, :, None] + w[:, :, None] * self.carrier
+        else:
+            tsin, tcos = self._tables(float(f0))
+            start = start[:, :, None]
+        if analytic:
+            # cos(start + local) = cos(local)*cos(start) - sin(local)*sin(start)
+            cos_s = np.cos(start).astype(self.dtype)
+            sin_s = np.sin(start).astype(self.dtype)
+            np.take(tsin, idx, axis=0, out=work, mode='clip')
+            wave.imag = work * cos_s
+            wave.real = -work * sin_s
+            np.take(tcos, idx, axis=0, out=work, mode='clip')
+            wave.imag += work * sin_s
+            wave.real += work * cos_s
+        else:
+            np.take(tsin, idx, axis=0, out=wave, mode='clip')
+            wave *= np.cos(start).astype(self.dtype)
+            np.take(tcos, idx, axis=0, out=work, mode='clip')
+            work *= np.sin(start).astype(self.dtype)
+            wave += work
+
+        wave[:, 0] *= self.ramp_up
+        wave[:, -1] *= self.ramp_down
+        return out
+
+
+@lru_cache(maxsize=None)
+def gfsk_modulator(nsps, bt=1.0, hmod=1.0, fsample=12000.0, dtype='float64'):
+    """Shared GFSKModulator for the given parameters (built once)."""
+    return GFSKModulator(nsps, bt, hmod, fsample, dtype=dtype)
+
+
+def gen_wave(tones, f0=1500.0, nsps=NSPS, fsample=FSAMPLE):
+    """8-GFSK waveform of one tone sequence; matches gen_ft2h_wave.f90."""
+    return gen_wave_batch(np.asarray(tones)[None, :], f0, nsps=nsps, fsample=fsample)[0]
+
+
+def gen_wave_batch(tones, f0=1500.0, out=None, dtype='float64', nsps=NSPS,
+                   fsample=FSAMPLE, analytic=False, work=None):
+    """8-GFSK waveforms for a (N, nsym) batch of tone sequences.
+
+    Returns (N, (nsym+2)*nsps) samples, row for row equal to gen_wave();
+    out and work may be reusable output and (N, nsym+2, nsps) scratch
+    buffers, dtype 'float64' or 'float32'.  f0 may give one carrier per
+    frame; analytic returns the complex exp(1j*phase) waveforms."""
+    return gfsk_modulator(nsps, BT, HMOD, fsample, dtype).modulate(tones, f0, out=out,
+                                                                   analytic=analytic,
+                                                                   work=work)
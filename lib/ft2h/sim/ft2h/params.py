@@ -0,0 +1,57 @@
+"""
+FT2H mode parameters — must match ft2h_params.f90 and genft2h.f90.
+"""
+
+import numpy as np
+
+NSPS = 576              # Samples per symbol at 12000 S/s
+FSAMPLE = 12000.0       # Sample rate
+BAUD = FSAMPLE / NSPS   # 20.833 Bd
+HMOD = 1.0              # Modulation index
+BT = 1.0                # Gaussian filter bandwidth-time product
+M = 8                   # 8-FSK
+BITS_PER_SYM = 3        # log2(8)
+
+# The 3-symbol GFSK pulse centres tone k in output block k+1 (the first
+# block is the ramp-up), so a frame written at sample 0 has its symbol 0
+# at PULSE_DELAY symbols as seen by a per-symbol tone filter.
+PULSE_DELAY = 1
+
+# Standard frame: r1 + s8 + d29 + s8 + d29 + r1
+ND = 58                 # Data symbols (174/3)
+NS = 16                 # Sync symbols (2 × 8 Costas)
+NN = NS + ND            # 74 channel symbols
+NN2 = NN + 2            # 76 total with ramp
+NMAX = 48000            # 4.0 s buffer
+NSTEP = NSPS // 4       # Coarse sync time step
+NFFT1 = 2 * NSPS        # Symbol spectra FFT length (2 bins per tone)
+
+# Short frame: r1 + s8 + d22 + r1
+ND_S = 22               # Data symbols (ceil(64/3))
+NS_S = 8                # Sync symbols (1 × 8 Costas)
+NN_S = NS_S + ND_S      # 30 channel symbols
+NN2_S = NN_S + 2        # 32 total with ramp
+NMAX_S = 19200          # 1.6 s buffer
+
+# Costas sync arrays
+ICOS8A = np.array([2, 5, 6, 0, 4, 1, 3, 7])
+ICOS8B = np.array([4, 7, 2, 3, 0, 6, 1, 5])
+ICOS8S = np.array([1, 3, 7, 2, 5, 0, 6, 4])
+
+# Frame symbol positions of the data and of the (symbol, tone) sync pairs
+DATA_POS = np.r_[9:38, 46:75]
+DATA_POS_S = np.arange(9, 31)
+SYNC_MAP = [(1 + i, int(t)) for i, t in enumerate(ICOS8A)] + \
+           [(38 + i, int(t)) for i, t in enumerate(ICOS8B)]
+SYNC_MAP_S = [(1 + i, int(t)) for i, t in enumerate(ICOS8S)]
+
+# Gray mapping: binary value → tone, and its inverse
+GRAYMAP8 = np.array([0, 1, 3, 2, 7, 6, 4, 5])
+GRAY_INV = np.argsort(GRAYMAP8)
+
+# Scrambling vector (from genft2h.f90 — same as FT4)
+RVEC = np.array([0,1,0,0,1,0,1,0,0,1,0,1,1,1,1,0,1,0,0,0,1,0,0,1,1,0,1,1,0,
+                 1,0,0,1,0,1,1,0,0,0,0,1,0,0,0,1,0,1,0,0,1,1,1,1,0,0,1,0,1,
+                 0,1,0,1,0,1,1,0,1,1,1,1,1,0,0,0,1,0,1], dtype=np.int8)
+
+__all__ = [name for name in dict(globals()) if name.isupper()]
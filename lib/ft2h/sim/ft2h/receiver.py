@@ -0,0 +1,596 @@
+"""
+FT2H receiver — candidate search, baseband fine sync, demod and decode of
+a whole 4 s slot, with nothing known about the signals in it.
+
+    candidates   sync.sync_candidates_multi() (ft2h_getcandidates.f90),
+                 both frame types on one spectrogram, ranked, with
+                 non-maximum suppression
+    downsample   one real FFT of the slot; per candidate the band around
+                 its frequency, windowed, inverse FFT to NSS samples per
+                 symbol (ft2h_downsample.f90)
+    fine sync    Costas correlation over a grid of lags and frequency
+                 tweaks around the coarse estimate (sync_ft2h.f90), then
+                 a finer data-aided search on all 74 symbols
+    demod        tone bins of the data symbols at baseband by one DFT
+                 matmul, max-log LLRs over 3-symbol coherent sequences
+                 (bitmetrics.py, ft2h_get_bitmetrics.f90)
+    decode       BP + OSD on all candidates at once, duplicates dropped
+    subtract     decoded frames regenerated and removed from the slot, and
+                 the search run again on the residual (subtractft8.f90)
+
+All candidates of a slot go through each step as one batch.  The fine
+sync gathers the 16 Costas symbols of every lag into a (16, K*L, NSS)
+array and correlates them with the (16, NSS, F) tweaked tone references
+in a single batched matmul.  Unlike sync_ft2h.f90, which sums each sync
+symbol as is (tone 0 only), each symbol is correlated with its own
+Costas tone.  The 16 sync symbols alone leave ~1 Hz of frequency error
+at -8 dB, which costs a quarter of the decodes, so the estimate is then
+refined on the strongest tone of every symbol (halves the error).
+
+subtract() follows subtractft8.f90 rather than subtractft2h.f90, which
+removes a unit-amplitude replica: the complex amplitude of each decoded
+frame is measured against its analytic replica and low-pass filtered,
+which also absorbs the residual frequency and phase error of the sync.
+receive_sic() alternates decoding and subtraction for a number of passes.
+"""
+
+from functools import lru_cache
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .params import (NSPS, FSAMPLE, BAUD, M, NN2, NN2_S, DATA_POS, DATA_POS_S,
+                     SYNC_MAP, SYNC_MAP_S, PULSE_DELAY)
+from .encoder import scramble, make_standard_frames, make_short_frames
+from .modulator import gen_wave_batch
+from .demodulator import normalize_llr
+from .bitmetrics import symbol_spectra, bitmetrics
+from .sync import sync_candidates_multi
+from .decoder import decode_combined_batch, decode_64_32_batch, osd_174_91
+from .telemetry import Telemetry, stage
+
+NDOWN = 18                      # Downsample factor (ft2h_params.f90)
+NSS = NSPS // NDOWN             # 32 samples per symbol at baseband
+FS_DOWN = FSAMPLE / NDOWN       # 666.67 S/s
+
+# The slot is zero padded to NFFT_DOWN = NDOWN * NDOUT samples before the
+# forward FFT: NMAX / NDOWN is not an integer, and with ft2h_downsample's
+# NMAX-point FFT the baseband time scale is off by 1/4000 (0.6 baseband
+# samples over a frame).  2688 = 2^7 * 3 * 7 is also a fast FFT length.
+NDOUT = 2688
+NFFT_DOWN = NDOWN * NDOUT       # 48384
+
+# Pass band of the downsampler around tone 0 (Hz): flat over the 8 tones
+# and half a tone beyond (the fine sync moves the frequency by up to a
+# quarter tone), cos^2 taper over another half tone, as the window of
+# ft4_downsample.f90 (ft2h_downsample.f90 keeps all NDOUT bins, so
+# neighbouring signals up to 333 Hz away reach the sync and demod)
+DS_BAND = (-0.5 * BAUD, (M - 0.5) * BAUD, 0.5 * BAUD)
+
+# Fine sync grid: lags of one baseband sample (NSPS/NSS full-rate samples)
+# around the coarse offset, whose step is NSS/4, and frequency tweaks
+# across one coarse bin (FSAMPLE/NFFT1 = 10.4 Hz).
+FINE_LAGS = np.arange(-8, 9)
+FINE_TWEAKS = np.arange(-5.5, 5.75, 0.5)
+REFINE_LAGS = np.arange(-2, 3)
+REFINE_TWEAKS = np.arange(-2.0, 2.125, 0.25)
+
+# Frame types: Costas (symbol, tone) pairs, symbols with ramps, data
+# symbol positions, codeword bits, payload bits, default OSD budget
+FRAMES = {
+    'standard': (SYNC_MAP, NN2, DATA_POS, 174, 77, 1024),
+    'short': (SYNC_MAP_S, NN2_S, DATA_POS_S, 64, 16, 256),
+}
+ENCODERS = {'standard': make_standard_frames, 'short': make_short_frames}
+
+# Symbols per bit metric: the 3-symbol coherent metric gains ~1.5 dB on
+# the single-symbol one for standard frames and ~1 dB for short ones
+# (the GFSK pulse spreads each tone over 3 symbols), at ~0.1 ms a
+# candidate
+NSEQ = 3
+
+# Low-pass filter of the subtraction's amplitude estimate: a triangle
+# of NFILT samples (4 symbols), narrow enough to follow the frequency
+# error left by the fine sync (~0.5 Hz), wide enough to average the noise.
+NFILT = 4 * NSPS
+
+# Trial shifts (samples) of subtract()'s DT refinement, half a baseband
+# sample apart; fine_sync() offsets run late by ~NDOWN/3, hence one more
+# early than late.
+SUB_SHIFTS = (NDOWN // 2) * np.arange(-2, 2)
+
+
+@lru_cache(maxsize=4)
+def _band(flat, taper):
+    """(offsets, weights) of the downsample() pass band: the FFT bins from
+    flat[0] - taper to flat[1] + taper Hz around tone 0 (flat[0] < 0 <
+    flat[1]), weight 1 in the flat part and a cos^2 taper outside it."""
+    df = FSAMPLE / NFFT_DOWN
+    lo, hi = int(np.floor((flat[0] - taper) / df)), int(np.ceil((flat[1] + taper) / df))
+    offsets = np.arange(lo, hi + 1)
+    f = offsets * df
+    edge = np.maximum(flat[0] - f, f - flat[1]).clip(0.0) / taper
+    weights = np.where(edge < 1.0, np.cos(0.5 * np.pi * np.minimum(edge, 1.0)) ** 2, 0.0)
+    keep = weights > 0
+    return offsets[keep], weights[keep]
+
+
+def downsample(slot, freqs, spectrum=None, band=DS_BAND):
+    """Complex baseband of a slot around each frequency (ft2h_downsample.f90).
+
+    The FFT bins of the band around each frequency (rounded to the bin
+    spacing FSAMPLE/NFFT_DOWN) are cut from the real FFT of the
+    zero-padded slot, weighted, placed in an NDOUT-bin spectrum and
+    inverse transformed; bins outside 0..Nyquist are zero.  All
+    candidates share the forward FFT and go through one batched NDOUT-point
+    inverse FFT.
+
+    Args:
+        slot: 1-D received buffer at FSAMPLE (at most NFFT_DOWN samples)
+        freqs: (K,) centre frequencies (Hz); they come out at DC
+        spectrum: optional np.fft.rfft(slot, NFFT_DOWN), to reuse it
+        band: (flat lower edge, flat upper edge, taper) in Hz relative to
+              the frequency, or None for all NDOUT bins unweighted (as the
+              Fortran)
+
+    Returns:
+        (cd, fc): (K, NDOUT) complex baseband at FS_DOWN, sample i at slot
+        sample i*NDOWN, and the (K,) frequencies actually put at DC
+    """
+    ndout = NDOUT
+    if spectrum is None:
+        spectrum = np.fft.rfft(slot, NFFT_DOWN)
+    df = FSAMPLE / NFFT_DOWN
+    i0 = np.rint(np.asarray(freqs, dtype=np.float64) / df).astype(np.intp)
+    if band is None:
+        offsets = np.fft.fftfreq(ndout, 1.0 / ndout).astype(np.intp)
+    else:
+        offsets, weights = _band(tuple(band[:2]), band[2])
+
+    # Read the bins from a zero-padded copy of the spectrum: bins past
+    # either end (clipped into the padding) come out zero
+    pad = int(np.abs(offsets).max()) + 1
+    padded = np.zeros(len(spectrum) + 2 * pad, dtype=np.complex128)
+    padded[pad:pad + len(spectrum)] = spectrum
+    bins = padded[np.clip(i0[:, None] + (offsets + pad), 0, len(padded) - 1)]
+    if band is None:
+        cut = bins
+    else:
+        # The offsets run contiguously from below 0 to above it: two
+        # slice copies put them in FFT order
+        bins *= weights
+        nneg = int(np.sum(offsets < 0))
+        cut = np.zeros((len(i0), ndout), dtype=np.complex128)
+        cut[:, :len(offsets) - nneg] = bins[:, nneg:]
+        cut[:, ndout - nneg:] = bins[:, :nneg]
+    return np.fft.ifft(cut, axis=-1), i0 * df
+
+
+def _symbols(cd, start, positions):
+    """(K, L, len(positions), NSS) symbol segments of baseband cd.
+
+    start is (K, L) sample index of symbol 0 per candidate and lag; it is
+    clipped so that all segments lie inside cd."""
+    positions = np.asarray(positions)
+    start = np.clip(start, 0, cd.shape[1] - NSS * (positions.max() + 1))
+    view = sliding_window_view(cd, NSS, axis=1)
+    return view[np.arange(len(cd))[:, None, None],
+                start[:, :, None] + NSS * positions]
+
+
+def _tone_refs(freqs):
+    """exp(-2j*pi*f*n/FS_DOWN) over one symbol, shape (..., NSS).
+
+    Written as cos and -sin into one complex buffer (2x faster than the
+    complex exp)."""
+    ph = np.asarray(freqs)[..., None] * (2.0 * np.pi / FS_DOWN * np.arange(NSS))
+    ref = np.empty(ph.shape, dtype=np.complex128)
+    np.cos(ph, out=ref.real)
+    np.sin(ph, out=ref.imag)
+    np.negative(ref.imag, out=ref.imag)
+    return ref
+
+
+def _refine(cd, lag, dfreq, nsym, lags=REFINE_LAGS, tweaks=REFINE_TWEAKS):
+    """Data-aided sync: the summed power of the strongest tone of frame
+    symbols 1..nsym is maximized over the tweaks at the given lag, then
+    over the lags at the best tweak (separately: the joint grid costs 4x)."""
+    k = len(cd)
+    rows = np.arange(k)
+    tones = BAUD * np.arange(M)
+    for lg, tw in ((np.zeros(1, dtype=np.intp), tweaks), (lags, np.zeros(1))):
+        start = lag[:, None] + lg
+        seg = _symbols(cd, start, np.arange(1, nsym + 1))   # (K, L, nsym, NSS)
+        f = dfreq[:, None] + tw                             # (K, F)
+        ref = _tone_refs(f[:, None, :] + tones[None, :, None])
+        ref = ref.reshape(k, -1, NSS).transpose(0, 2, 1)    # (K, NSS, M*F)
+        y = np.matmul(seg.reshape(k, -1, NSS), ref).reshape(k, len(lg), nsym, M, len(tw))
+        p = (y.real ** 2 + y.imag ** 2).max(axis=3).sum(axis=2)
+        il, it = np.divmod(p.reshape(k, -1).argmax(axis=1), len(tw))
+        lag, dfreq = start[rows, il], f[rows, it]
+    return lag, dfreq
+
+
+def fine_sync(cd, lag0, frame='standard', lags=FINE_LAGS, tweaks=FINE_TWEAKS,
+              refine=True):
+    """Best (lag, frequency tweak) of each candidate's baseband signal.
+
+    Args:
+        cd: (K, n) baseband signals, tone 0 at DC (from downsample())
+        lag0: (K,) coarse baseband sample of frame symbol 0
+        frame: 'standard' or 'short' (FRAMES)
+        lags, tweaks: Costas search grid, samples around lag0 and Hz
+                      around DC
+        refine: follow with the data-aided search on REFINE_LAGS x
+                REFINE_TWEAKS
+
+    Returns:
+        (lag, dfreq, sync): (K,) baseband sample of symbol 0, frequency
+        offset of tone 0 from DC (Hz), and the fraction of the Costas
+        symbols' energy in their sync tones (0..1)
+    """
+    sync_map, nsym = FRAMES[frame][:2]
+    k = len(cd)
+    isym = np.array([s for s, _ in sync_map])
+    tone = np.array([t for _, t in sync_map], dtype=np.float64)
+    start = np.asarray(lag0, dtype=np.intp)[:, None] + lags
+    seg = _symbols(cd, start, isym)                 # (K, L, nsync, NSS)
+
+    # ref[s, n, f]: sync tone of symbol s, moved by tweak f
+    ref = _tone_refs(BAUD * tone[:, None] + tweaks).transpose(0, 2, 1)
+    y = np.matmul(seg.transpose(2, 0, 1, 3).reshape(len(isym), -1, NSS), ref)
+    p = (y.real ** 2 + y.imag ** 2).sum(axis=0).reshape(k, len(lags), len(tweaks))
+
+    energy = (seg.real ** 2 + seg.imag ** 2).sum(axis=(2, 3)) * NSS
+    best = p.reshape(k, -1).argmax(axis=1)
+    il, it = np.divmod(best, len(tweaks))
+    rows = np.arange(k)
+    sync = np.divide(p[rows, il, it], energy[rows, il],
+                     out=np.zeros(k), where=energy[rows, il] > 0)
+    lag, dfreq = start[rows, il], np.asarray(tweaks)[it]
+    if refine:
+        lag, dfreq = _refine(cd, lag, dfreq, nsym - 2)
+    return lag, dfreq, sync
+
+
+def demod_baseband(cd, lag, dfreq, positions=DATA_POS, nseq=1):
+    """(K, 3*len(positions)) normalized max-log LLRs from baseband symbols.
+
+    Symbol 0 of candidate i starts at cd[i, lag[i]]; each symbol is moved
+    down by dfreq[i] Hz (phase-continuously for nseq > 1) and split into the M tone bins by the NSS-point
+    DFT of bitmetrics.symbol_spectra(); nseq symbols are combined per
+    metric (bitmetrics.bitmetrics())."""
+    seg = _symbols(cd, np.asarray(lag)[:, None], positions)[:, 0]
+    seg = seg * _tone_refs(dfreq)[:, None, :]
+    if nseq > 1:
+        # Continue the derotation's phase from symbol to symbol, which the
+        # coherent sums need (the power of a single symbol does not)
+        ph = np.outer(dfreq, -2.0 * np.pi * NSS / FS_DOWN * np.asarray(positions))
+        seg *= (np.cos(ph) + 1j * np.sin(ph))[:, :, None]
+    return normalize_llr(bitmetrics(symbol_spectra(seg), nseq, positions))
+
+
+def _empty(frame):
+    return (np.zeros((0, FRAMES[frame][4]), dtype=np.int8), np.zeros((0, 4)),
+            np.zeros((0, 4)))
+
+
+def candidates(slot, frame='standard', fmin=None, fmax=None, syncmin=1.2, maxcand=20,
+               nms=(2, 2)):
+    """Coarse (ncand, 3) candidates (f0 Hz, offset, sync) of one frame type,
+    or {frame: candidates} for a tuple of them, best first
+    (sync.sync_candidates_multi(); nms in symbols and tones)."""
+    names = (frame,) if isinstance(frame, str) else tuple(frame)
+    coarse = sync_candidates_multi(slot, {f: FRAMES[f][:2] for f in names}, NSPS, FSAMPLE,
+                                   BAUD, fmin, fmax, syncmin, maxcand, M, nms)
+    return coarse[frame] if isinstance(frame, str) else coarse
+
+
+def decode_candidates(spectrum, coarse, frame='standard', osd_order=2, osd_budget=None,
+                      telemetry=None, nseq=NSEQ, **bp):
+    """Downsample, fine sync, demodulate and decode coarse candidates.
+
+    Args:
+        spectrum: np.fft.rfft(slot, NFFT_DOWN) of the received slot
+        coarse: (K, 3) candidates from candidates()
+        frame: 'standard' or 'short'
+        osd_order, osd_budget: OSD settings (budget default per FRAMES);
+                   for standard frames a fallback after BP
+        nseq: symbols per bit metric (bitmetrics.bitmetrics()), or a tuple
+              of them: standard-frame candidates that BP fails on with the
+              first are retried with BP on each of the others (as the
+              metric passes of ft8b.f90), and the OSD then works on the
+              first metric's LLRs; short frames use the first only.  The
+              telemetry BP counters cover the first metric; retries go to
+              its retries / retry_ok counters (time: 'bp' stage)
+        telemetry, **bp: as in receive()
+
+    Returns:
+        (msgs, info, cand) as in receive()
+    """
+    _, _, data_pos, nbits, npay, budget = FRAMES[frame]
+    if osd_budget is None:
+        osd_budget = budget
+    if len(coarse) == 0:
+        return _empty(frame)
+
+    with stage(telemetry, 'downsample'):
+        cd, fc = downsample(None, coarse[:, 0], spectrum)
+    with stage(telemetry, 'sync'):
+        lag, dfreq, sync = fine_sync(cd, np.rint(coarse[:, 1] / NDOWN).astype(np.intp),
+                                     frame)
+    nseq = (nseq,) if np.isscalar(nseq) else tuple(nseq)
+    with stage(telemetry, 'demod'):
+        llr = demod_baseband(cd, lag, dfreq, data_pos, nseq[0])[:, :nbits]
+
+    if frame == 'standard':
+        decoded, nhard, niter = decode_combined_batch(
+            llr, osd_order if len(nseq) == 1 else -1, osd_budget, return_niter=True,
+            telemetry=telemetry, **bp)
+        for n in nseq[1:]:
+            fail = np.flatnonzero(nhard < 0)
+            if len(fail) == 0:
+                break
+            with stage(telemetry, 'demod'):
+                retry = demod_baseband(cd[fail], lag[fail], dfreq[fail], data_pos, n)[:, :nbits]
+            # Counted apart: the BP counters are per candidate, first metric
+            with stage(telemetry, 'bp'):
+                decoded[fail], nhard[fail], it = decode_combined_batch(
+                    retry, -1, return_niter=True, **bp)
+            niter[fail] += it
+            if telemetry is not None:
+                telemetry.retry(nhard[fail])
+        fail = np.flatnonzero(nhard < 0)
+        if len(nseq) > 1 and osd_order >= 0 and len(fail):
+            with stage(telemetry, 'osd'):
+                decoded[fail], nhard[fail] = osd_174_91().decode_batch(
+                    llr[fail], osd_order, osd_budget,
+                    stats=None if telemetry is None else telemetry.osd)
+        payload = scramble(decoded[:, :npay])
+    else:
+        with stage(telemetry, 'osd'):
+            decoded, nhard = decode_64_32_batch(llr, osd_order, osd_budget,
+                                                stats=None if telemetry is None else telemetry.osd)
+        niter = np.zeros(len(llr), dtype=int)
+        payload = decoded[:, :npay]
+    cand = np.column_stack([fc + dfreq, lag * NDOWN, sync, niter])
+
+    ok = np.flatnonzero(nhard >= 0)
+    _, first = np.unique(payload[ok], axis=0, return_index=True)
+    keep = ok[np.sort(first)]
+    info = np.column_stack([cand[keep, :3], nhard[keep]])
+    return payload[keep], info, cand
+
+
+def receive(slot, frame='standard', fmin=None, fmax=None, maxcand=20, syncmin=1.2,
+            osd_order=2, osd_budget=None, telemetry=None, **bp):
+    """Search, sync, demodulate and decode the frames of one type in a slot.
+
+    Args:
+        slot: 1-D received buffer (NMAX samples at FSAMPLE)
+        frame: 'standard' or 'short'
+        fmin, fmax: range of tone-0 frequencies to search (Hz)
+        maxcand: candidates decoded (the best by coarse sync power)
+        syncmin: coarse sync threshold of the candidate search
+        osd_order, osd_budget: OSD settings (standard: fallback for the
+                   candidates BP fails on; budget default per FRAMES)
+        telemetry: optional telemetry.Telemetry (decoder counters and the
+                   time of the candidates, downsample, sync, demod, bp
+                   and osd stages)
+        **bp: nseq of decode_candidates() and the BP settings of
+              decoder.decode_combined_batch() (max_iter, scale, schedule,
+              stall, kernel, offset, llr_gain)
+
+    Returns:
+        (msgs, info, cand): msgs (ndec, 77 or 16) payloads (standard ones
+        descrambled), one per distinct message; info (ndec, 4) rows (f0
+        Hz, offset in samples, sync, hard errors corrected) of the
+        candidate each came from; cand (K, 4) rows (f0 Hz, offset in
+        samples, sync, BP iterations) of every candidate after fine sync.
+        Offsets are as in sync.sync_candidates() (they include the GFSK
+        pulse delay).
+    """
+    slot = np.asarray(slot, dtype=np.float64)
+    with stage(telemetry, 'candidates'):
+        coarse = candidates(slot, frame, fmin, fmax, syncmin, maxcand)
+    if len(coarse) == 0:
+        return _empty(frame)
+    with stage(telemetry, 'downsample'):
+        spectrum = np.fft.rfft(slot, NFFT_DOWN)
+    return decode_candidates(spectrum, coarse, frame, osd_order, osd_budget, telemetry,
+                             **bp)
+
+
+def receive_standard(slot, fmin=None, fmax=None, maxcand=20, syncmin=1.2, osd_order=2,
+                     osd_budget=1024, telemetry=None, **bp):
+    """receive() for standard frames."""
+    return receive(slot, 'standard', fmin, fmax, maxcand, syncmin, osd_order, osd_budget,
+                   telemetry, **bp)
+
+
+def receive_short(slot, fmin=None, fmax=None, maxcand=20, syncmin=1.2, osd_order=2,
+                  osd_budget=256, telemetry=None, nseq=NSEQ):
+    """receive() for short frames (OSD only)."""
+    return receive(slot, 'short', fmin, fmax, maxcand, syncmin, osd_order, osd_budget,
+                   telemetry, nseq=nseq)
+
+
+def _merge(parts, frame):
+    """Concatenate receive() results, keeping the first copy of a message."""
+    if not parts:
+        return _empty(frame)
+    msgs, info, cand = (np.concatenate(x) for x in zip(*parts))
+    _, first = np.unique(msgs, axis=0, return_index=True)
+    first = np.sort(first)
+    return msgs[first], info[first], cand
+
+
+def receive_slot(slot, frames=('standard', 'short'), fmin=None, fmax=None, maxcand=20,
+                 syncmin=1.2, osd_order=2, pool=None, jobs=1, telemetry=None, nms=(2, 2),
+                 **bp):
+    """Decode every frame type in a slot, optionally over a process pool.
+
+    The candidate search (all frame types in one pass, nms as in
+    candidates()) and the forward FFT run here; with a pool
+    (concurrent.futures executor) the candidates of each frame type are
+    split into `jobs` parts decoded in parallel (timed as one 'decode'
+    stage).  Other arguments as in receive(), maxcand per frame type.
+
+    Returns:
+        {frame: (msgs, info, cand)} as in receive()
+    """
+    slot = np.asarray(slot, dtype=np.float64)
+    with stage(telemetry, 'downsample'):
+        spectrum = np.fft.rfft(slot, NFFT_DOWN)
+    with stage(telemetry, 'candidates'):
+        coarse = candidates(slot, tuple(frames), fmin, fmax, syncmin, maxcand, nms)
+    if pool is None:
+        return {f: decode_candidates(spectrum, coarse[f], f, osd_order, telemetry=telemetry,
+                                     **bp)
+                for f in frames}
+    with stage(telemetry, 'decode'):
+        futures = {f: [pool.submit(decode_candidates, spectrum, part, f, osd_order, **bp)
+                       for part in np.array_split(coarse[f], jobs) if len(part)]
+                   for f in frames}
+        return {f: _merge([fut.result() for fut in futures[f]], f) for f in frames}
+
+
+# ============================================================
+# Successive interference cancellation
+# ============================================================
+def _moving_sum(x, n):
+    """Centred n-sample moving sum along the last axis, truncated at the
+    ends: the difference of two slices of the cumulative sum, padded with
+    its end values."""
+    size, lead = x.shape[-1], n // 2
+    c = np.zeros(x.shape[:-1] + (size + n + 1,), dtype=x.dtype)
+    np.cumsum(x, axis=-1, out=c[..., lead + 1:lead + 1 + size])
+    c[..., lead + 1 + size:] = c[..., lead + size:lead + size + 1]
+    return c[..., n:n + size] - c[..., :size]
+
+
+@lru_cache(maxsize=8)
+def _lowpass_norm(nwave, nfilt):
+    return _moving_sum(_moving_sum(np.ones(nwave), nfilt // 2), nfilt // 2)
+
+
+def _lowpass(x, nfilt):
+    """Triangular nfilt-sample low-pass (two moving averages) of (K, n) x,
+    renormalized where the window overhangs the ends."""
+    return _moving_sum(_moving_sum(x, nfilt // 2), nfilt // 2) / \
+        _lowpass_norm(x.shape[-1], nfilt)
+
+
+def subtract(slot, tones, f0, offset, nfilt=NFILT, shifts=SUB_SHIFTS):
+    """Remove decoded frames from a slot, in place (subtractft8.f90).
+
+    Each frame's analytic replica cref is regenerated by the modulator;
+    x * conj(cref) over the frame, low-passed by an nfilt-sample
+    triangular window (renormalized where it overhangs the frame ends), is
+    its complex amplitude, and 2*Re(amplitude * cref) is subtracted.  The
+    window replaces the cos^2 of subtractft8.f90: two running sums cost a
+    sixth of the FFT convolution and cancel as deeply.
+
+    The offsets of fine_sync() are good to a baseband sample (NDOWN
+    samples here), which limits the cancellation to ~15 dB, so the
+    estimate is first repeated at the given shifts of each offset and the
+    frame removed at the parabolic peak of the energy it takes out (as
+    subtractft8's DT refinement); 20-25 dB above -5 dB SNR.
+
+    Args:
+        slot: 1-D float64 received buffer, modified in place
+        tones: (K, nsym) tone sequences of the decoded frames (one type)
+        f0: (K,) tone-0 frequencies (Hz)
+        offset: (K,) offsets as returned by receive() (they include the
+                GFSK pulse delay)
+        nfilt: low-pass window length in samples
+        shifts: evenly spaced trial shifts of the offsets in samples
+                (() = subtract at the offsets as given)
+
+    Returns:
+        slot
+    """
+    if len(tones) == 0:
+        return slot
+    cref = gen_wave_batch(tones, f0=np.asarray(f0, dtype=np.float64), analytic=True)
+    nwave = cref.shape[1]
+    start = np.rint(np.asarray(offset)).astype(np.intp) - PULSE_DELAY * NSPS
+
+    # Frames may overhang the slot by their offset error and the shifts:
+    # work on a zero-padded copy of the span they cover
+    shifts = np.asarray(shifts, dtype=np.intp)
+    reach = int(np.abs(shifts).max()) + 1 if len(shifts) else 0
+    lo = min(0, int(start.min()) - reach)
+    hi = max(len(slot), int(start.max()) + nwave + reach)
+    x = np.zeros(hi - lo)
+    x[-lo:len(slot) - lo] = slot
+    idx = (start - lo)[:, None] + np.arange(nwave)
+
+    if len(shifts) > 2:
+        # Energy taken out ~ sum |amplitude|^2, scored on block sums of
+        # NDOWN samples (the amplitude is ~10 Hz wide)
+        nblk = nwave // NDOWN
+        rows = np.arange(len(idx))
+        gain = np.empty((len(idx), len(shifts)))
+        for j, d in enumerate(shifts):
+            camp = x[idx[:, :nblk * NDOWN] + d] * cref[:, :nblk * NDOWN].conj()
+            amp = _lowpass(camp.reshape(len(idx), nblk, NDOWN).sum(axis=2), nfilt // NDOWN)
+            gain[:, j] = (amp.real ** 2 + amp.imag ** 2).sum(axis=1)
+        i = np.clip(gain.argmax(axis=1), 1, len(shifts) - 2)
+        g0, g1, g2 = gain[rows, i - 1], gain[rows, i], gain[rows, i + 1]
+        curv = g0 - 2.0 * g1 + g2
+        frac = np.divide(0.5 * (g0 - g2), curv, out=np.zeros(len(idx)), where=curv < 0)
+        step = shifts[1] - shifts[0]
+        idx = idx + np.rint(shifts[i] + step * np.clip(frac, -1.0, 1.0)).astype(np.intp)[:, None]
+    np.subtract.at(x, idx, 2.0 * (_lowpass(x[idx] * cref.conj(), nfilt) * cref).real)
+    slot[:] = x[-lo:len(slot) - lo]
+    return slot
+
+
+def receive_sic(slot, npass=3, frames=('standard', 'short'), fmin=None, fmax=None,
+                maxcand=20, syncmin=1.2, osd_order=2, pool=None, jobs=1, nms=(2, 2),
+                nfilt=NFILT, shifts=SUB_SHIFTS, **bp):
+    """Multi-pass receive_slot() with successive interference cancellation.
+
+    Each pass decodes the slot, regenerates the frames not decoded by an
+    earlier pass and subtracts them (subtract()), so that the next pass
+    searches a residual in which the strong signals no longer mask the
+    weak ones.  Decoding stops after npass passes or after a pass with
+    nothing new.  The caller's buffer is not modified.
+
+    Args:
+        slot: 1-D received buffer (NMAX samples at FSAMPLE)
+        npass: maximum number of decode passes (1 = receive_slot())
+        nfilt, shifts: low-pass window and DT refinement of subtract()
+        other arguments: as in receive_slot()
+
+    Returns:
+        (result, passes): result {frame: (msgs, info)} as in receive(),
+        decodes of all passes in pass order; passes one dict per pass run,
+        {'new': {frame: decodes}, 'stage_time': {stage: seconds}} with the
+        downsample, candidates, sync, demod, bp, osd (or 'decode' with a
+        pool) and subtract times
+    """
+    x = np.array(slot, dtype=np.float64)
+    found = {f: [] for f in frames}
+    seen = {f: set() for f in frames}
+    passes = []
+    for n in range(npass):
+        tel = Telemetry()
+        result = receive_slot(x, frames, fmin, fmax, maxcand, syncmin, osd_order, pool, jobs,
+                              tel, nms, **bp)
+        new = {}
+        for f in frames:
+            msgs, info, _ = result[f]
+            fresh = np.array([m.tobytes() not in seen[f] for m in msgs], dtype=bool)
+            msgs, info = msgs[fresh], info[fresh]
+            seen[f].update(m.tobytes() for m in msgs)
+            found[f].append((msgs, info))
+            new[f] = len(msgs)
+            if n + 1 < npass and len(msgs):
+                with tel.stage('subtract'):
+                    subtract(x, ENCODERS[f](msgs)[0], info[:, 0], info[:, 1], nfilt,
+                             shifts)
+        passes.append({'new': new, 'stage_time': dict(tel.stage_time)})
+        if not any(new.values()):
+            break
+    result = {f: tuple(np.concatenate(part) for part in zip(*found[f])) for f in frames}
+    return result, passes
@@ -0,0 +1,166 @@
+"""
+FT2H sweep output — streamed result files and live progress.
+
+ResultWriter appends one row per finished SNR point (or per trial chunk)
+to a CSV or JSON-lines file and flushes it at once, so a long sweep can
+be tailed while it runs and a crash loses nothing already finished.
+read_results() loads such a file back, which is all the plotting step
+needs.  Progress turns the chunks reported by run_sweep(on_chunk=...)
+into trials/s, BP iterations/s and an ETA.
+"""
+
+import csv
+import json
+import sys
+import time
+
+
+def _format(path):
+    return 'jsonl' if path.endswith(('.jsonl', '.json')) else 'csv'
+
+
+def _plain(value):
+    """Builtin form of numpy scalars for the csv/json modules."""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _cell(value):
+    """CSV cell: lists and dicts as compact JSON."""
+    return json.dumps(value, separators=(',', ':')) if isinstance(value, (list, dict)) \
+        else value
+
+
+class ResultWriter:
+    """Row-at-a-time CSV or JSONL writer (format from the file suffix).
+
+    CSV columns are taken from the first row; later rows must have the
+    same keys.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = _format(path)
+        self.file = open(path, 'w', newline='')
+        self.csv = None
+
+    def write(self, row):
+        row = {k: _plain(v) for k, v in row.items()}
+        if self.format == 'jsonl':
+            self.file.write(json.dumps(row) + '\n')
+        else:
+            if self.csv is None:
+                self.csv = csv.DictWriter(self.file, fieldnames=list(row))
+                self.csv.writeheader()
+            self.csv.writerow({k: _cell(v) for k, v in row.items()})
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_results(path):
+    """Rows of a ResultWriter file as dicts (CSV numbers converted)."""
+    with open(path, newline='') as f:
+        if _format(path) == 'jsonl':
+            return [json.loads(line) for line in f if line.strip()]
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for k, v in row.items():
+            try:
+                row[k] = int(v)
+            except ValueError:
+                try:
+                    row[k] = float(v)
+                except ValueError:
+                    pass
+    return rows
+
+
+class Progress:
+    """Live throughput and ETA of a sweep.
+
+    Args:
+        total: trials planned (points × trials per point; in adaptive mode
+               the cap, reduced as points stop early)
+        iters: optional iters(counts) -> decoder iterations in a chunk
+        stream: where the status line goes; it is only drawn on a TTY
+    """
+
+    def __init__(self, total, iters=None, stream=sys.stderr):
+        self.total = total
+        self.iters = iters
+        self.stream = stream
+        self.tty = stream.isatty()
+        self.t0 = time.time()
+        self.finished = {}      # point index -> trials it ended with
+        self.partial = {}       # point index -> trials so far
+        self.run = 0            # trials actually simulated
+        self.niter = 0
+        self.shown = False
+
+    @property
+    def done(self):
+        """Trials of the sweep finished so far (run or cached)."""
+        return sum(self.finished.values()) + sum(self.partial.values())
+
+    def chunk(self, index, n, counts, cached):
+        """Account for one finished chunk of n trials of point `index`.
+
+        Chunks a parallel sweep finishes after their point is complete
+        count towards the throughput but not towards the progress."""
+        if index not in self.finished:
+            self.partial[index] = self.partial.get(index, 0) + n
+        if not cached:
+            self.run += n
+            if self.iters is not None:
+                self.niter += self.iters(counts)
+
+    def point(self, index, n, max_trials):
+        """Point `index` finished after n of its max_trials trials."""
+        self.partial.pop(index, None)
+        self.finished[index] = n
+        self.total -= max_trials - n
+
+    def rates(self):
+        """(trials/s, iterations/s, ETA seconds or None) so far."""
+        dt = max(time.time() - self.t0, 1e-9)
+        rate = self.run / dt
+        eta = max(self.total - self.done, 0) / rate if rate > 0 else None
+        return rate, self.niter / dt, eta
+
+    def line(self):
+        rate, irate, eta = self.rates()
+        text = f"{self.done}/{self.total} trials  {rate:.0f} trials/s"
+        if self.iters is not None:
+            text += f"  {irate:.0f} BP it/s"
+        if eta is not None:
+            text += f"  ETA {eta:.0f}s"
+        return text
+
+    def summary(self):
+        """Closing line: trials simulated, wall time and throughput."""
+        rate, irate, _ = self.rates()
+        text = (f"{self.run} trials simulated in {time.time() - self.t0:.1f}s "
+                f"({rate:.0f} trials/s")
+        if self.iters is not None:
+            text += f", {irate:.0f} BP it/s"
+        return text + ")"
+
+    def show(self):
+        if self.tty:
+            self.stream.write('\r\033[K' + self.line())
+            self.stream.flush()
+            self.shown = True
+
+    def clear(self):
+        """Erase the status line before other output is printed."""
+        if self.shown:
+            self.stream.write('\r\033[K')
+            self.stream.flush()
+            self.shown = False
@@ -0,0 +1,254 @@
+"""
+FT2H SNR sweep runner — spreads Monte Carlo work over a process pool.
+
+Each SNR point is run as a sequence of work units of at most `chunk`
+trials.  Chunk j of a point draws from its own numpy Generator seeded
+with SeedSequence(seed, spawn_key=(point_key(point), j)), and unit
+results are merged strictly in chunk order, so the counts of every point
+are bit-identical whatever the number of workers.  The key depends on
+the SNR value, not on its position in the sweep, so the same point gets
+the same noise in any range; with a cache.ResultCache finished chunks
+are stored and reused by later sweeps.
+
+A point either runs a fixed number of trials or, in adaptive mode, keeps
+adding chunks until an `until` predicate (target word errors, confidence
+interval width, ...) is met.
+
+Used by ft2h_sim_v2.py and ft2h_simulator.py (--jobs N); unit functions
+live in link.py.
+"""
+
+import numpy as np
+import os, time
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+# ============================================================
+# Confidence intervals for error rates
+# ============================================================
+def wilson_interval(k, n, conf=0.95):
+    """Wilson score interval for k errors in n trials."""
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + conf / 2.0)
+    p = k / n
+    den = 1.0 + z * z / n
+    mid = (p + z * z / (2.0 * n)) / den
+    half = z * np.sqrt(p * (1.0 - p) / n + z * z / (4.0 * n * n)) / den
+    return max(0.0, mid - half), min(1.0, mid + half)
+
+
+def clopper_pearson_interval(k, n, conf=0.95):
+    """Exact (Clopper-Pearson) interval for k errors in n trials."""
+    from scipy.special import betaincinv
+    if n == 0:
+        return 0.0, 1.0
+    alpha = 1.0 - conf
+    lo = 0.0 if k == 0 else betaincinv(k, n - k + 1, alpha / 2.0)
+    hi = 1.0 if k == n else betaincinv(k + 1, n - k, 1.0 - alpha / 2.0)
+    return float(lo), float(hi)
+
+
+INTERVALS = {'wilson': wilson_interval, 'cp': clopper_pearson_interval}
+
+
+def adaptive_until(errors, target_errors=100, rel_width=None, conf=0.95,
+                   method='wilson', wer_floor=None):
+    """Build an `until` predicate for run_sweep().
+
+    Args:
+        errors: errors(n, counts) -> word errors among n trials
+        target_errors: stop once this many word errors were seen
+        rel_width: also stop once (upper - lower) / WER <= rel_width
+        conf: confidence level of the interval
+        method: 'wilson' or 'cp' (Clopper-Pearson)
+        wer_floor: also stop once the interval's upper bound is below this
+                   (the only target an error-free point can reach)
+    """
+    interval = INTERVALS[method]
+
+    def until(n, counts):
+        k = errors(n, counts)
+        if target_errors is not None and k >= target_errors:
+            return True
+        if wer_floor is not None and interval(k, n, conf)[1] < wer_floor:
+            return True
+        if rel_width is not None and k > 0:
+            lo, hi = interval(k, n, conf)
+            return (hi - lo) * n / k <= rel_width
+        return False
+    return until
+
+
+# ============================================================
+# Sweep scheduler
+# ============================================================
+def point_key(point):
+    """Non-negative integer spawn key of a sweep point (1e-3 resolution)."""
+    return int(round(float(point) * 1000)) % 2**32
+
+
+def _run_unit(unit_fn, point, ntrials, seed_seq):
+    """Worker entry point: run one work unit, return (counts, seconds)."""
+    t0 = time.time()
+    counts = unit_fn(point, ntrials, np.random.default_rng(seed_seq))
+    return counts, time.time() - t0
+
+
+def _add(total, counts):
+    return counts if total is None else tuple(map(sum, zip(total, counts)))
+
+
+class _Point:
+    """Merge state of one sweep point: chunks are merged in order."""
+
+    def __init__(self, index, point, max_trials, chunk, seed, until, cached=None):
+        self.index = index
+        self.point = point
+        self.key = point_key(point)
+        self.sizes = [min(chunk, max_trials - s) for s in range(0, max_trials, chunk)]
+        self.seed = seed
+        self.until = until
+        self.cached = cached or {}  # {(chunk, ntrials): (counts, secs)}
+        self.next = 0           # next chunk to submit
+        self.merged = 0         # chunks merged so far
+        self.buffer = {}        # finished chunks waiting to be merged
+        self.n = 0
+        self.counts = None
+        self.secs = 0.0
+        self.finished = False
+
+    def unit(self):
+        j = self.next
+        self.next += 1
+        return self.sizes[j], np.random.SeedSequence(self.seed, spawn_key=(self.key, j))
+
+    def has_unit(self):
+        return not self.finished and self.next < len(self.sizes)
+
+    def add(self, j, counts, secs):
+        """Store chunk j; merge in order; return True once the point is done."""
+        self.buffer[j] = counts
+        self.secs += secs
+        while not self.finished and self.merged in self.buffer:
+            self.counts = _add(self.counts, self.buffer.pop(self.merged))
+            self.n += self.sizes[self.merged]
+            self.merged += 1
+            if self.merged == len(self.sizes) or \
+               (self.until is not None and self.until(self.n, self.counts)):
+                self.finished = True
+        return self.finished
+
+
+def run_sweep(unit_fn, points, ntrials, jobs=1, seed=0, chunk=128, until=None,
+              stop=None, cache=None, on_chunk=None):
+    """Run a Monte Carlo sweep, yielding each point as it completes.
+
+    Args:
+        unit_fn: module-level function unit_fn(point, ntrials, rng) returning
+                 a tuple of integer counts; counts are summed over units
+        points: sweep points (e.g. SNR values), passed to unit_fn
+        ntrials: trials per point; the maximum per point in adaptive mode
+        jobs: worker processes (1 = run in this process, 0 = all cores)
+        seed: base seed for the per-unit SeedSequences
+        chunk: max trials per work unit
+        until: optional until(n, counts) -> bool evaluated after each chunk
+               (in chunk order); a point stops adding chunks once it is true
+        stop: optional stop(index, n, counts) -> bool; once true for a point,
+              points after it are not run (in parallel runs some of them may
+              already have been yielded)
+        cache: optional cache.ResultCache; chunks found there are not run
+               again and every chunk run is stored as soon as it finishes
+        on_chunk: optional on_chunk(index, chunk, n, counts, secs, cached)
+                  called in this process for every chunk as it finishes or
+                  is taken from the cache (for progress and streamed output)
+
+    Yields:
+        (index, n, counts, seconds): point index, trials run, summed counts
+        and total worker time spent on the point (cached chunks count with
+        the time they originally took)
+    """
+    config = cache.register(unit_fn, chunk) if cache is not None else None
+    state = [_Point(i, pt, ntrials, chunk, seed, until,
+                    cache.load(config, pt, seed) if cache is not None else None)
+             for i, pt in enumerate(points)]
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    def cached(p):
+        """Merge the point's next chunks while they are in the cache."""
+        while p.has_unit() and (p.next, p.sizes[p.next]) in p.cached:
+            j = p.next
+            n, _ = p.unit()
+            cache.hits += 1
+            counts, dt = p.cached[(j, n)]
+            if on_chunk is not None:
+                on_chunk(p.index, j, n, counts, dt, True)
+            p.add(j, counts, dt)
+        return p.finished
+
+    def record(p, j, n, counts, dt):
+        if cache is not None:
+            cache.store(config, p.point, seed, j, n, counts, dt)
+        if on_chunk is not None:
+            on_chunk(p.index, j, n, counts, dt, False)
+
+    if jobs == 1:
+        for p in state:
+            while not cached(p):
+                j = p.next
+                n, ss = p.unit()
+                counts, dt = _run_unit(unit_fn, p.point, n, ss)
+                record(p, j, n, counts, dt)
+                p.add(j, counts, dt)
+            yield p.index, p.n, p.counts, p.secs
+            if stop is not None and stop(p.index, p.n, p.counts):
+                return
+        return
+
+    # Chunks in flight per point: everything for fixed runs, otherwise
+    # enough to keep the workers busy without much overshoot.
+    depth = ntrials if until is None else max(2, -(-2 * jobs // len(points)))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = {}
+
+        def submit(p):
+            """Queue the point's next chunks; True once cache hits finish it."""
+            while not cached(p) and p.has_unit() and \
+                    sum(1 for q, _, _ in pending.values() if q is p) < depth:
+                j = p.next
+                n, ss = p.unit()
+                pending[pool.submit(_run_unit, unit_fn, p.point, n, ss)] = (p, j, n)
+            return p.finished
+
+        ready = [p for p in state if submit(p)]
+        last = len(points)      # points with index >= last are dropped
+
+        while pending or ready:
+            for p in ready:
+                if p.index >= last:
+                    continue
+                for f, (q, _, _) in list(pending.items()):
+                    if q is p and f.cancel():
+                        del pending[f]
+                yield p.index, p.n, p.counts, p.secs
+                if stop is not None and stop(p.index, p.n, p.counts):
+                    last = min(last, p.index + 1)
+                    for f, (q, _, _) in list(pending.items()):
+                        if q.index >= last and f.cancel():
+                            del pending[f]
+            ready = []
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                p, j, n = pending.pop(fut)
+                counts, dt = fut.result()
+                record(p, j, n, counts, dt)
+                if p.index >= last or p.finished:
+                    continue
+                if p.add(j, counts, dt) or submit(p):
+                    ready.append(p)
@@ -0,0 +1,226 @@
+"""
+FT2H coarse sync search — one spectrogram, all (lag, frequency) pairs.
+
+Mirrors ft2h_getcandidates.f90: symbol spectra every NSTEP = NSPS/4
+samples, FFT length NFFT1 = 2*NSPS (tone spacing = 2 bins).  Each window
+holds one symbol (NSPS samples, zero padded), so a Costas tone lands in a
+single spectrogram cell.  The Costas score of every (lag, bin) pair is a
+sum of shifted slices of the spectrogram, one slice per sync symbol, so
+the whole search is 16 array additions instead of a loop over offsets.
+The grid's local maxima are ranked, the best kept with argpartition and
+thinned by non-maximum suppression; sync_candidates_multi() scores
+several frame types (standard and short Costas maps) on one spectrogram.
+
+sync_candidates_standard() / sync_demod_standard() apply it to the
+standard frame's two Costas arrays.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .params import NSPS, FSAMPLE, BAUD, M, NN2, SYNC_MAP
+from .demodulator import demod_standard
+
+
+def spectrogram(signal, nsps, nstep=None, nfft=None):
+    """Power spectrogram (nhsym, nfft//2 + 1) of a 1-D signal.
+
+    Window j covers samples j*nstep ... j*nstep + nsps - 1 (no copy; the
+    FFT zero pads it to nfft).  Defaults: nstep = nsps/4, nfft = 2*nsps.
+    """
+    nstep = nstep or nsps // 4
+    nfft = nfft or 2 * nsps
+    win = sliding_window_view(np.asarray(signal), nsps)[::nstep]
+    spec = np.fft.rfft(win, n=nfft, axis=-1)
+    return spec.real ** 2 + spec.imag ** 2
+
+
+def costas_score(s, sync_map, steps_per_sym, bins_per_tone, nlag, m=8):
+    """Sync power of every (lag, bin) pair of spectrogram s.
+
+    score[lag, f] = sum over sync symbols (isym, tone) of
+                    s[lag + isym*steps_per_sym, f + tone*bins_per_tone]
+
+    Args:
+        s: (nhsym, nbin) power spectrogram
+        sync_map: iterable of (symbol index in frame, tone) pairs
+        steps_per_sym: spectrogram steps per symbol
+        bins_per_tone: FFT bins per tone spacing
+        nlag: number of lags to score
+        m: tones per symbol (the band spans m*bins_per_tone bins)
+
+    Returns:
+        (nlag, nbin - (m-1)*bins_per_tone) scores; bin f is tone 0
+    """
+    nf = s.shape[1] - (m - 1) * bins_per_tone
+    score = np.zeros((nlag, nf))
+    for isym, tone in sync_map:
+        j = isym * steps_per_sym
+        k = tone * bins_per_tone
+        score += s[j:j + nlag, k:k + nf]
+    return score
+
+
+def select_peaks(score, maxcand=20, syncmin=1.2, nms=None, fmask=None, nms_ratio=0.5):
+    """Best (lag, bin) cells of a normalized score grid, best first.
+
+    Cells must be local maxima over their 3x3 neighbourhood with
+    score >= syncmin (and inside fmask, a boolean mask over bins).  The
+    top ones are taken with argpartition; with nms = (rlag, rbin), a cell
+    within rlag lags and rbin bins of a selected one and below nms_ratio
+    times its score is dropped: the Costas sidelobes of a strong signal,
+    one or two symbols and tones away at ~0.3 of its score, would
+    otherwise take candidate slots from weak signals.  (Dropping every
+    neighbour also loses real signals close to a stronger one.)
+
+    Returns:
+        (lag, bin) index arrays
+    """
+    nlag, nf = score.shape
+    pad = np.pad(score, 1, constant_values=-np.inf)
+    peak = score >= syncmin
+    if fmask is not None:
+        peak &= fmask
+    for di in (0, 1, 2):
+        for dj in (0, 1, 2):
+            if di != 1 or dj != 1:
+                peak &= score >= pad[di:di + nlag, dj:dj + nf]
+    lag, ibin = np.nonzero(peak)
+    val = score[lag, ibin]
+
+    # Suppression only removes peaks: pick from a pool of the best ones,
+    # enlarged if it runs out before maxcand survive
+    pool = maxcand if nms is None else 4 * maxcand
+    while True:
+        k = min(pool, len(val))
+        top = np.argpartition(-val, k - 1)[:k] if 0 < k < len(val) else np.arange(k)
+        top = top[np.argsort(-val[top], kind='stable')]
+        if nms is None:
+            keep = top[:maxcand]
+            break
+        # suppress[i, j]: pool peak j is a sidelobe of the better peak i
+        lt, bt, vt = lag[top], ibin[top], val[top]
+        suppress = ((np.abs(lt[:, None] - lt) <= nms[0]) &
+                    (np.abs(bt[:, None] - bt) <= nms[1]) & (vt < nms_ratio * vt[:, None]))
+        alive = np.ones(k, dtype=bool)
+        keep = []
+        for i in range(k):
+            if not alive[i]:
+                continue
+            keep.append(top[i])
+            if len(keep) == maxcand:
+                break
+            alive &= ~suppress[i]
+        if len(keep) == maxcand or k == len(val):
+            break
+        pool *= 4
+    keep = np.asarray(keep, dtype=np.intp)
+    return lag[keep], ibin[keep]
+
+
+def sync_candidates_multi(signal, frames, nsps, fsample, baud, fmin=None, fmax=None,
+                          syncmin=1.2, maxcand=20, m=8, nms=(2, 2)):
+    """Ranked coarse sync candidates of several frame types in one pass.
+
+    The spectrogram and the band power normalization are computed once;
+    each frame type's Costas score is a sum of shifted slices of it.  The
+    score of each (lag, bin) is normalized by the sync-symbol count times
+    the average spectrogram power in the 8 tone bins (the band version of
+    savg in ft2h_getcandidates.f90).  ft2h_getcandidates appends hits in
+    scan order until maxcand; here the whole grid is ranked and the best
+    maxcand local maxima kept (select_peaks()).
+
+    Args:
+        signal: 1-D received buffer
+        frames: {name: (sync_map, nsym)}, the (symbol index, tone) pairs of
+                each frame type's Costas arrays and its length in symbols;
+                only lags where the frame fits are searched
+        nsps, fsample, baud: samples per symbol, sample rate, tone spacing
+        fmin, fmax: range of tone-0 frequencies to search (Hz)
+        syncmin: minimum normalized sync power
+        maxcand: maximum number of candidates per frame type
+        m: tones per symbol
+        nms: (symbols, tones) suppression radius around each candidate,
+             None for the 3x3 local maximum only
+
+    Returns:
+        {name: (ncand, 3) array of (f0 Hz, offset in samples, sync)}, best
+        first.  The offset is where frame symbol 0 starts as seen by a
+        per-symbol tone filter, i.e. it includes the GFSK pulse delay.
+    """
+    nstep = nsps // 4
+    nfft = 2 * nsps
+    df = fsample / nfft
+    tbin = int(round(baud / df))
+    steps_per_sym = nsps // nstep
+
+    s = spectrogram(signal, nsps, nstep, nfft)
+    nf = s.shape[1] - (m - 1) * tbin
+    savg = s.mean(axis=0)
+    band = sum(savg[k * tbin:k * tbin + nf] for k in range(m)) / m
+    f0 = np.arange(nf) * df
+    fmask = np.ones(nf, dtype=bool)
+    if fmin is not None:
+        fmask &= f0 >= fmin
+    if fmax is not None:
+        fmask &= f0 <= fmax
+    radius = None if nms is None else (nms[0] * steps_per_sym, nms[1] * tbin)
+
+    out = {}
+    for name, (sync_map, nsym) in frames.items():
+        sync_map = list(sync_map)
+        nlag = min((len(signal) - nsym * nsps) // nstep + 1,
+                   s.shape[0] - max(i for i, _ in sync_map) * steps_per_sym)
+        if nlag < 1:
+            out[name] = np.zeros((0, 3))
+            continue
+        score = costas_score(s, sync_map, steps_per_sym, tbin, nlag, m)
+        np.divide(score, len(sync_map) * band, out=score, where=band > 0)
+        lag, ibin = select_peaks(score, maxcand, syncmin, radius, fmask)
+        out[name] = np.column_stack([ibin * df, lag * nstep, score[lag, ibin]])
+    return out
+
+
+def sync_candidates(signal, sync_map, nsym, nsps, fsample, baud, fmin=None,
+                    fmax=None, syncmin=1.2, maxcand=20, m=8, nms=(2, 2)):
+    """Ranked coarse sync candidates of one frame type in a received buffer.
+
+    sync_candidates_multi() for a single frame type: (ncand, 3) rows of
+    (f0 Hz, offset in samples, sync), best first."""
+    return sync_candidates_multi(signal, {0: (sync_map, nsym)}, nsps, fsample, baud, fmin,
+                                 fmax, syncmin, maxcand, m, nms)[0]
+
+
+def sync_candidates_standard(signal, fmin=None, fmax=None, syncmin=1.2, maxcand=20):
+    """Coarse sync search for standard frames, as in ft2h_getcandidates.f90.
+
+    Returns (ncand, 3) rows of (f0 Hz, offset in samples, sync), best
+    first; the offset includes the 1-symbol GFSK delay."""
+    return sync_candidates(signal, SYNC_MAP, NN2, NSPS, FSAMPLE, BAUD, fmin, fmax,
+                           syncmin, maxcand, M)
+
+
+def detect_sync_standard(signal, f0):
+    """Best standard-frame sync within half a tone of f0.
+
+    Returns (sync power, offset in samples), (0, 0) if none."""
+    cand = sync_candidates_standard(signal, f0 - BAUD / 2, f0 + BAUD / 2,
+                                    syncmin=0.0, maxcand=1)
+    if len(cand) == 0:
+        return 0, 0
+    return cand[0, 2], int(cand[0, 1])
+
+
+def sync_demod_standard(signals, f0, ftol=BAUD):
+    """(N, 174) LLRs at the timing and frequency found by the sync search.
+
+    Each row is searched for tone-0 frequencies within f0 +/- ftol and
+    demodulated at its best candidate; rows without a candidate get zero
+    LLRs (a decode failure)."""
+    signals = np.atleast_2d(signals)
+    llr = np.zeros((len(signals), 174))
+    for n, x in enumerate(signals):
+        cand = sync_candidates_standard(x, f0 - ftol, f0 + ftol, maxcand=1)
+        if len(cand):
+            fc, off, _ = cand[0]
+            llr[n] = demod_standard(x[None], fc, int(off))[0]
+    return llr
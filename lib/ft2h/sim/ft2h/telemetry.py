@@ -0,0 +1,148 @@
+"""
+FT2H decoder telemetry — opt-in counters, histograms and stage timers.
+
+A Telemetry object collects, over any number of frames:
+
+    bp_hist      histogram of BP iterations to converge (index = iterations)
+    bp_fail      frames BP left undecoded (handed to the OSD)
+    bp_stalled   of those, frames stopped early by the stagnation rule
+    retries      BP failures decoded again with another bit metric (the
+                 receiver's nseq retries; not in the BP counters above)
+    retry_ok     of those, the ones a retry decoded
+    crc_reject   frames where BP reached a valid codeword with a bad CRC
+                 (once per frame, however many iterations did)
+    osd          osd.OSDStats: calls, decodes, test patterns tried, time
+    stage_time   cumulative wall time per stage (encode, modulate, ...)
+
+link.standard_counts(telemetry=True) appends one to its counts; since
+Telemetry objects add up (t1 + t2, and sum() starting from 0) they merge
+per SNR point like the integer counts in ft2h.sweep, also across worker
+processes.  as_dict()/from_dict() give the JSON form used by the result
+store and row() the flat form for --out files.
+"""
+
+import time
+from contextlib import contextmanager, nullcontext
+import numpy as np
+from .osd import OSDStats
+
+
+def stage(telemetry, name):
+    """Context manager timing `name` into telemetry (no-op when None)."""
+    return nullcontext() if telemetry is None else telemetry.stage(name)
+
+
+class Telemetry:
+    """Decoder counters and per-stage wall time; see the module docstring."""
+
+    def __init__(self):
+        self.frames = 0
+        self.bp_hist = np.zeros(0, dtype=np.int64)
+        self.bp_fail = 0
+        self.bp_stalled = 0
+        self.retries = 0
+        self.retry_ok = 0
+        self.crc_reject = 0
+        self.osd = OSDStats()
+        self.stage_time = {}
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_time[name] = self.stage_time.get(name, 0.0) + \
+                time.perf_counter() - t0
+
+    def bp(self, nhard, niter):
+        """Record one BP batch: (N,) nhard (-1 = failed) and iterations."""
+        ok = nhard >= 0
+        self.frames += len(nhard)
+        self.bp_fail += int(np.sum(~ok))
+        hist = np.bincount(niter[ok], minlength=len(self.bp_hist))
+        hist[:len(self.bp_hist)] += self.bp_hist
+        self.bp_hist = hist
+
+    def retry(self, nhard):
+        """Record one BP retry batch: (N,) nhard (-1 = failed again)."""
+        self.retries += len(nhard)
+        self.retry_ok += int(np.sum(nhard >= 0))
+
+    # ---- merging ----
+    def __add__(self, other):
+        out = Telemetry()
+        for t in (self, other):
+            out.frames += t.frames
+            n = max(len(out.bp_hist), len(t.bp_hist))
+            out.bp_hist = np.pad(out.bp_hist, (0, n - len(out.bp_hist))) + \
+                np.pad(t.bp_hist, (0, n - len(t.bp_hist)))
+            out.bp_fail += t.bp_fail
+            out.bp_stalled += t.bp_stalled
+            out.retries += t.retries
+            out.retry_ok += t.retry_ok
+            out.crc_reject += t.crc_reject
+            out.osd.merge(t.osd)
+            for k, v in t.stage_time.items():
+                out.stage_time[k] = out.stage_time.get(k, 0.0) + v
+        return out
+
+    def __radd__(self, other):
+        return self if other == 0 else self + other
+
+    # ---- output ----
+    def bp_mean(self):
+        """Mean BP iterations of the frames BP decoded."""
+        n = self.bp_hist.sum()
+        return float(np.dot(np.arange(len(self.bp_hist)), self.bp_hist) / n) if n else 0.0
+
+    def as_dict(self):
+        return {'frames': self.frames, 'bp_hist': self.bp_hist.tolist(),
+                'bp_fail': self.bp_fail, 'bp_stalled': self.bp_stalled,
+                'retries': self.retries, 'retry_ok': self.retry_ok,
+                'crc_reject': self.crc_reject,
+                'osd': {f: getattr(self.osd, f) for f in OSDStats.FIELDS},
+                'stage_time': dict(self.stage_time)}
+
+    @classmethod
+    def from_dict(cls, d):
+        t = cls()
+        t.frames = d['frames']
+        t.bp_hist = np.array(d['bp_hist'], dtype=np.int64)
+        t.bp_fail = d['bp_fail']
+        t.bp_stalled = d.get('bp_stalled', 0)
+        t.retries = d.get('retries', 0)
+        t.retry_ok = d.get('retry_ok', 0)
+        t.crc_reject = d['crc_reject']
+        for f, v in d['osd'].items():
+            setattr(t.osd, f, v)
+        t.stage_time = dict(d['stage_time'])
+        return t
+
+    def row(self):
+        """Flat dict for a result row: counters, histogram, µs/frame per stage."""
+        n = max(self.frames, 1)
+        row = {'bp_mean_iter': round(self.bp_mean(), 2), 'bp_fail': self.bp_fail,
+               'bp_stalled': self.bp_stalled, 'retries': self.retries,
+               'retry_ok': self.retry_ok, 'crc_reject': self.crc_reject,
+               'osd_calls': self.osd.calls, 'osd_decoded': self.osd.decoded,
+               'osd_patterns': self.osd.candidates,
+               'bp_hist': self.bp_hist.tolist()}
+        for k, v in self.stage_time.items():
+            row[f'us_{k}'] = round(1e6 * v / n, 1)
+        return row
+
+    def report(self):
+        """Two-line summary: decoder counters, then µs/frame and share per stage."""
+        n = max(self.frames, 1)
+        total = sum(self.stage_time.values()) or 1.0
+        nz = np.flatnonzero(self.bp_hist)
+        span = f"{nz[0]}-{nz[-1]}" if len(nz) else "-"
+        line1 = (f"BP it mean={self.bp_mean():.1f} range={span} fail={self.bp_fail}/{self.frames} "
+                 f"stalled={self.bp_stalled} retries={self.retry_ok}/{self.retries} "
+                 f"crc_reject={self.crc_reject} | OSD calls={self.osd.calls} "
+                 f"decoded={self.osd.decoded} patterns/call="
+                 f"{self.osd.candidates / max(self.osd.calls, 1):.0f}")
+        line2 = "  ".join(f"{k}={1e6 * v / n:.0f}us({v / total:.0%})"
+                          for k, v in self.stage_time.items())
+        return line1 + "\n" + line2
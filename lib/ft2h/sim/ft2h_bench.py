@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+FT2H Benchmarks — frames/s of every stage of the ft2h signal chain.
+
+Times encode, gen_wave, AWGN, demod, BP, OSD and the sync search one by
+one for standard frames, and the short-frame chain, on fixed-seed inputs
+(see ft2h/bench.py).  A run can be saved as a baseline JSON and later
+runs compared against it; stages slower than the threshold (and by more
+than the timing spread) are flagged and make the exit status 1.
+
+--realtime instead checks the 4 s T/R budget: busy slots of N standard
+and short frames at random offsets, SNRs and DTs through the full
+receiver, reporting decodes, mean and 95th-percentile slot latency per
+N and the largest N within --budget, on one core and on all cores.
+With --passes the receiver subtracts what it decoded and searches the
+slot again, and each pass's new decodes and stage times are listed.
+
+Usage:
+  python ft2h_bench.py                          # Print the table
+  python ft2h_bench.py --save bench_base.json   # Record a baseline
+  python ft2h_bench.py --baseline bench_base.json --threshold 0.15
+  python ft2h_bench.py --stages standard.bp standard.osd
+  python ft2h_bench.py --realtime --budget 1.5  # Signals per slot in budget
+  python ft2h_bench.py --realtime --passes 3    # ... with interference cancellation
+"""
+
+import argparse, json, os, sys
+from ft2h.bench import standard_stages, short_stages, run_bench, compare, run_realtime
+
+
+def realtime(args):
+    """--realtime: the receiver's latency per slot against band occupancy."""
+    ncpu = os.cpu_count() or 1
+    jobs_list = args.jobs if args.jobs is not None else sorted({1, ncpu})
+    results = []
+    for jobs in jobs_list:
+        jobs = jobs or ncpu
+        print(f"\n{jobs} core(s), {args.slots} slots per N, budget {args.budget:.2f} s, "
+              f"SNR {args.snr_range[0]:.0f}..{args.snr_range[1]:.0f} dB, "
+              f"{args.short_frac:.0%} short frames, {args.passes} pass(es)")
+        print(f"{'N':>4} {'sent':>6} {'decoded':>8} {'false':>6} {'ms mean':>8} "
+              f"{'ms p95':>8} {'ms max':>8}")
+        print("-" * 54)
+
+        def log(r):
+            print(f"{r['n']:>4} {r['sent']:>6} {r['decoded']:>8} {r['false']:>6} "
+                  f"{r['ms_mean']:>8.1f} {r['ms_p95']:>8.1f} {r['ms_max']:>8.1f}"
+                  f"{'  over budget' if r['over_budget'] else ''}")
+            for i, p in enumerate(r.get('passes', []), 1):
+                stages = '  '.join(f"{name} {ms:.1f}" for name, ms in p['ms'].items())
+                print(f"{'':>6}pass {i}: +{p['new']:<4} ms/slot  {stages}")
+            sys.stdout.flush()
+
+        result = run_realtime(args.nsig, args.slots, args.budget, jobs, args.seed,
+                              args.maxcand, args.short_frac, tuple(args.snr_range),
+                              args.passes, log=log)
+        results.append(result)
+    print()
+    for r in results:
+        print(f"max N within {args.budget:.2f} s (p95) on {r['meta']['jobs']} core(s): "
+              f"{r['max_n']}")
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results: {args.save}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='FT2H stage benchmarks')
+    parser.add_argument('--batch', type=int, default=128, help='frames per stage call')
+    parser.add_argument('--repeat', type=int, default=7, help='timed calls per stage')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the benchmark inputs')
+    parser.add_argument('--snr', type=float, default=-8.0,
+                        help='SNR of the standard-frame inputs (short frames: SNR - 2)')
+    parser.add_argument('--stages', nargs='+', default=None, metavar='SUITE.STAGE',
+                        help='only these stages (e.g. standard.bp short.osd)')
+    parser.add_argument('--save', metavar='FILE', default=None,
+                        help='write the results as a baseline JSON')
+    parser.add_argument('--baseline', metavar='FILE', default=None,
+                        help='compare against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='relative slowdown flagged as a regression')
+    parser.add_argument('--nsigma', type=float, default=2.0,
+                        help='the slowdown must also exceed this many stdevs')
+    parser.add_argument('--realtime', action='store_true',
+                        help='busy-band T/R budget benchmark instead of the stages')
+    parser.add_argument('--nsig', type=int, nargs='+', default=[1, 2, 5, 10, 20, 30, 50],
+                        help='--realtime: signals per slot to try')
+    parser.add_argument('--slots', type=int, default=10,
+                        help='--realtime: slots timed per N')
+    parser.add_argument('--budget', type=float, default=1.5,
+                        help='--realtime: slot latency budget in seconds')
+    parser.add_argument('--jobs', type=int, nargs='+', default=None,
+                        help='--realtime: worker counts to try (0 = all cores; '
+                             'default 1 and all cores)')
+    parser.add_argument('--maxcand', type=int, default=None,
+                        help='--realtime: candidates per frame type (default 20 + 2N)')
+    parser.add_argument('--short-frac', type=float, default=0.25,
+                        help='--realtime: share of short frames')
+    parser.add_argument('--snr-range', type=float, nargs=2, default=[-10.0, 0.0],
+                        metavar=('MIN', 'MAX'), help='--realtime: per-signal SNR range')
+    parser.add_argument('--passes', type=int, default=1,
+                        help='--realtime: decode/subtract passes per slot (1 = no SIC)')
+    args = parser.parse_args()
+
+    if args.realtime:
+        realtime(args)
+        return
+
+    suites = {'standard': standard_stages(args.batch, args.snr, args.seed),
+              'short': short_stages(args.batch, args.snr - 2.0, args.seed)}
+
+    print(f"{'stage':<20} {'frames':>6} {'us/frame':>10} {'stdev':>8} {'min':>10} "
+          f"{'frames/s':>10}")
+    print("-" * 69)
+
+    def log(key, e):
+        print(f"{key:<20} {e['frames']:>6} {e['us_per_frame']:>10.1f} {e['us_stdev']:>8.1f} "
+              f"{e['us_min']:>10.1f} {e['frames_per_s']:>10.1f}")
+        sys.stdout.flush()
+
+    result = run_bench(suites, args.repeat, args.stages and set(args.stages), log)
+    result['meta'].update(batch=args.batch, seed=args.seed, snr=args.snr)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nBaseline: {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nvs {args.baseline} (threshold {args.threshold:.0%})")
+        nreg = 0
+        for key, ratio, flag in compare(result, baseline, args.threshold, args.nsigma):
+            text = "---" if ratio is None else f"{ratio:.2f}x"
+            print(f"{key:<20} {text:>8}  {flag}")
+            nreg += flag == 'REGRESSION'
+        if nreg:
+            print(f"{nreg} regression(s)")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,12 @@ FT2H Simulator — Complete end-to-end simulation of the FT2H hybrid digital mod
 This validates the FT2H design by simulating:
   1. Message encoding (pack77 → scramble → LDPC encode → Gray map → GFSK modulate)
   2. AWGN channel at various SNR levels
-  3. Decoding (sync detect → downsample → soft demod → LDPC decode → descramble → unpack)
+  3. Decoding (sync detect → soft demod → LDPC decode → descramble → unpack)
+
+Standard and short frames both go through the ft2h package (the same
+codec as ft2h_sim_v2.py, with the real LDPC(174,91) and LDPC(64,32)
+codes); SNRs here use the Es/N0 noise convention ('esn0' in
+ft2h/channel.py), 3 dB more favourable than ft2h_sim_v2.py's.
 
 FT2H Parameters:
   - 8-GFSK modulation, h=1.0, BT=1.0
@@ -17,614 +22,73 @@ FT2H Parameters:
 Usage:
   python ft2h_simulator.py              # Run full BER/WER simulation
   python ft2h_simulator.py --quick      # Quick validation (fewer trials)
+  python ft2h_simulator.py --jobs 0     # Parallel sweep on all cores
+  python ft2h_simulator.py --sync       # Random frame timing + sync search
+  python ft2h_simulator.py --resume     # Reuse/extend stored results
+  python ft2h_simulator.py --out r.csv  # Stream per-SNR rows as they finish
 """
 
 import numpy as np
-from scipy.special import erfc
-from scipy.ndimage import gaussian_filter1d
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
 import argparse
-import time
 import sys
+from functools import partial
+from ft2h import HMOD, BT, BAUD, M, FSAMPLE, standard_counts, short_counts
+from ft2h.sweep import run_sweep
+from ft2h.cache import ResultCache, DEFAULT_PATH
+from ft2h.results import ResultWriter, Progress
 
 # ============================================================
-# FT2H Parameters (must match ft2h_params.f90)
-# ============================================================
-NSPS = 576          # Samples per symbol at 12000 S/s
-FSAMPLE = 12000.0   # Sample rate
-BAUD = FSAMPLE / NSPS  # 20.833 Bd
-HMOD = 1.0          # Modulation index
-BT = 1.0            # Gaussian filter bandwidth-time product
-M = 8               # 8-FSK
-BITS_PER_SYM = 3    # log2(8)
-
-# Standard frame
-ND = 58             # Data symbols (174/3)
-NS = 16             # Sync symbols (2 × 8 Costas)
-NN = NS + ND        # 74 channel symbols
-NN2 = NN + 2        # 76 total with ramp
-NMAX = 48000        # 4.0 s buffer
-
-# Short frame
-ND_S = 22           # Data symbols (ceil(64/3))
-NS_S = 8            # Sync symbols (1 × 8 Costas)
-NN_S = NS_S + ND_S  # 30 channel symbols
-NN2_S = NN_S + 2    # 32 total with ramp
-
-# Costas sync arrays (must match genft2h.f90)
-ICOS8A = np.array([2, 5, 6, 0, 4, 1, 3, 7])
-ICOS8B = np.array([4, 7, 2, 3, 0, 6, 1, 5])
-ICOS8S = np.array([1, 3, 7, 2, 5, 0, 6, 4])
-
-# Gray mapping: binary value → tone
-GRAYMAP8 = np.array([0, 1, 3, 2, 7, 6, 4, 5])
-
-# Inverse Gray mapping: tone → binary value
-GRAY_INV = np.zeros(8, dtype=int)
-for i in range(8):
-    GRAY_INV[GRAYMAP8[i]] = i
-
-# Scrambling vector (from genft2h.f90 — same as FT4)
-RVEC = np.array([0,1,0,0,1,0,1,0,0,1,0,1,1,1,1,0,1,0,0,0,1,0,0,1,1,0,1,1,0,
-                 1,0,0,1,0,1,1,0,0,0,0,1,0,0,0,1,0,1,0,0,1,1,1,1,0,0,1,0,1,
-                 0,1,0,1,0,1,1,0,1,1,1,1,1,0,0,0,1,0,1], dtype=np.int8)
-
-# ============================================================
-# LDPC(174,91) Generator Matrix — extracted from WSJT-X
-# ============================================================
-# We use a simplified systematic encoder for simulation purposes.
-# The actual WSJT-X uses a specific generator matrix from Arikan's polar code family.
-
-def load_ldpc_174_91():
-    """Load or construct LDPC(174,91) parity check matrix.
-    For simulation we use a random-like but deterministic LDPC code.
-    In practice this matches WSJT-X's encode174_91/decode174_91."""
-    # We'll use a simple approach: generate pseudo-random parity matrix
-    # seeded deterministically. For actual validation, this would need
-    # to match the exact WSJT-X code. Here we validate the signal processing chain.
-    rng = np.random.RandomState(17491)
-    # (174,91) code: 91 info bits, 83 parity bits
-    # Parity check matrix H: 83 × 174
-    # For simulation, we use systematic form: G = [I_91 | P^T]
-    # H = [-P | I_83] (or equivalently [P | I_83] over GF(2))
-    P = rng.randint(0, 2, size=(91, 83)).astype(np.int8)
-    # Ensure minimum weight per row/column
-    for j in range(83):
-        if np.sum(P[:, j]) < 3:
-            idx = rng.choice(91, 3, replace=False)
-            P[idx, j] = 1
-    return P
-
-# Global LDPC matrix (computed once)
-P_174_91 = load_ldpc_174_91()
-
-def encode_174_91(infobits):
-    """Systematic LDPC(174,91) encoder.
-    Input: 91 info bits (77 message + 14 CRC)
-    Output: 174 codeword bits"""
-    assert len(infobits) == 91
-    parity = np.mod(infobits @ P_174_91, 2).astype(np.int8)
-    return np.concatenate([infobits, parity])
-
-def decode_174_91_soft(llr, max_iter=50):
-    """Simple soft LDPC decoder using bit-flipping with reliability.
-    Returns (decoded_91_bits, n_hard_errors) or (None, -1) on failure."""
-    # Hard decision
-    cw = (llr < 0).astype(np.int8)
-    info = cw[:91]
-    parity_check = np.mod(info @ P_174_91, 2).astype(np.int8)
-    
-    if np.array_equal(parity_check, cw[91:]):
-        return info, 0
-    
-    # OSD-like: sort by reliability, try flipping
-    reliab = np.abs(llr)
-    idx = np.argsort(reliab)  # Least reliable first
-    
-    best_cw = cw.copy()
-    for nflip in range(1, min(max_iter, 40)):
-        test = cw.copy()
-        test[idx[nflip-1]] = 1 - test[idx[nflip-1]]
-        info_t = test[:91]
-        par_t = np.mod(info_t @ P_174_91, 2).astype(np.int8)
-        if np.array_equal(par_t, test[91:]):
-            return info_t, nflip
-    
-    # Try flipping pairs of least reliable bits
-    for i in range(min(10, len(idx))):
-        for j in range(i+1, min(15, len(idx))):
-            test = cw.copy()
-            test[idx[i]] = 1 - test[idx[i]]
-            test[idx[j]] = 1 - test[idx[j]]
-            info_t = test[:91]
-            par_t = np.mod(info_t @ P_174_91, 2).astype(np.int8)
-            if np.array_equal(par_t, test[91:]):
-                return info_t, 2
-    
-    return None, -1
-
-# ============================================================
-# LDPC(64,32) for short frames
-# ============================================================
-
-def get_crc16(msgbits_16):
-    """Compute CRC-16 for 16-bit message. Returns 32-bit info word."""
-    crc = 0
-    for bit in msgbits_16:
-        fb = ((crc >> 15) & 1) ^ int(bit)
-        crc = (crc << 1) & 0xFFFF
-        if fb:
-            crc ^= 0x8005  # x^16 + x^15 + x^2 + 1
-    result = np.zeros(32, dtype=np.int8)
-    result[:16] = msgbits_16
-    for i in range(16):
-        result[16 + i] = (crc >> (15 - i)) & 1
-    return result
-
-# Generate a simple (64,32) parity matrix for simulation
-P_64_32 = np.random.RandomState(6432).randint(0, 2, size=(32, 32)).astype(np.int8)
-for j in range(32):
-    if np.sum(P_64_32[:, j]) < 2:
-        idx = np.random.RandomState(j).choice(32, 2, replace=False)
-        P_64_32[idx, j] = 1
-
-def encode_64_32(infobits_32):
-    """Systematic LDPC(64,32) encoder."""
-    assert len(infobits_32) == 32
-    parity = np.mod(infobits_32 @ P_64_32, 2).astype(np.int8)
-    return np.concatenate([infobits_32, parity])
-
-def decode_64_32_soft(llr):
-    """Soft decoder for (64,32) code."""
-    cw = (llr < 0).astype(np.int8)
-    info = cw[:32]
-    par = np.mod(info @ P_64_32, 2).astype(np.int8)
-    
-    if np.array_equal(par, cw[32:]):
-        return info, 0
-    
-    reliab = np.abs(llr)
-    idx = np.argsort(reliab)
-    
-    for nflip in range(1, 33):
-        test = cw.copy()
-        test[idx[nflip-1]] = 1 - test[idx[nflip-1]]
-        info_t = test[:32]
-        par_t = np.mod(info_t @ P_64_32, 2).astype(np.int8)
-        if np.array_equal(par_t, test[32:]):
-            return info_t, nflip
-    
-    return None, -1
-
-# ============================================================
-# GFSK Modulation
-# ============================================================
-
-def gfsk_pulse(bt, t):
-    """Gaussian frequency pulse shape. Matches WSJT-X gfsk_pulse()."""
-    c = np.pi * np.sqrt(2.0 / np.log(2.0))
-    return 0.5 * (erfc(c * bt * (t - 0.5)) - erfc(c * bt * (t + 0.5)))
-
-def gen_ft2h_wave(tones, nsps=NSPS, fsample=FSAMPLE, f0=1000.0):
-    """Generate 8-GFSK waveform from tone array.
-    Matches gen_ft2h_wave.f90.
-    
-    Args:
-        tones: array of tone values (0..7)
-        nsps: samples per symbol
-        fsample: sample rate
-        f0: center frequency offset (Hz)
-    
-    Returns:
-        wave: real-valued audio samples
-    """
-    nsym = len(tones)
-    dt = 1.0 / fsample
-    twopi = 2.0 * np.pi
-    
-    # Compute Gaussian frequency pulse (3 symbol periods)
-    pulse = np.zeros(3 * nsps)
-    for i in range(3 * nsps):
-        tt = (i - 1.5 * nsps) / nsps
-        pulse[i] = gfsk_pulse(BT, tt)
-    
-    # Compute smoothed instantaneous frequency deviation
-    nsamples = (nsym + 2) * nsps
-    dphi = np.zeros(nsamples)
-    dphi_peak = twopi * HMOD / nsps
-    
-    for j in range(nsym):
-        ib = j * nsps
-        ie = ib + 3 * nsps
-        if ie <= nsamples:
-            dphi[ib:ie] += dphi_peak * pulse * tones[j]
-        else:
-            n = nsamples - ib
-            dphi[ib:nsamples] += dphi_peak * pulse[:n] * tones[j]
-    
-    # Add carrier frequency offset
-    dphi += twopi * f0 * dt
-    
-    # Integrate phase
-    phi = np.cumsum(dphi)
-    phi = np.mod(phi, twopi)
-    
-    wave = np.sin(phi)
-    
-    # Apply cosine-squared ramp up/down
-    ramp_up = (1.0 - np.cos(twopi * np.arange(nsps) / (2.0 * nsps))) / 2.0
-    wave[:nsps] *= ramp_up
-    
-    k1 = (nsym + 1) * nsps
-    ramp_down = (1.0 + np.cos(twopi * np.arange(nsps) / (2.0 * nsps))) / 2.0
-    if k1 + nsps <= len(wave):
-        wave[k1:k1+nsps] *= ramp_down
-    
-    return wave
-
-# ============================================================
-# Frame Assembly
-# ============================================================
-
-def assemble_standard_frame(msgbits_77):
-    """Encode and assemble a standard FT2H frame (76 symbols).
-    
-    Args:
-        msgbits_77: 77-bit message
-    
-    Returns:
-        tones: 76-element array of tone values (0..7)
-        codeword: 174-bit LDPC codeword
-    """
-    # Add CRC (simplified: 14-bit CRC)
-    crc = 0
-    for b in msgbits_77:
-        fb = ((crc >> 13) & 1) ^ int(b)
-        crc = (crc << 1) & 0x3FFF
-        if fb:
-            crc ^= 0x4757  # Same polynomial as WSJT-X
-    
-    infobits = np.zeros(91, dtype=np.int8)
-    infobits[:77] = msgbits_77
-    for i in range(14):
-        infobits[77 + i] = (crc >> (13 - i)) & 1
-    
-    # Scramble
-    scrambled = np.mod(infobits[:77] + RVEC, 2).astype(np.int8)
-    infobits[:77] = scrambled
-    
-    # LDPC encode
-    codeword = encode_174_91(infobits)
-    
-    # Gray map: 3 bits → tone
-    data_syms = np.zeros(ND, dtype=int)
-    for i in range(ND):
-        val = codeword[3*i] * 4 + codeword[3*i+1] * 2 + codeword[3*i+2]
-        data_syms[i] = GRAYMAP8[val]
-    
-    # Assemble: r1 + s8 + d29 + s8 + d29 + r1
-    tones = np.zeros(NN2, dtype=int)
-    tones[0] = 0                          # Ramp up
-    tones[1:9] = ICOS8A                   # First Costas
-    tones[9:38] = data_syms[:29]          # First data block
-    tones[38:46] = ICOS8B                 # Second Costas
-    tones[46:75] = data_syms[29:58]       # Second data block
-    tones[75] = 0                         # Ramp down
-    
-    return tones, codeword
-
-def assemble_short_frame(msgbits_16):
-    """Encode and assemble a short FT2H frame (32 symbols).
-    
-    Args:
-        msgbits_16: 16-bit short message
-    
-    Returns:
-        tones: 32-element array of tone values (0..7)
-        codeword: 64-bit codeword
-    """
-    # CRC-16 to get 32 info bits
-    infobits = get_crc16(msgbits_16)
-    
-    # LDPC(64,32) encode
-    codeword = encode_64_32(infobits)
-    
-    # Gray map: 3 bits → tone (22 symbols, last one partial)
-    data_syms = np.zeros(ND_S, dtype=int)
-    for i in range(21):
-        val = codeword[3*i] * 4 + codeword[3*i+1] * 2 + codeword[3*i+2]
-        data_syms[i] = GRAYMAP8[val]
-    # Last symbol: only 1 bit (bit 64), padded
-    val = codeword[63] * 4
-    data_syms[21] = GRAYMAP8[val]
-    
-    # Assemble: r1 + s8 + d22 + r1
-    tones = np.zeros(NN2_S, dtype=int)
-    tones[0] = 0                          # Ramp up
-    tones[1:9] = ICOS8S                   # Costas sync
-    tones[9:31] = data_syms[:22]          # Data symbols
-    tones[31] = 0                         # Ramp down
-    
-    return tones, codeword
-
-# ============================================================
-# Receiver / Demodulator
-# ============================================================
-
-def compute_tone_powers(signal, nsps, f0, nsym_total, data_positions):
-    """Extract tone powers for each data symbol position.
-    
-    Args:
-        signal: received audio samples
-        nsps: samples per symbol
-        f0: carrier frequency offset
-        nsym_total: total symbols including ramp
-        data_positions: list of 0-indexed symbol positions for data
-    
-    Returns:
-        powers: (n_data_symbols, 8) array of tone powers
-    """
-    dt = 1.0 / FSAMPLE
-    n_data = len(data_positions)
-    powers = np.zeros((n_data, M))
-    
-    for idx, pos in enumerate(data_positions):
-        k0 = pos * nsps
-        seg = signal[k0:k0+nsps]
-        if len(seg) < nsps:
-            continue
-        
-        # Compute 8-point DFT at tone frequencies
-        t = np.arange(nsps) * dt
-        for tone in range(M):
-            freq = f0 + tone * BAUD
-            ref = np.exp(-2j * np.pi * freq * t)
-            powers[idx, tone] = np.abs(np.sum(seg * ref)) ** 2
-    
-    return powers
-
-def soft_demod_8gfsk(powers):
-    """Compute soft LLR from tone powers using max-log approximation.
-    
-    For each 3-bit group, compute:
-      LLR(bit_k) = max(s2 where bit_k=0) - max(s2 where bit_k=1)
-    
-    Args:
-        powers: (n_symbols, 8) array of tone powers
-    
-    Returns:
-        llr: soft bit metrics (n_symbols * 3,) for standard
-             or variable length for short
-    """
-    n_sym = powers.shape[0]
-    
-    # Gray demapping table (matches corrected igray in ft2h_get_bitmetrics.f90)
-    # Tone → (bit0, bit1, bit2) where bit0=MSB
-    igray = np.array([
-        [0, 0, 0, 0, 1, 1, 1, 1],  # Bit 0 (MSB)
-        [0, 0, 1, 1, 1, 1, 0, 0],  # Bit 1
-        [0, 1, 1, 0, 0, 1, 1, 0],  # Bit 2 (LSB) — CORRECTED
-    ])
-    
-    llr_list = []
-    for isym in range(n_sym):
-        s2 = powers[isym]
-        for ibit in range(3):
-            mask0 = igray[ibit] == 0
-            mask1 = igray[ibit] == 1
-            smax0 = np.max(s2[mask0]) if np.any(mask0) else -1e30
-            smax1 = np.max(s2[mask1]) if np.any(mask1) else -1e30
-            llr_list.append(smax0 - smax1)
-    
-    llr = np.array(llr_list)
-    
-    # Normalize
-    mean_abs = np.mean(np.abs(llr))
-    if mean_abs > 0:
-        llr = llr / mean_abs
-    
-    # Scale to approximate LLR
-    llr *= 2.83
-    
-    return llr
-
-def detect_sync_standard(signal, nsps, f0):
-    """Detect standard frame sync by correlating with Costas arrays.
-    
-    Returns:
-        sync_power: normalized sync metric
-        dt_best: best time offset in samples
-    """
-    dt = 1.0 / FSAMPLE
-    best_sync = 0
-    best_offset = 0
-    
-    # Search over possible time offsets
-    nstep = nsps // 4
-    n_offsets = max(1, (len(signal) - NN2 * nsps) // nstep)
-    
-    for ioff in range(n_offsets):
-        offset = ioff * nstep
-        
-        # Compute power at Costas array positions
-        p_sync = 0.0
-        for i, tone in enumerate(ICOS8A):
-            k = offset + (1 + i) * nsps  # Positions 1-8
-            if k + nsps > len(signal):
-                break
-            seg = signal[k:k+nsps]
-            t = np.arange(nsps) * dt
-            ref = np.exp(-2j * np.pi * (f0 + tone * BAUD) * t)
-            p_sync += np.abs(np.sum(seg * ref)) ** 2
-        
-        for i, tone in enumerate(ICOS8B):
-            k = offset + (38 + i) * nsps  # Positions 38-45
-            if k + nsps > len(signal):
-                break
-            seg = signal[k:k+nsps]
-            t = np.arange(nsps) * dt
-            ref = np.exp(-2j * np.pi * (f0 + tone * BAUD) * t)
-            p_sync += np.abs(np.sum(seg * ref)) ** 2
-        
-        # Compute data power for normalization
-        p_data = 0.0
-        for i in range(58):
-            if i < 29:
-                pos = 9 + i  # Data block 1: positions 9-37
-            else:
-                pos = 46 + (i - 29)  # Data block 2: positions 46-74
-            k = offset + pos * nsps
-            if k + nsps > len(signal):
-                break
-            seg = signal[k:k+nsps]
-            p_data += np.sum(seg ** 2)
-        
-        if p_data > 0:
-            sync = p_sync / (p_data / 58.0 * 16.0)
-        else:
-            sync = 0
-        
-        if sync > best_sync:
-            best_sync = sync
-            best_offset = offset
-    
-    return best_sync, best_offset
-
-# ============================================================
-# End-to-End Simulation
+# Main Simulation
 # ============================================================
 
-def simulate_standard_frame(snr_db, f0=1500.0, ntrials=100):
-    """Simulate standard FT2H frame at given SNR.
-    
-    Args:
-        snr_db: SNR in 2500 Hz bandwidth (dB)
-        f0: carrier frequency (Hz)
-        ntrials: number of Monte Carlo trials
-    
-    Returns:
-        wer: word error rate
-        ber: bit error rate
-        n_decoded: number successfully decoded
-    """
-    n_errors_total = 0
-    n_bits_total = 0
-    n_decoded = 0
-    n_word_errors = 0
-    
-    # Convert SNR from 2500 Hz BW to per-sample noise level
-    # SNR_2500 = Es/N0 - 10*log10(2500/baud)
-    # Es/N0 = SNR_2500 + 10*log10(2500/baud)
-    # N0 = Es / (10^(EsN0_db/10))
-    # Signal power per sample = 0.5 (sine wave RMS^2)
-    signal_power = 0.5
-    es_n0_db = snr_db + 10.0 * np.log10(2500.0 / BAUD)
-    noise_power_per_sample = signal_power / (10.0 ** (es_n0_db / 10.0)) * NSPS
-    
-    for trial in range(ntrials):
-        # Generate random 77-bit message
-        msgbits = np.random.randint(0, 2, 77).astype(np.int8)
-        
-        # Encode and modulate
-        tones, codeword = assemble_standard_frame(msgbits)
-        wave = gen_ft2h_wave(tones, f0=f0)
-        
-        # Add AWGN
-        noise_sigma = np.sqrt(noise_power_per_sample)
-        noise = noise_sigma * np.random.randn(len(wave))
-        received = wave + noise
-        
-        # Demodulate — extract tone powers at known positions
-        # (In a real receiver, we'd first do sync detection. Here we assume perfect sync.)
-        data_positions_std = list(range(9, 38)) + list(range(46, 75))
-        powers = compute_tone_powers(received, NSPS, f0, NN2, data_positions_std)
-        
-        # Compute soft LLR
-        llr = soft_demod_8gfsk(powers)
-        
-        # Truncate to 174 bits (58 symbols × 3 bits)
-        llr = llr[:174]
-        
-        # LDPC decode
-        decoded_info, nhard = decode_174_91_soft(llr)
-        
-        if decoded_info is not None:
-            # Undo scrambling
-            decoded_msg = np.mod(decoded_info[:77] + RVEC, 2).astype(np.int8)
-            
-            bit_errors = np.sum(decoded_msg != msgbits)
-            if bit_errors == 0:
-                n_decoded += 1
-            else:
-                n_word_errors += 1
-                n_errors_total += bit_errors
-        else:
-            n_word_errors += 1
-            n_errors_total += 77  # Count all bits as errors on decode failure
-        
-        n_bits_total += 77
-    
-    wer = n_word_errors / ntrials
-    ber = n_errors_total / n_bits_total if n_bits_total > 0 else 1.0
-    
-    return wer, ber, n_decoded
-
-def simulate_short_frame(snr_db, f0=1500.0, ntrials=100):
-    """Simulate short FT2H frame at given SNR.
-    
-    Args:
-        snr_db: SNR in 2500 Hz bandwidth (dB)
-        f0: carrier frequency (Hz)
-        ntrials: number of Monte Carlo trials
+def plot_results(snr_std, wer_std, ber_std, snr_short, wer_sht,
+                 plot_path='ft2h_simulation_results.png'):
+    """Standard and short frame error-rate plots (matplotlib loaded here)."""
+    import matplotlib
+    matplotlib.use('Agg')  # Non-interactive backend
+    import matplotlib.pyplot as plt
     
-    Returns:
-        wer: word error rate
-        n_decoded: number successfully decoded
-    """
-    n_decoded = 0
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
-    signal_power = 0.5
-    es_n0_db = snr_db + 10.0 * np.log10(2500.0 / BAUD)
-    noise_power_per_sample = signal_power / (10.0 ** (es_n0_db / 10.0)) * NSPS
+    # Standard frame
+    ax1.semilogy(snr_std, np.array(wer_std) + 1e-10, 'bo-', label='WER (Standard)', linewidth=2)
+    ax1.semilogy(snr_std, np.array(ber_std) + 1e-10, 'rs--', label='BER (Standard)', linewidth=1.5)
+    ax1.axvline(x=-15.8, color='green', linestyle=':', label='Design target (-15.8 dB)')
+    ax1.axvline(x=-21.0, color='gray', linestyle=':', alpha=0.5, label='FT8 sensitivity (-21 dB)')
+    ax1.axvline(x=-17.5, color='orange', linestyle=':', alpha=0.5, label='FT4 sensitivity (-17.5 dB)')
+    ax1.set_xlabel('SNR in 2500 Hz BW (dB)')
+    ax1.set_ylabel('Error Rate')
+    ax1.set_title('FT2H Standard Frame (77-bit, LDPC 174,91)')
+    ax1.legend(fontsize=8)
+    ax1.grid(True, alpha=0.3)
+    ax1.set_ylim(1e-4, 1.1)
     
-    for trial in range(ntrials):
-        # Generate RR73 message (code=1)
-        msgbits_16 = np.zeros(16, dtype=np.int8)
-        msgbits_16[15] = 1  # code=1 (RR73)
-        
-        tones, codeword = assemble_short_frame(msgbits_16)
-        wave = gen_ft2h_wave(tones, f0=f0)
-        
-        noise_sigma = np.sqrt(noise_power_per_sample)
-        noise = noise_sigma * np.random.randn(len(wave))
-        received = wave + noise
-        
-        # Data positions for short frame: 9-30
-        data_positions_short = list(range(9, 31))
-        powers = compute_tone_powers(received, NSPS, f0, NN2_S, data_positions_short)
-        
-        llr = soft_demod_8gfsk(powers)
-        llr = llr[:64]  # 22 symbols × 3 bits, truncated to 64
-        
-        decoded_info, nhard = decode_64_32_soft(llr)
-        
-        if decoded_info is not None:
-            # Check CRC
-            original_info = get_crc16(msgbits_16)
-            if np.array_equal(decoded_info, original_info):
-                n_decoded += 1
+    # Short frame
+    ax2.semilogy(snr_short, np.array(wer_sht) + 1e-10, 'bo-', label='WER (Short)', linewidth=2)
+    ax2.axvline(x=-9.0, color='green', linestyle=':', label='Design target (-9 dB)')
+    ax2.set_xlabel('SNR in 2500 Hz BW (dB)')
+    ax2.set_ylabel('Word Error Rate')
+    ax2.set_title('FT2H Short Frame (16-bit, LDPC 64,32)')
+    ax2.legend(fontsize=8)
+    ax2.grid(True, alpha=0.3)
+    ax2.set_ylim(1e-4, 1.1)
     
-    wer = 1.0 - n_decoded / ntrials
-    return wer, n_decoded
-
-# ============================================================
-# Main Simulation
-# ============================================================
+    plt.tight_layout()
+    plt.savefig(plot_path, dpi=150)
+    plt.close(fig)
+    print(f"\nResultados guardados en: {plot_path}")
 
-def run_simulation(quick=False):
-    """Run complete FT2H simulation across SNR range."""
+def run_simulation(quick=False, jobs=1, seed=0, sync=False, plot=True, cache=None,
+                   out=None):
+    """Run complete FT2H simulation across SNR range.
+    
+    SNR points are split into trial chunks and spread over `jobs` worker
+    processes (see ft2h.sweep.run_sweep); results are independent of jobs
+    and stream in as each point finishes.  With sync=True standard frames
+    go through the coarse sync search instead of perfect timing.  With
+    plot=False matplotlib is never imported.  cache is an optional
+    ft2h.cache.ResultCache whose stored chunks are reused; out an optional
+    ft2h.results.ResultWriter that receives one row per finished point."""
     print("=" * 70)
     print("FT2H Hybrid Mode Simulator")
     print("=" * 70)
@@ -648,69 +112,75 @@ def run_simulation(quick=False):
         ntrials = 200
     
     # ---- Standard frame simulation ----
-    print(f"\n--- Standard Frame (LDPC 174,91) — {ntrials} trials per SNR ---")
+    sync_note = ", sync search" if sync else ""
+    print(f"\n--- Standard Frame (LDPC 174,91) — {ntrials} trials per SNR{sync_note} ---")
     print(f"{'SNR (dB)':>10} {'WER':>10} {'BER':>12} {'Decoded':>10} {'Rate':>8}")
     print("-" * 55)
     
-    wer_std = []
-    ber_std = []
+    wer_std = [0.0] * len(snr_std)
+    ber_std = [0.0] * len(snr_std)
+    
+    progress = Progress(len(snr_std) * ntrials, iters=lambda counts: counts[2])
     
-    for snr in snr_std:
-        t0 = time.time()
-        wer, ber, ndec = simulate_standard_frame(snr, ntrials=ntrials)
-        elapsed = time.time() - t0
-        wer_std.append(wer)
-        ber_std.append(ber)
+    def on_chunk(i, j, n, counts, secs, cached):
+        progress.chunk(i, n, counts, cached)
+        progress.show()
+    
+    std_unit = partial(standard_counts, sync=sync, convention='esn0')
+    for i, _, (ndec, nbit, niter), elapsed in run_sweep(std_unit, snr_std, ntrials,
+                                                        jobs=jobs, seed=seed, cache=cache,
+                                                        on_chunk=on_chunk):
+        wer = 1.0 - ndec / ntrials
+        ber = nbit / (77 * ntrials)
+        wer_std[i] = wer
+        ber_std[i] = ber
         rate = f"{ntrials/elapsed:.0f}/s" if elapsed > 0 else "---"
-        print(f"{snr:>10.1f} {wer:>10.4f} {ber:>12.6f} {ndec:>10}/{ntrials} {rate:>8}")
+        progress.point(i, ntrials, ntrials)
+        progress.clear()
+        print(f"{snr_std[i]:>10.1f} {wer:>10.4f} {ber:>12.6f} {ndec:>10}/{ntrials} {rate:>8}")
         sys.stdout.flush()
+        if out is not None:
+            out.write({'frame': 'standard', 'snr': snr_std[i], 'n': ntrials, 'ok': ndec,
+                       'bit_err': nbit, 'bp_iter': niter, 'wer': wer, 'ber': ber,
+                       'secs': round(elapsed, 4)})
+        progress.show()
+    progress.clear()
+    print(progress.summary())
     
     # ---- Short frame simulation ----
     print(f"\n--- Short Frame (LDPC 64,32) — {ntrials} trials per SNR ---")
     print(f"{'SNR (dB)':>10} {'WER':>10} {'Decoded':>10} {'Rate':>8}")
     print("-" * 45)
     
-    wer_sht = []
-    
-    for snr in snr_short:
-        t0 = time.time()
-        wer, ndec = simulate_short_frame(snr, ntrials=ntrials)
-        elapsed = time.time() - t0
-        wer_sht.append(wer)
+    wer_sht = [0.0] * len(snr_short)
+    
+    # Short-frame units use seed + 1 so they do not repeat the standard
+    # frame noise
+    progress = Progress(len(snr_short) * ntrials)
+    sht_unit = partial(short_counts, convention='esn0')
+    for i, _, (ndec,), elapsed in run_sweep(sht_unit, snr_short, ntrials,
+                                            jobs=jobs, seed=seed + 1, cache=cache,
+                                            on_chunk=on_chunk):
+        wer = 1.0 - ndec / ntrials
+        wer_sht[i] = wer
         rate = f"{ntrials/elapsed:.0f}/s" if elapsed > 0 else "---"
-        print(f"{snr:>10.1f} {wer:>10.4f} {ndec:>10}/{ntrials} {rate:>8}")
+        progress.point(i, ntrials, ntrials)
+        progress.clear()
+        print(f"{snr_short[i]:>10.1f} {wer:>10.4f} {ndec:>10}/{ntrials} {rate:>8}")
         sys.stdout.flush()
+        if out is not None:
+            out.write({'frame': 'short', 'snr': snr_short[i], 'n': ntrials, 'ok': ndec,
+                       'bit_err': None, 'bp_iter': None, 'wer': wer, 'ber': None,
+                       'secs': round(elapsed, 4)})
+        progress.show()
+    progress.clear()
+    print(progress.summary())
+    if cache is not None:
+        print(cache.report())
     
     # ---- Plot results ----
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-    
-    # Standard frame
-    ax1.semilogy(snr_std, np.array(wer_std) + 1e-10, 'bo-', label='WER (Standard)', linewidth=2)
-    ax1.semilogy(snr_std, np.array(ber_std) + 1e-10, 'rs--', label='BER (Standard)', linewidth=1.5)
-    ax1.axvline(x=-15.8, color='green', linestyle=':', label='Design target (-15.8 dB)')
-    ax1.axvline(x=-21.0, color='gray', linestyle=':', alpha=0.5, label='FT8 sensitivity (-21 dB)')
-    ax1.axvline(x=-17.5, color='orange', linestyle=':', alpha=0.5, label='FT4 sensitivity (-17.5 dB)')
-    ax1.set_xlabel('SNR in 2500 Hz BW (dB)')
-    ax1.set_ylabel('Error Rate')
-    ax1.set_title('FT2H Standard Frame (77-bit, LDPC 174,91)')
-    ax1.legend(fontsize=8)
-    ax1.grid(True, alpha=0.3)
-    ax1.set_ylim(1e-4, 1.1)
-    
-    # Short frame
-    ax2.semilogy(snr_short, np.array(wer_sht) + 1e-10, 'bo-', label='WER (Short)', linewidth=2)
-    ax2.axvline(x=-9.0, color='green', linestyle=':', label='Design target (-9 dB)')
-    ax2.set_xlabel('SNR in 2500 Hz BW (dB)')
-    ax2.set_ylabel('Word Error Rate')
-    ax2.set_title('FT2H Short Frame (16-bit, LDPC 64,32)')
-    ax2.legend(fontsize=8)
-    ax2.grid(True, alpha=0.3)
-    ax2.set_ylim(1e-4, 1.1)
-    
-    plt.tight_layout()
-    plot_path = 'ft2h_simulation_results.png'
-    plt.savefig(plot_path, dpi=150)
-    print(f"\nResultados guardados en: {plot_path}")
+    if plot:
+        plot_results(snr_std, wer_std, ber_std, snr_short, wer_sht)
     
     # ---- Summary ----
     print("\n" + "=" * 70)
@@ -784,6 +254,27 @@ def run_simulation(quick=False):
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='FT2H Hybrid Mode Simulator')
     parser.add_argument('--quick', action='store_true', help='Quick validation (fewer trials)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Worker processes for the SNR sweep (0 = all cores)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Base seed; results do not depend on --jobs')
+    parser.add_argument('--sync', action='store_true',
+                        help='Random frame timing in a 4 s slot, found by the sync search')
+    parser.add_argument('--no-plot', action='store_true',
+                        help='Skip the plot (matplotlib is never imported)')
+    parser.add_argument('--cache', metavar='FILE', default=None,
+                        help='SQLite result store: finished trial chunks are saved and reused')
+    parser.add_argument('--resume', action='store_true',
+                        help=f'Use the default result store ({DEFAULT_PATH})')
+    parser.add_argument('--out', metavar='FILE', default=None,
+                        help='Stream one row per finished SNR point (.csv or .jsonl)')
     args = parser.parse_args()
     
-    run_simulation(quick=args.quick)
+    cache_path = args.cache or (DEFAULT_PATH if args.resume else None)
+    cache = ResultCache(cache_path) if cache_path else None
+    out = ResultWriter(args.out) if args.out else None
+    run_simulation(quick=args.quick, jobs=args.jobs, seed=args.seed, sync=args.sync,
+                   plot=not args.no_plot, cache=cache, out=out)
+    for f in (cache, out):
+        if f is not None:
+            f.close()
@@ -0,0 +1,4 @@
+import os, sys
+
+# The ft2h package lives next to this directory (lib/ft2h/sim/ft2h)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
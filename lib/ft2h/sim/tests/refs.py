@@ -0,0 +1,20 @@
+"""
+Plain reference implementations and test inputs for the tests.
+"""
+
+import numpy as np
+from ft2h.encoder import make_standard_frames
+
+
+def bpsk_llr(cw, ebno_db, rng, rate=91 / 174):
+    """Channel LLRs of codewords sent as BPSK over AWGN at Eb/N0."""
+    sigma = np.sqrt(1.0 / (2.0 * rate * 10 ** (ebno_db / 10.0)))
+    y = 1.0 - 2.0 * cw + sigma * rng.standard_normal(cw.shape)
+    return 2.0 * y / sigma ** 2
+
+
+def random_codewords(n, seed):
+    """(n, 174) standard-frame codewords of random messages, and the rng."""
+    rng = np.random.default_rng(seed)
+    _, cw = make_standard_frames(rng.integers(0, 2, (n, 77), dtype=np.int8))
+    return cw, rng
@@ -0,0 +1,54 @@
+import json
+import numpy as np
+
+from ft2h.params import NMAX
+from ft2h.bench import run_bench, compare, short_stages, busy_slot, run_realtime
+
+
+def test_run_bench_entries_and_baseline_compare():
+    calls = []
+    suites = {'toy': [('a', 4, lambda: calls.append('a')),
+                      ('b', 2, lambda: calls.append('b'))]}
+    logged = []
+    result = run_bench(suites, repeat=3, stages={'toy.a'},
+                       log=lambda key, entry: logged.append(key))
+    assert calls == ['a'] * 4           # warm-up + 3 timed calls, stage b filtered out
+    assert logged == ['toy.a']
+    entry = result['stages']['toy.a']
+    assert entry['frames'] == 4 and entry['repeat'] == 3
+    assert entry['us_min'] <= entry['us_per_frame']
+    json.dumps(result)                  # a baseline file is plain JSON
+
+    def stage(us, stdev=1.0):
+        return {'stages': {'toy.a': {'us_per_frame': us, 'us_stdev': stdev}}}
+    assert compare(stage(130.0), stage(100.0)) == [('toy.a', 1.3, 'REGRESSION')]
+    assert compare(stage(70.0), stage(100.0)) == [('toy.a', 0.7, 'faster')]
+    # 30% slower but within the timing spread: not flagged
+    assert compare(stage(130.0, 20.0), stage(100.0))[0][2] == ''
+    assert compare(stage(100.0), {'stages': {}}) == [('toy.a', None, 'new')]
+
+
+def test_short_stages_run():
+    stages = short_stages(batch=4)
+    assert [name for name, _, _ in stages] == ['encode', 'gen_wave', 'awgn', 'demod', 'osd']
+    result = run_bench({'short': stages}, repeat=1)
+    assert all(e['frames_per_s'] > 0 for e in result['stages'].values())
+
+
+def test_busy_slot_mix():
+    slot, sent = busy_slot(8, np.random.default_rng(4))
+    assert slot.shape == (NMAX,)
+    assert sent['standard'].shape == (6, 77) and sent['short'].shape == (2, 16)
+
+
+def test_run_realtime_rows_and_budget():
+    # One clean slot per N: everything decodes; with a 1 µs budget the
+    # first N is already over it and the run stops there
+    result = run_realtime(nsigs=(1, 2), nslots=1, snr=(0.0, 0.0), short_frac=0.0)
+    assert [r['n'] for r in result['rows']] == [1, 2]
+    assert [(r['sent'], r['decoded'], r['false']) for r in result['rows']] == \
+        [(1, 1, 0), (2, 2, 0)]
+    assert result['max_n'] == 2
+    result = run_realtime(nsigs=(1, 2), nslots=1, budget=1e-6)
+    assert len(result['rows']) == 1 and result['rows'][0]['over_budget']
+    assert result['max_n'] == 0
@@ -0,0 +1,45 @@
+import numpy as np
+
+from ft2h.crc import crc_bytes, crc14, crc16, crc14_ok, crc16_ok, crc_to_bits
+
+
+def crc_serial(bits, poly, width):
+    """The bit-serial CRC recurrence of crc.py, one bit at a time."""
+    mask = (1 << width) - 1
+    crc = 0
+    for bit in bits:
+        fb = ((crc >> (width - 1)) & 1) ^ int(bit)
+        crc = (crc << 1) & mask
+        if fb:
+            crc ^= poly
+    return crc
+
+
+def test_crc16_check_value():
+    # CRC-16/BUYPASS (poly 0x8005, no reflection, zero init) of "123456789"
+    data = np.frombuffer(b"123456789", dtype=np.uint8)
+    assert crc_bytes(data, 0x8005, 16) == 0xFEE8
+    assert crc_bytes(data[None], 0x8005, 16).tolist() == [0xFEE8]
+
+
+def test_crc14_crc16_match_bit_serial():
+    rng = np.random.default_rng(1)
+    m77 = rng.integers(0, 2, (20, 77), dtype=np.int8)
+    m16 = rng.integers(0, 2, (20, 16), dtype=np.int8)
+    # crc14: 77 bits + 3 zeros to a whole byte + 2 zero bytes
+    assert crc14(m77).tolist() == [crc_serial(list(m) + [0] * 19, 0x6757, 14) for m in m77]
+    assert crc16(m16).tolist() == [crc_serial(m, 0x8005, 16) for m in m16]
+    assert crc14(np.zeros(77, dtype=np.int8)) == 0
+    assert crc14(m77[0]) == crc14(m77)[0]
+
+
+def test_crc_ok_detects_flips():
+    rng = np.random.default_rng(2)
+    m77 = rng.integers(0, 2, (10, 77), dtype=np.int8)
+    cw = np.concatenate([m77, crc_to_bits(crc14(m77), 14)], axis=1)
+    assert np.all(crc14_ok(cw))
+    cw[np.arange(10), rng.integers(0, 91, 10)] ^= 1
+    assert not np.any(crc14_ok(cw))
+    m16 = rng.integers(0, 2, (10, 16), dtype=np.int8)
+    cw = np.concatenate([m16, crc_to_bits(crc16(m16), 16)], axis=1)
+    assert np.all(crc16_ok(cw))
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from ft2h.decoder import bp_decode_174_91, decode_batch, CHECK_KERNELS, STALL_MIN_ITER
+from ft2h.demodulator import normalize_llr
+from ft2h.telemetry import Telemetry
+from refs import bpsk_llr, random_codewords
+
+
+def test_reference_bp_decodes_noisy_codewords():
+    cw, rng = random_codewords(20, 1)
+    llr = bpsk_llr(cw, 4.0, rng)
+    for i in range(len(llr)):
+        decoded, nhard = bp_decode_174_91(llr[i])
+        assert np.array_equal(decoded, cw[i, :91])
+        assert nhard == np.sum((llr[i] < 0) != cw[i])
+
+
+def test_reference_bp_fails_on_noise():
+    rng = np.random.default_rng(2)
+    assert bp_decode_174_91(rng.standard_normal(174), max_iter=20) == (None, -1)
+
+
+def test_decode_batch_equals_reference_bp():
+    cw, rng = random_codewords(60, 5)
+    llr = bpsk_llr(cw, 1.5, rng)
+    decoded, nhard, niter = decode_batch(llr, max_iter=30)
+    ndec = 0
+    for i in range(len(llr)):
+        ref, ref_nhard = bp_decode_174_91(llr[i], max_iter=30)
+        assert nhard[i] == ref_nhard
+        if ref is not None:
+            assert np.array_equal(decoded[i], ref)
+            ndec += 1
+        else:
+            assert niter[i] == 30
+    assert 0 < ndec < len(llr)          # both outcomes are exercised
+
+
+def test_layered_schedule_decodes_in_fewer_iterations():
+    cw, rng = random_codewords(60, 8)
+    llr = bpsk_llr(cw, 2.5, rng)
+    _, nh_f, it_f = decode_batch(llr, max_iter=40)
+    decoded, nh_l, it_l = decode_batch(llr, max_iter=40, schedule='layered')
+    ok = nh_l >= 0
+    assert np.array_equal(decoded[ok], cw[ok, :91])
+    assert np.all(ok[nh_f >= 0])        # layered decodes whatever flooding does
+    both = ok & (nh_f >= 0)
+    assert it_l[both].mean() < 0.75 * it_f[both].mean()
+
+
+def test_stall_stops_noise_rows_early():
+    rng = np.random.default_rng(9)
+    t = Telemetry()
+    _, nhard, niter = decode_batch(rng.standard_normal((20, 174)), max_iter=50, stall=5,
+                                   telemetry=t)
+    assert np.all(nhard < 0)
+    stopped = niter < 50
+    assert stopped.sum() == t.bp_stalled > 10
+    assert np.all(niter[stopped] >= STALL_MIN_ITER)
+
+
+@pytest.mark.parametrize('schedule', ['flooding', 'layered'])
+@pytest.mark.parametrize('kernel', sorted(CHECK_KERNELS))
+def test_kernels_decode_reference_rows(kernel, schedule):
+    # The other kernels and the layered schedule take other paths than the
+    # reference; at an SNR where it decodes every row they must agree on
+    # the codewords (LLRs scaled as the receiver's, which the kernels'
+    # offset and gain are tuned for)
+    cw, rng = random_codewords(40, 6)
+    llr = normalize_llr(bpsk_llr(cw, 4.0, rng))
+    decoded, nhard, _ = decode_batch(llr, max_iter=40, schedule=schedule, kernel=kernel)
+    for i in range(len(llr)):
+        ref, _ = bp_decode_174_91(llr[i], max_iter=40)
+        if ref is not None:
+            assert nhard[i] >= 0
+            assert np.array_equal(decoded[i], ref)
+    ok = nhard >= 0
+    assert np.array_equal(decoded[ok], cw[ok, :91])
+
+
+def test_unknown_kernel_or_schedule_rejected():
+    with pytest.raises(ValueError):
+        decode_batch(np.zeros((1, 174)), kernel='max-product')
+    with pytest.raises(ValueError):
+        decode_batch(np.zeros((1, 174)), schedule='shuffled')
@@ -0,0 +1,37 @@
+import numpy as np
+
+from ft2h import ldpc
+from ft2h.gf2 import pack_rows, unpack_rows, gf2_matmul, parity64
+from ft2h.encoder import encode_174_91, encode_64_32
+from ft2h.crc import crc14_ok, crc16_ok
+from refs import random_codewords
+
+
+def test_pack_unpack_round_trip():
+    bits = np.random.default_rng(1).integers(0, 2, (5, 130), dtype=np.uint8)
+    words = pack_rows(bits)
+    assert words.shape == (5, 3)
+    assert np.array_equal(unpack_rows(words, 130), bits)
+
+
+def test_gf2_matmul_matches_naive():
+    rng = np.random.default_rng(2)
+    x = rng.integers(0, 2, (10, 174), dtype=np.uint8)
+    m = rng.integers(0, 2, (7, 174), dtype=np.uint8)
+    assert np.array_equal(gf2_matmul(pack_rows(x), pack_rows(m)), x.astype(int) @ m.T % 2)
+    w = rng.integers(0, 2**63, 50, dtype=np.uint64)
+    assert parity64(w).tolist() == [bin(int(v)).count('1') % 2 for v in w]
+
+
+def test_encoders_give_codewords():
+    cw, rng = random_codewords(32, 3)
+    assert not np.any(ldpc.H_174_91.astype(int) @ cw.T % 2)
+    assert not np.any(ldpc.CODE_174_91.syndrome(cw))
+    assert np.all(crc14_ok(cw[:, :91]))
+    assert np.array_equal(encode_174_91(cw[0, :77]), cw[0])
+    assert np.array_equal(cw[:, 91:], cw[:, :91].astype(int) @ ldpc.GEN_174_91.T % 2)
+
+    cw = encode_64_32(rng.integers(0, 2, (32, 16), dtype=np.int8))
+    assert not np.any(ldpc.CODE_64_32.syndrome(cw))
+    assert np.all(crc16_ok(cw[:, :32]))
+    assert np.array_equal(cw[:, 32:], cw[:, :32].astype(int) @ ldpc.P_64_32 % 2)
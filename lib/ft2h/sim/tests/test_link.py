@@ -0,0 +1,37 @@
+import numpy as np
+
+from ft2h.encoder import make_standard_frame, make_standard_frames
+from ft2h.modulator import gen_wave, gen_wave_batch
+from ft2h.link import standard_counts, receiver_counts, short_counts
+
+
+def test_batched_frames_equal_single_frames():
+    rng = np.random.default_rng(1)
+    msgs = rng.integers(0, 2, (5, 77), dtype=np.int8)
+    tones, cw = make_standard_frames(msgs)
+    waves = gen_wave_batch(tones)
+    for i, m in enumerate(msgs):
+        t, c = make_standard_frame(m)
+        assert np.array_equal(t, tones[i]) and np.array_equal(c, cw[i])
+        assert np.array_equal(gen_wave(t), waves[i])
+
+
+def test_counts_at_extreme_snr():
+    rng = np.random.default_rng(2)
+    n_ok, n_bit_err, _ = standard_counts(0.0, 40, rng, chunk=16)
+    assert (n_ok, n_bit_err) == (40, 0)
+    n_ok, n_bit_err, _ = standard_counts(-30.0, 40, rng, chunk=16, osd_order=-1)
+    assert (n_ok, n_bit_err) == (0, 40 * 77)
+    assert short_counts(0.0, 40, rng, chunk=16) == (40,)
+
+
+def test_receiver_counts_wer_only():
+    # Slots at random DT and frequency: found at high SNR, never at -30 dB;
+    # no bit errors are made up for the missed ones
+    rng = np.random.default_rng(3)
+    n_ok, n_bit_err, _, n_sync, n_false, us = receiver_counts(0.0, 3, rng, maxcand=4)
+    assert (n_ok, n_bit_err, n_sync, n_false) == (3, 0, 3, 0)
+    assert us > 0
+    n_ok, n_bit_err, _, _, n_false, _ = receiver_counts(-30.0, 3, rng, maxcand=4,
+                                                        osd_order=-1)
+    assert (n_ok, n_bit_err, n_false) == (0, 0, 0)
@@ -0,0 +1,51 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from ft2h.modulator import gen_wave, gen_wave_batch, gfsk_pulse, CARRIER_TABLES
+from ft2h.params import NSPS, FSAMPLE, BT, HMOD
+
+
+def wave_naive(tones, f0):
+    """gen_ft2h_wave.f90: frequency pulses summed, phase integrated sample
+    by sample, cos^2 ramps on the first and last symbol."""
+    nsym = len(tones)
+    t = (np.arange(3 * NSPS) - 1.5 * NSPS) / NSPS
+    pulse = 2 * np.pi * HMOD / NSPS * gfsk_pulse(BT, t)
+    dphi = np.full((nsym + 2) * NSPS, 2 * np.pi * f0 / FSAMPLE)
+    for j, tone in enumerate(tones):
+        dphi[j * NSPS:(j + 3) * NSPS] += pulse * tone
+    wave = np.sin(np.cumsum(dphi))
+    ramp = np.cos(2 * np.pi * np.arange(NSPS) / (2 * NSPS)) / 2
+    wave[:NSPS] *= 0.5 - ramp
+    wave[-NSPS:] *= 0.5 + ramp
+    return wave
+
+
+def test_gen_wave_matches_sample_by_sample_phase():
+    rng = np.random.default_rng(1)
+    for f0 in (1000.0, 1234.5):
+        tones = rng.integers(0, 8, 30)
+        assert np.allclose(gen_wave(tones, f0), wave_naive(tones, f0), atol=1e-8)
+
+
+def test_per_frame_carriers_and_analytic():
+    rng = np.random.default_rng(2)
+    tones = rng.integers(0, 8, (3, 30))
+    f0 = np.array([800.0, 1500.0, 2100.25])
+    waves = gen_wave_batch(tones, f0=f0)
+    for i in range(3):
+        assert np.allclose(waves[i], gen_wave_batch(tones[i:i + 1], f0=f0[i])[0], atol=1e-9)
+    analytic = gen_wave_batch(tones, f0=f0, analytic=True)
+    assert np.allclose(analytic.imag, waves, atol=1e-9)
+    assert np.allclose(np.abs(analytic[:, NSPS:-NSPS]), 1.0)
+
+
+def test_shared_modulator_across_carriers_and_threads():
+    rng = np.random.default_rng(3)
+    tones = rng.integers(0, 8, (4, 30))
+    carriers = 1000.0 + 10.0 * np.arange(CARRIER_TABLES + 2)
+    want = [gen_wave_batch(tones, f0=f) for f in carriers]
+    with ThreadPoolExecutor(4) as pool:
+        got = list(pool.map(lambda f: gen_wave_batch(tones, f0=f), np.tile(carriers, 4)))
+    for i, wave in enumerate(got):
+        assert np.array_equal(wave, want[i % len(carriers)])
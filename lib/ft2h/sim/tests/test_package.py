@@ -0,0 +1,33 @@
+import os, subprocess, sys
+import numpy as np
+
+import ft2h
+
+SIM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_chain_round_trip():
+    rng = np.random.default_rng(1)
+    msgs = rng.integers(0, 2, (6, 77), dtype=np.int8)
+    tones, _ = ft2h.make_standard_frames(msgs)
+    llr = ft2h.demod_standard(ft2h.gen_wave_batch(tones, f0=1200.0), 1200.0)
+    decoded, nhard = ft2h.decode_combined_batch(llr)
+    assert np.all(nhard == 0)
+    assert np.array_equal(ft2h.scramble(decoded[:, :77]), msgs)
+
+    short = rng.integers(0, 2, (6, 16), dtype=np.int8)
+    tones, _ = ft2h.make_short_frames(short)
+    llr = ft2h.demod_short(ft2h.gen_wave_batch(tones, f0=1200.0), 1200.0)
+    info, nhard = ft2h.decoder.decode_64_32_batch(llr)
+    assert np.all(nhard == 0)
+    assert np.array_equal(info[:, :16], short)
+
+
+def test_no_heavy_imports():
+    # A fresh interpreter: importing the package and running trials loads
+    # neither matplotlib nor scipy
+    code = ("import sys, ft2h; ft2h.standard_counts(-6.0, 8); "
+            "print(sorted(m for m in ('matplotlib', 'scipy') if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], cwd=SIM_DIR, capture_output=True,
+                         text=True, check=True)
+    assert out.stdout.strip() == '[]'
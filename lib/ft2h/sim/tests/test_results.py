@@ -0,0 +1,35 @@
+import io
+import json
+import numpy as np
+import pytest
+
+from ft2h.results import ResultWriter, read_results, Progress
+
+ROWS = [{'snr': -8.0, 'n': 100, 'ok': np.int64(40), 'bp_hist': [0, 3, 5]},
+        {'snr': -7.5, 'n': 100, 'ok': np.int64(71), 'bp_hist': [1]}]
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'jsonl'])
+def test_rows_stream_and_read_back(tmp_path, suffix):
+    path = str(tmp_path / f'out.{suffix}')
+    with ResultWriter(path) as w:
+        w.write(ROWS[0])
+        # Flushed at once: readable while the sweep is still running
+        assert read_results(path)[0]['ok'] == 40
+        w.write(ROWS[1])
+    rows = read_results(path)
+    assert [(r['snr'], r['n'], r['ok']) for r in rows] == [(-8.0, 100, 40), (-7.5, 100, 71)]
+    hist = rows[0]['bp_hist']         # a compact JSON cell in CSV
+    assert (hist if suffix == 'jsonl' else json.loads(hist)) == [0, 3, 5]
+
+
+def test_progress_counts_and_eta():
+    p = Progress(300, iters=lambda counts: counts[2], stream=io.StringIO())
+    p.chunk(0, 50, (50, 0, 120), cached=False)
+    p.chunk(1, 50, (50, 0, 80), cached=True)
+    assert (p.done, p.run, p.niter) == (100, 50, 120)
+    p.point(0, 50, 150)                 # point 0 stopped 100 trials early
+    assert p.total == 200
+    assert p.done == 100
+    assert p.rates()[2] is not None
+    assert p.summary().startswith('50 trials simulated')
@@ -0,0 +1,74 @@
+import pytest
+from functools import partial
+
+from ft2h.sweep import run_sweep, adaptive_until, wilson_interval, clopper_pearson_interval
+from ft2h.link import standard_counts
+from ft2h.cache import ResultCache
+
+
+def sweep(points, ntrials=48, **kw):
+    """{point: (n, counts)} of a run_sweep() over standard_counts."""
+    out = run_sweep(standard_counts, points, ntrials, seed=3, chunk=16, **kw)
+    return {points[i]: (n, counts) for i, n, counts, _ in out}
+
+
+def test_run_sweep_independent_of_jobs():
+    serial = sweep([-8.0, -7.0], jobs=1)
+    assert sweep([-8.0, -7.0], jobs=2) == serial
+    assert all(n == 48 for n, _ in serial.values())
+
+
+def test_point_gets_same_trials_in_any_range():
+    assert sweep([-7.0, -8.0])[-8.0] == sweep([-8.0])[-8.0]
+
+
+def test_wilson_interval():
+    lo, hi = wilson_interval(10, 100)
+    assert lo < 0.1 < hi
+    assert wilson_interval(0, 100)[0] == 0.0
+    assert abs(wilson_interval(0, 100)[1] - 0.037) < 1e-3
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_adaptive_until():
+    until = adaptive_until(lambda n, counts: n - counts[0], target_errors=10,
+                           wer_floor=1e-3)
+    assert not until(100, (95,))
+    assert until(100, (90,))                # 10 errors
+    assert not until(1000, (1000,))         # upper bound ~3.8e-3
+    assert until(5000, (5000,))             # ~7.7e-4 < floor
+    width = adaptive_until(lambda n, counts: n - counts[0], None, rel_width=0.5)
+    assert not width(100, (90,)) and width(10000, (9000,))
+
+
+def test_adaptive_sweep_independent_of_jobs():
+    until = adaptive_until(lambda n, counts: n - counts[0], target_errors=8)
+    serial = sweep([-8.0, -7.0], jobs=1, until=until)
+    assert sweep([-8.0, -7.0], jobs=2, until=until) == serial
+    assert serial[-8.0][0] < 48             # stopped early on 8 errors
+
+
+def test_clopper_pearson_interval():
+    pytest.importorskip('scipy')
+    lo, hi = clopper_pearson_interval(10, 100)
+    assert lo < wilson_interval(10, 100)[0] and hi > wilson_interval(10, 100)[1]
+    assert clopper_pearson_interval(0, 100)[1] == pytest.approx(1 - 0.025 ** 0.01)
+
+
+def test_cache_reuses_chunks(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    with ResultCache(path) as cache:
+        first = sweep([-8.0], cache=cache)
+        assert (cache.hits, cache.stored) == (0, 3)
+    with ResultCache(path) as cache:
+        # The stored point is reused, the new one is run and stored
+        again = sweep([-8.0, -7.0], cache=cache)
+        assert (cache.hits, cache.stored) == (3, 3)
+    assert again[-8.0] == first[-8.0]
+    assert again == sweep([-8.0, -7.0])
+    with ResultCache(path) as cache:
+        # Another unit configuration shares nothing
+        out = run_sweep(partial(standard_counts, osd_order=-1), [-8.0], 48, seed=3,
+                        chunk=16, cache=cache)
+        list(out)
+        assert cache.hits == 0
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from ft2h.sync import (spectrogram, costas_score, select_peaks, sync_candidates_multi,
+                       sync_candidates_standard)
+from ft2h.encoder import make_standard_frames, make_short_frames
+from ft2h.modulator import gen_wave_batch
+from ft2h.channel import mix_slot
+from ft2h.link import RR73
+from ft2h.params import (NSPS, NMAX, FSAMPLE, PULSE_DELAY, SYNC_MAP, SYNC_MAP_S, BAUD,
+                         NN2, NN2_S)
+
+
+def test_spectrogram_and_costas_score_match_loops():
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal(40 * 16)
+    s = spectrogram(x, 16, 4, 32)
+    for j in range(s.shape[0]):
+        assert np.allclose(s[j], np.abs(np.fft.rfft(x[4 * j:4 * j + 16], 32)) ** 2)
+    sync_map = [(0, 3), (1, 1), (3, 0)]
+    score = costas_score(s, sync_map, 4, 2, 10, m=4)
+    for lag in range(10):
+        for f in range(s.shape[1] - 6):
+            want = sum(s[lag + 4 * i, f + 2 * t] for i, t in sync_map)
+            assert np.isclose(score[lag, f], want)
+
+
+def test_sync_finds_frame():
+    rng = np.random.default_rng(2)
+    tones, _ = make_standard_frames(rng.integers(0, 2, (1, 77), dtype=np.int8))
+    f0, delay = 1312.0, 2000
+    slot = mix_slot(gen_wave_batch(tones, f0=f0), [-8.0], [delay], rng, NMAX)
+    fc, offset, sync = sync_candidates_standard(slot, 200.0, 2600.0)[0]
+    assert abs(fc - f0) <= BAUD / 4
+    assert abs(offset - (delay + PULSE_DELAY * NSPS)) <= NSPS // 4
+    assert sync > 1.2
+
+
+def peaks_naive(score, maxcand, syncmin, nms=None, nms_ratio=0.5):
+    """Local maxima ranked by score, then greedy suppression, cell by cell."""
+    nlag, nf = score.shape
+    cells = []
+    for i in range(nlag):
+        for j in range(nf):
+            nb = score[max(i - 1, 0):i + 2, max(j - 1, 0):j + 2]
+            if score[i, j] >= syncmin and score[i, j] >= nb.max():
+                cells.append((i, j))
+    cells.sort(key=lambda c: -score[c])
+    keep = []
+    for i, j in cells:
+        if nms is not None and any(abs(i - a) <= nms[0] and abs(j - b) <= nms[1] and
+                                   score[i, j] < nms_ratio * score[a, b] for a, b in keep):
+            continue
+        keep.append((i, j))
+    return keep[:maxcand]
+
+
+@pytest.mark.parametrize('nms', [None, (3, 4)])
+def test_select_peaks_matches_naive(nms):
+    rng = np.random.default_rng(3)
+    score = rng.exponential(1.0, (40, 60))
+    score[[10, 25, 30], [10, 40, 12]] = 30.0    # strong peaks, whose neighbours are sidelobes
+    lag, ibin = select_peaks(score, maxcand=15, syncmin=1.0, nms=nms)
+    assert list(zip(lag, ibin)) == peaks_naive(score, 15, 1.0, nms)
+
+
+def test_standard_and_short_frames_in_one_pass():
+    rng = np.random.default_rng(4)
+    msg = rng.integers(0, 2, (1, 77), dtype=np.int8)
+    waves = [gen_wave_batch(make_standard_frames(msg)[0], f0=800.0)[0],
+             gen_wave_batch(make_short_frames(RR73[None])[0], f0=2000.0)[0]]
+    slot = mix_slot(waves, [-5.0, -5.0], [2000, 20000], rng, NMAX)
+    cand = sync_candidates_multi(slot, {'standard': (SYNC_MAP, NN2), 'short': (SYNC_MAP_S, NN2_S)},
+                                 NSPS, FSAMPLE, BAUD, 200.0, 2600.0, maxcand=5)
+    for name, f0, delay in (('standard', 800.0, 2000), ('short', 2000.0, 20000)):
+        fc, offset, _ = cand[name][0]
+        assert abs(fc - f0) <= BAUD / 4
+        assert abs(offset - (delay + PULSE_DELAY * NSPS)) <= NSPS // 4
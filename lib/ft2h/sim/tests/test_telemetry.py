@@ -0,0 +1,47 @@
+import json
+import numpy as np
+
+from ft2h import ldpc
+from ft2h.crc import crc14_ok
+from ft2h.decoder import decode_batch, decode_combined_batch
+from ft2h.telemetry import Telemetry
+from refs import bpsk_llr, random_codewords
+
+
+def test_crc_reject_counted_once_per_frame():
+    # LDPC codewords whose CRC-14 bits are wrong: BP sits on them every iteration
+    cw, _ = random_codewords(3, 11)
+    msg91 = cw[:, :91].copy()
+    msg91[:, 80] ^= 1
+    bad = ldpc.CODE_174_91.encode(msg91)
+    assert not np.any(crc14_ok(bad))
+    t = Telemetry()
+    _, nhard, _ = decode_batch(8.0 * (1 - 2.0 * bad), max_iter=20, telemetry=t)
+    assert np.all(nhard < 0)
+    assert t.crc_reject == 3
+
+
+def test_combined_batch_records_bp_and_osd():
+    cw, rng = random_codewords(40, 12)
+    llr = bpsk_llr(cw, 1.0, rng)
+    t = Telemetry()
+    decode_combined_batch(llr, osd_order=1, osd_budget=256, telemetry=t)
+    assert t.frames == 40
+    assert t.bp_hist.sum() + t.bp_fail == 40
+    assert t.osd.calls == t.bp_fail > 0
+    assert set(t.stage_time) == {'bp', 'osd'}
+
+
+def test_merge_and_dict_round_trip():
+    a, b = Telemetry(), Telemetry()
+    a.bp(np.array([3, -1]), np.array([2, 40]))
+    b.bp(np.array([0, 0, 1]), np.array([5, 2, 5]))
+    b.crc_reject = 2
+    with b.stage('demod'):
+        pass
+    total = sum([a, b])
+    assert total.frames == 5 and total.bp_fail == 1 and total.crc_reject == 2
+    assert total.bp_hist.tolist() == [0, 0, 2, 0, 0, 2]
+    back = Telemetry.from_dict(json.loads(json.dumps(total.as_dict())))
+    assert back.as_dict() == total.as_dict()
+    assert back.row()['bp_mean_iter'] == 3.5